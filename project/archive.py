@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from project import models
+
+FIELDS = ["id", "project_id", "task_id", "created_by_id", "minutes", "created_at"]
+
+
+def candidates(before=None, archived_tasks=False):
+    """
+    Return the finished entries created before ``before`` or, with
+    ``archived_tasks``, logged on archived tasks.
+    """
+    condition = Q()
+    if before is not None:
+        condition |= Q(created_at__lt=before)
+    if archived_tasks:
+        condition |= Q(task__status="archived")
+    if not condition:
+        return models.Entry.objects.none()
+    return models.Entry.objects.filter(condition, is_tracked=False)
+
+
+def archive(before=None, archived_tasks=False, batch_size=None):
+    """
+    Move the ``candidates`` into the archive table, ``batch_size`` entries
+    (``ENTRY_ARCHIVE_BATCH_SIZE``) per transaction, and return how many
+    were moved.
+
+    Entries are removed with a raw delete, without signals, so the daily
+    rollups keep their minutes and totals and reports do not change. No
+    tombstones or versions are written either: archived entries drop out
+    of the entry listings and sync but were not deleted.
+    """
+    batch_size = batch_size or settings.ENTRY_ARCHIVE_BATCH_SIZE
+    queryset = candidates(before, archived_tasks).order_by("id")
+    moved, last = 0, 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                queryset.select_for_update(of=("self",))
+                .filter(id__gt=last)
+                .values_list(*FIELDS)[:batch_size]
+            )
+            if not rows:
+                return moved
+            models.ArchivedEntry.objects.bulk_create(
+                models.ArchivedEntry(**dict(zip(FIELDS, row))) for row in rows
+            )
+            entries = models.Entry.objects.filter(id__in=[row[0] for row in rows])
+            entries._raw_delete(entries.db)
+        moved += len(rows)
+        last = rows[-1][0]
+
+
+def cutoff(days=None):
+    """
+    Return the moment entries older than ``days`` (``ENTRY_ARCHIVE_DAYS``)
+    are archived from.
+    """
+    days = settings.ENTRY_ARCHIVE_DAYS if days is None else days
+    return timezone.now() - timedelta(days=days)
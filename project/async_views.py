@@ -0,0 +1,143 @@
+"""
+Async variants of the timer endpoints for the ASGI application.
+
+They answer like ``EntryStartAPIView``/``EntryEndAPIView`` without DRF's
+sync request cycle. Django 4.0 has no async ORM yet, so each step that
+touches the database runs through ``sync_to_async``.
+"""
+
+import asyncio
+import math
+import time
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from rest_framework import status
+from timetracking.authentication import authenticate_request
+from timetracking.throttling import TokenBucketThrottle
+
+from project import models, serializers, timers
+
+
+def throttled(request, scope):
+    """
+    Return DRF's 429 answer when ``request`` is over its budget in
+    ``scope``, otherwise None.
+    """
+    throttle = TokenBucketThrottle(scope)
+    if throttle.allow_request(request, None):
+        return None
+    wait = math.ceil(throttle.wait())
+    response = JsonResponse(
+        {"detail": f"Request was throttled. Expected available in {wait} seconds."},
+        status=status.HTTP_429_TOO_MANY_REQUESTS,
+    )
+    response["Retry-After"] = str(wait)
+    return response
+
+
+def token_required(*methods, throttle_scope=None):
+    """
+    Restrict an async view to ``methods`` and to token authenticated
+    users, passed on as ``request.user``, throttled like DRF views with
+    ``throttle_scope``. CSRF doesn't apply to token auth.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return JsonResponse(
+                    {"detail": f'Method "{request.method}" not allowed.'},
+                    status=status.HTTP_405_METHOD_NOT_ALLOWED,
+                )
+            request.user = await sync_to_async(authenticate_request)(request)
+            if request.user is None:
+                return JsonResponse(
+                    {"detail": "Invalid or missing token."},
+                    status=status.HTTP_401_UNAUTHORIZED,
+                )
+            if throttle_scope is not None:
+                response = await sync_to_async(throttled)(request, throttle_scope)
+                if response is not None:
+                    return response
+            return await view(request, *args, **kwargs)
+
+        wrapper.csrf_exempt = True
+        return wrapper
+
+    return decorator
+
+
+def entry_data(entry):
+    return serializers.EntrySerializer(entry).data
+
+
+@token_required("POST", throttle_scope="timer")
+async def entry_start(request, pk):
+    """
+    API to start track a task.
+    """
+    try:
+        entry = await sync_to_async(timers.start)(request.user, pk)
+    except models.Task.DoesNotExist:
+        return JsonResponse({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    if entry is None:
+        return JsonResponse({"message": "You already have a tracked task in progress."})
+    return JsonResponse(
+        {"status": "Start Tracking", "task": entry_data(entry)},
+        status=status.HTTP_201_CREATED,
+    )
+
+
+@token_required("POST", throttle_scope="timer")
+async def entry_end(request, pk):
+    """
+    API to end tracking a task
+    """
+    entry = await sync_to_async(timers.stop)(request.user, pk)
+    if entry is None:
+        return JsonResponse(
+            {"message": "There is no tracked task with the provided data"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    return JsonResponse({"status": "Stop Tracking", "task": entry_data(entry)})
+
+
+@token_required("GET")
+async def current_entry(request):
+    """
+    API to get the running timer of the authenticated user, ``task`` is
+    null when nothing is being tracked. Answered from the cache that
+    starting and stopping timers write.
+    """
+    return JsonResponse(await sync_to_async(timers.state)(request.user))
+
+
+@token_required("GET", throttle_scope="timer_wait")
+async def wait_entry(request):
+    """
+    Long-poll for a change of the running timer: answers as soon as the
+    state's version differs from ``?version=`` or after ``?timeout=``
+    seconds with the unchanged state. Waiting only costs cache reads, but
+    holds a worker thread unless served by the ASGI application. Polls
+    have their own budget so they can't crowd out timer clicks.
+    """
+    try:
+        version = int(request.GET.get("version", 0))
+        timeout = float(request.GET.get("timeout", settings.TIMER_LONG_POLL_TIMEOUT))
+    except ValueError:
+        return JsonResponse(
+            {"detail": "version must be an integer and timeout a number."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    deadline = time.monotonic() + min(max(timeout, 0), settings.TIMER_LONG_POLL_TIMEOUT)
+
+    while True:
+        state = await sync_to_async(timers.state)(request.user)
+        if state["version"] != version or time.monotonic() >= deadline:
+            return JsonResponse(state)
+        await asyncio.sleep(settings.TIMER_POLL_INTERVAL)
@@ -0,0 +1,651 @@
+import asyncio
+import json
+import math
+import platform
+import random
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import timedelta
+from uuid import uuid4
+
+import django
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models import Count
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.test import APIRequestFactory
+from timetracking import renderers
+from timetracking.throttling import TokenBucketThrottle
+
+from project import models, search, serializers
+
+
+def percentile(values, pct):
+    """
+    Nearest-rank percentile of ``values``.
+    """
+    ordered = sorted(values)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+def host():
+    """
+    A host name the running settings accept.
+    """
+    for allowed in settings.ALLOWED_HOSTS:
+        if allowed != "*":
+            return allowed.lstrip(".")
+    return "localhost"
+
+
+def heaviest_user():
+    return (
+        models.User.objects.annotate(count=Count("entries"))
+        .order_by("-count", "id")
+        .first()
+    )
+
+
+class Endpoint:
+    """
+    One request the harness drives: ``data`` is called with the iteration
+    number so writes can use unique values.
+    """
+
+    def __init__(self, name, method, path, data=None, content_type=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.data = data
+        self.content_type = content_type
+
+    def request(self, client, iteration):
+        kwargs = {}
+        if self.data is not None:
+            kwargs["data"] = self.data(iteration)
+        if self.content_type is not None:
+            kwargs["content_type"] = self.content_type
+        response = getattr(client, self.method)(self.path, **kwargs)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response
+
+
+def endpoints(user):
+    """
+    Every endpoint of ``project/urls.py`` and ``useraccount/urls.py``
+    except the deletes, which would eat the dataset.
+    """
+    project = user.projects.order_by("id").first()
+    task = user.tasks.order_by("id").first()
+    today = timezone.localdate()
+    year_ago = today - timedelta(days=365)
+    run = uuid4().hex[:8]
+
+    return [
+        Endpoint("projects:list", "get", "/projects/"),
+        Endpoint(
+            "projects:create",
+            "post",
+            "/projects/",
+            lambda i: {"title": f"Benchmark {run} {i}"},
+        ),
+        Endpoint("projects:retrieve", "get", f"/projects/{project.id}/"),
+        Endpoint(
+            "projects:update",
+            "put",
+            f"/projects/{project.id}/",
+            lambda i: json.dumps({"title": project.title}),
+            "application/json",
+        ),
+        Endpoint("tasks:list", "get", "/projects/tasks/"),
+        Endpoint(
+            "tasks:create",
+            "post",
+            "/projects/tasks/",
+            lambda i: {"title": f"Benchmark {run} {i}", "project": project.id},
+        ),
+        Endpoint("tasks:retrieve", "get", f"/projects/tasks/{task.id}/"),
+        Endpoint(
+            "tasks:update",
+            "patch",
+            f"/projects/tasks/{task.id}/",
+            lambda i: json.dumps({"status": task.status}),
+            "application/json",
+        ),
+        Endpoint(
+            "tasks:bulk",
+            "post",
+            "/projects/tasks/bulk/",
+            lambda i: json.dumps(
+                {"action": "status", "status": task.status, "ids": [task.id]}
+            ),
+            "application/json",
+        ),
+        Endpoint("timer:start", "post", f"/projects/tasks/{task.id}/start/"),
+        Endpoint("timer:end", "post", f"/projects/tasks/{task.id}/end/"),
+        Endpoint("timer:current", "get", "/projects/timer/"),
+        Endpoint(
+            "timer:async-start", "post", f"/projects/async/tasks/{task.id}/start/"
+        ),
+        Endpoint("timer:async-end", "post", f"/projects/async/tasks/{task.id}/end/"),
+        Endpoint("entries:list", "get", "/projects/entries/"),
+        Endpoint(
+            "entries:export",
+            "get",
+            "/projects/entries/export/",
+            lambda i: {"start": today - timedelta(days=30), "end": today},
+        ),
+        Endpoint(
+            "entries:import",
+            "post",
+            "/projects/entries/import/",
+            lambda i: json.dumps(
+                [{"task": task.id, "minutes": 1, "created_at": f"{year_ago}T12:00Z"}]
+            ),
+            "application/json",
+        ),
+        Endpoint(
+            "reports",
+            "get",
+            "/projects/reports/",
+            lambda i: {"start": year_ago, "end": today, "bucket": "week"},
+        ),
+        Endpoint("sync", "get", "/projects/sync/"),
+        Endpoint(
+            "users:register",
+            "post",
+            "/users/register/",
+            lambda i: {
+                "username": f"b{run}{i}",
+                "email": f"b{run}{i}@example.com",
+                "password": "benchmark-password",
+            },
+        ),
+    ]
+
+
+def throttle_rates(rates):
+    """
+    Override the throttle budgets, None turns a scope off.
+    """
+    return override_settings(
+        REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": rates}
+    )
+
+
+def unthrottled():
+    # the harness sends far more requests than any budget allows
+    return throttle_rates(
+        {scope: None for scope in api_settings.DEFAULT_THROTTLE_RATES}
+    )
+
+
+def run(user, iterations=50, names=None):
+    """
+    Drive every endpoint in-process as ``user`` and return per-endpoint
+    latency percentiles, queries per request and peak traced memory.
+
+    Endpoints run in turn within each iteration, so timer starts and ends
+    alternate. The first pass counts queries and the second traces memory;
+    neither is timed.
+    """
+    token = Token.objects.get(user=user).key
+    client = Client(HTTP_HOST=host(), HTTP_AUTHORIZATION=f"Token {token}")
+    selected = [e for e in endpoints(user) if names is None or e.name in names]
+    models.Entry.objects.filter(created_by=user, is_tracked=True).delete()
+    # authenticate once so the cached token doesn't skew the first count
+    client.get("/projects/")
+
+    results = {
+        endpoint.name: {"method": endpoint.method.upper(), "path": endpoint.path}
+        for endpoint in selected
+    }
+    timings = {endpoint.name: [] for endpoint in selected}
+    with unthrottled():
+        for endpoint in selected:
+            with CaptureQueriesContext(connection) as queries:
+                response = endpoint.request(client, -1)
+            results[endpoint.name]["queries"] = len(queries)
+            results[endpoint.name]["status"] = response.status_code
+
+        for endpoint in selected:
+            tracemalloc.start()
+            endpoint.request(client, -2)
+            results[endpoint.name]["peak_memory_kib"] = round(
+                tracemalloc.get_traced_memory()[1] / 1024, 1
+            )
+            tracemalloc.stop()
+
+        for iteration in range(iterations):
+            for endpoint in selected:
+                start = time.perf_counter()
+                endpoint.request(client, iteration)
+                timings[endpoint.name].append((time.perf_counter() - start) * 1000)
+
+    for name, values in timings.items():
+        if values:
+            results[name].update(
+                {
+                    "p50_ms": round(percentile(values, 50), 3),
+                    "p95_ms": round(percentile(values, 95), 3),
+                    "p99_ms": round(percentile(values, 99), 3),
+                    "mean_ms": round(sum(values) / len(values), 3),
+                }
+            )
+
+    return {
+        "meta": {
+            "iterations": iterations,
+            "user": user.id,
+            "user_entries": user.entries.count(),
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+        },
+        "endpoints": results,
+    }
+
+
+def timer_workers(concurrency):
+    """
+    (token, task id) pairs of distinct users so concurrent workers don't
+    fight over one running timer.
+    """
+    workers = []
+    for token in Token.objects.select_related("user").order_by("user_id"):
+        task = token.user.tasks.order_by("id").first()
+        if task is not None:
+            workers.append((token.key, task.id))
+        if len(workers) == concurrency:
+            return workers
+    raise ValueError(f"Need {concurrency} users with tasks, run seed_benchmark.")
+
+
+def summary(statuses, seconds):
+    return {
+        "requests": len(statuses),
+        "errors": sum(1 for code in statuses if code >= 500),
+        "seconds": round(seconds, 3),
+        "requests_per_second": round(len(statuses) / seconds, 1),
+    }
+
+
+def wsgi_throughput(workers, pairs):
+    """
+    Start/stop ``pairs`` timers per worker through the DRF views, one
+    thread per worker like a threaded WSGI server.
+    """
+
+    statuses = []
+
+    def work(token, task_id):
+        client = Client(
+            HTTP_HOST=host(),
+            HTTP_AUTHORIZATION=f"Token {token}",
+            raise_request_exception=False,
+        )
+        try:
+            for _ in range(pairs):
+                for action in ["start", "end"]:
+                    response = client.post(f"/projects/tasks/{task_id}/{action}/")
+                    statuses.append(response.status_code)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=work, args=worker) for worker in workers]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summary(statuses, time.perf_counter() - start)
+
+
+async def asgi_throughput(workers, pairs):
+    """
+    Start/stop ``pairs`` timers per worker through the async views, all
+    workers sharing one event loop like an ASGI server.
+    """
+
+    statuses = []
+
+    async def work(token, task_id):
+        client = AsyncClient(raise_request_exception=False)
+        for _ in range(pairs):
+            for action in ["start", "end"]:
+                response = await client.post(
+                    f"/projects/async/tasks/{task_id}/{action}/",
+                    AUTHORIZATION=f"Token {token}",
+                )
+                statuses.append(response.status_code)
+
+    start = time.perf_counter()
+    # Django 4.0's AsyncClient always sends "Host: testserver"
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+        await asyncio.gather(*(work(*worker) for worker in workers))
+    return summary(statuses, time.perf_counter() - start)
+
+
+def compare_timers(pairs=100, concurrency=8):
+    """
+    Compare timer click throughput of the sync DRF views behind the WSGI
+    handler with the async views behind the ASGI handler, in-process.
+    """
+    workers = timer_workers(concurrency)
+    for token, task_id in workers:
+        models.Entry.objects.filter(task_id=task_id, is_tracked=True).delete()
+    with unthrottled():
+        wsgi = wsgi_throughput(workers, pairs)
+        asgi = async_to_sync(asgi_throughput)(workers, pairs)
+    return {
+        "meta": {
+            "pairs_per_worker": pairs,
+            "concurrency": concurrency,
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+        },
+        "wsgi": wsgi,
+        "asgi": asgi,
+    }
+
+
+def database_modes(concurrency):
+    """
+    Connection settings compared by ``compare_database_modes`` for the
+    configured database vendor.
+    """
+    if connection.vendor == "postgresql":
+        options = connection.settings_dict["OPTIONS"]
+        return {
+            "per-request": {"CONN_MAX_AGE": 0, "OPTIONS": {**options, "pool_size": 0}},
+            "persistent": {"CONN_MAX_AGE": 60, "OPTIONS": {**options, "pool_size": 0}},
+            "pooled": {
+                "CONN_MAX_AGE": 0,
+                "OPTIONS": {**options, "pool_size": concurrency},
+            },
+        }
+    return {
+        # the journal mode sticks to the file, so set Django's default back
+        "default": {"OPTIONS": {"pragmas": {"journal_mode": "DELETE"}}},
+        "tuned": {"OPTIONS": settings.SQLITE_TUNED_OPTIONS},
+    }
+
+
+@contextmanager
+def database_mode(overrides):
+    """
+    Open new connections of every thread with ``overrides`` applied to the
+    default database settings.
+    """
+    settings_dict = connections.settings[DEFAULT_DB_ALIAS]
+    saved = {key: settings_dict[key] for key in overrides}
+    connections.close_all()
+    settings_dict.update(overrides)
+    try:
+        yield
+    finally:
+        connections.close_all()
+        settings_dict.update(saved)
+
+
+def compare_database_modes(pairs=100, concurrency=8):
+    """
+    Compare concurrent write throughput, timer starts and stops through the
+    DRF views from one thread per worker, under each connection mode of
+    the configured database.
+    """
+    workers = timer_workers(concurrency)
+    results = {}
+    for name, overrides in database_modes(concurrency).items():
+        with database_mode(overrides), unthrottled():
+            for token, task_id in workers:
+                models.Entry.objects.filter(task_id=task_id, is_tracked=True).delete()
+            results[name] = wsgi_throughput(workers, pairs)
+    return {
+        "meta": {
+            "pairs_per_worker": pairs,
+            "concurrency": concurrency,
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+        },
+        "modes": results,
+    }
+
+
+def serializer_datasets(tasks, entries):
+    """
+    In-memory rows of ``tasks`` tasks and ``entries`` entries as the list
+    endpoints fetch them: (model, serializers, row keys, row tuples).
+    """
+    start = timezone.now() - timedelta(days=365)
+    statuses = [status for status, _ in models.Task.CHOICES_STATUS]
+    task_keys = serializers.TaskValuesSerializer.values()
+    entry_keys = serializers.EntryValuesSerializer.values()
+    task_rows = [
+        {
+            "id": i,
+            "total_minutes": i * 7 % 600,
+            "version": i,
+            "title": f"Task {i} – ünïcode",
+            "created_at": start + timedelta(seconds=i, microseconds=i),
+            "status": statuses[i % len(statuses)],
+            "project_id": i % 50 + 1,
+            "user_id": 1,
+        }
+        for i in range(1, tasks + 1)
+    ]
+    entry_rows = [
+        {
+            "id": i,
+            "version": i,
+            "minutes": i % 240,
+            "is_tracked": False,
+            "created_at": start + timedelta(minutes=i),
+            "project_id": i % 50 + 1 if i % 10 else None,
+            "task_id": i % tasks + 1 if tasks and i % 10 else None,
+            "created_by_id": 1,
+        }
+        for i in range(1, entries + 1)
+    ]
+    return {
+        "tasks": (
+            models.Task,
+            serializers.TaskSerializer,
+            serializers.TaskValuesSerializer,
+            task_keys,
+            [tuple(row[key] for key in task_keys) for row in task_rows],
+        ),
+        "entries": (
+            models.Entry,
+            serializers.EntrySerializer,
+            serializers.EntryValuesSerializer,
+            entry_keys,
+            [tuple(row[key] for key in entry_keys) for row in entry_rows],
+        ),
+    }
+
+
+def model_path(model, serializer_class, keys, rows):
+    # what ModelIterable does: from_db() per row, then annotations
+    fields = [field.attname for field in model._meta.concrete_fields]
+    positions = [keys.index(field) for field in fields]
+    annotations = [(key, keys.index(key)) for key in keys if key not in fields]
+    instances = []
+    for row in rows:
+        instance = model.from_db(
+            DEFAULT_DB_ALIAS, fields, [row[position] for position in positions]
+        )
+        for name, position in annotations:
+            setattr(instance, name, row[position])
+        instances.append(instance)
+    return serializer_class(instances, many=True).data
+
+
+def values_path(serializer_class, keys, rows):
+    # what ValuesIterable does: a dict per row
+    return serializer_class([dict(zip(keys, row)) for row in rows]).data
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, round((time.perf_counter() - start) * 1000, 3)
+
+
+def compare_serializers(tasks=10000, entries=100000):
+    """
+    Serialize and render the same task and entry rows through the model
+    serializers with ``JSONRenderer`` and through the ``values()``
+    serializers with ``FastJSONRenderer``, and check the bytes match.
+    """
+    results = {}
+    datasets = serializer_datasets(tasks, entries)
+    for name, (model, slow, fast, keys, rows) in datasets.items():
+        data, serialize_ms = timed(model_path, model, slow, keys, rows)
+        slow_content, render_ms = timed(JSONRenderer().render, data)
+        model_result = {"serialize_ms": serialize_ms, "render_ms": render_ms}
+
+        data, serialize_ms = timed(values_path, fast, keys, rows)
+        fast_content, render_ms = timed(renderers.FastJSONRenderer().render, data)
+        values_result = {"serialize_ms": serialize_ms, "render_ms": render_ms}
+
+        total = values_result["serialize_ms"] + values_result["render_ms"]
+        results[name] = {
+            "rows": len(rows),
+            "bytes": len(slow_content),
+            "identical": slow_content == fast_content,
+            "model_serializer": model_result,
+            "values_serializer": values_result,
+            "speedup": round(
+                (model_result["serialize_ms"] + model_result["render_ms"])
+                / max(total, 0.001),
+                2,
+            ),
+        }
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "orjson": getattr(renderers.orjson, "__version__", None),
+        },
+        **results,
+    }
+
+
+def compare_throttling(iterations=10000):
+    """
+    Time the token bucket check on its own and a throttled endpoint with
+    and without throttling, and count the queries the check makes. The
+    endpoint is the projects list answered with 304, so little else runs.
+    """
+    user = heaviest_user()
+    token = Token.objects.get(user=user).key
+    request = APIRequestFactory().get("/projects/")
+    request.user = user
+    view = type("View", (), {"throttle_scope": "list"})
+    budget = {"list": f"{iterations * 10}/s"}
+
+    throttle = TokenBucketThrottle()
+    with throttle_rates(budget), CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            throttle.allow_request(request, view)
+        check_us = (time.perf_counter() - start) / iterations * 1_000_000
+
+    client = Client(HTTP_HOST=host(), HTTP_AUTHORIZATION=f"Token {token}")
+    etag = client.get("/projects/")["ETag"]
+    requests = max(iterations // 10, 1)
+    endpoint = {"path": "/projects/", "requests": requests}
+    for name, rates in [("unthrottled", None), ("throttled", budget)]:
+        with throttle_rates(rates or {}):
+            start = time.perf_counter()
+            for _ in range(requests):
+                response = client.get("/projects/", HTTP_IF_NONE_MATCH=etag)
+            elapsed = time.perf_counter() - start
+        endpoint["status"] = response.status_code
+        endpoint[f"{name}_mean_ms"] = round(elapsed / requests * 1000, 4)
+    endpoint["overhead_ms"] = round(
+        endpoint["throttled_mean_ms"] - endpoint["unthrottled_mean_ms"], 4
+    )
+
+    return {
+        "meta": {
+            "cache": settings.CACHES["default"]["BACKEND"],
+            "python": platform.python_version(),
+            "django": django.get_version(),
+        },
+        "check": {
+            "iterations": iterations,
+            "mean_us": round(check_us, 3),
+            "queries": len(queries),
+        },
+        "endpoint": endpoint,
+    }
+
+
+def compare_search(queries=100, page_size=20):
+    """
+    Time title searches of the user with the most tasks through the title
+    search index and through the ``icontains`` scan clients would need
+    otherwise, for prefixes of words found in their titles.
+    """
+    user = (
+        models.User.objects.annotate(count=Count("tasks"))
+        .order_by("-count", "id")
+        .first()
+    )
+    rng = random.Random(0)
+    titles = models.Task.objects.filter(user=user).values_list("title", flat=True)
+    words = [
+        word for title in titles[:1000] for word in search.terms(title) if len(word) > 2
+    ]
+    prefixes = [rng.choice(words)[: rng.randint(3, 5)] for _ in range(queries)]
+
+    def scan(prefix):
+        return [
+            *models.Project.objects.filter(user=user, title__icontains=prefix)
+            .order_by("title")
+            .values_list("id", "title")[:page_size],
+            *models.Task.objects.filter(user=user, title__icontains=prefix)
+            .order_by("title")
+            .values_list("id", "title")[:page_size],
+        ]
+
+    def indexed(prefix):
+        return search.search(user, prefix, limit=page_size)
+
+    results = {}
+    for name, function in [("icontains", scan), ("index", indexed)]:
+        timings = []
+        for prefix in prefixes:
+            start = time.perf_counter()
+            function(prefix)
+            timings.append((time.perf_counter() - start) * 1000)
+        results[name] = {
+            "mean_ms": round(sum(timings) / len(timings), 3),
+            "p95_ms": round(percentile(timings, 95), 3),
+        }
+    return {
+        "meta": {
+            "database": connection.vendor,
+            "tasks": models.Task.objects.count(),
+            "user_tasks": user.count,
+            "queries": queries,
+            "page_size": page_size,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+        },
+        **results,
+    }
@@ -0,0 +1,160 @@
+from django.db import transaction
+
+from project import models, timers, versions
+
+# ids per statement, well under the bound parameters SQLite allows
+BATCH_SIZE = 1000
+
+
+def tasks(user, ids=None, project=None, status=None, created_before=None):
+    """
+    Return the user's tasks with one of ``ids``, or matching every filter
+    given.
+    """
+    queryset = models.Task.objects.filter(user=user)
+    if ids is not None:
+        return queryset.filter(id__in=ids)
+    if project is not None:
+        queryset = queryset.filter(project_id=project)
+    if status is not None:
+        queryset = queryset.filter(status=status)
+    if created_before is not None:
+        queryset = queryset.filter(created_at__lt=created_before)
+    return queryset
+
+
+def set_status(user, queryset, status):
+    """
+    Set the status of the tasks in ``queryset`` with a single UPDATE.
+    """
+    with transaction.atomic():
+        version = versions.bump(user.id)
+        updated = queryset.update(status=status, version=version)
+    return {"tasks": updated, "entries": 0}
+
+
+def move(user, queryset, project):
+    """
+    Move the tasks in ``queryset`` to the user's ``project``, taking their
+    live and archived entries and rollups along so project totals stay
+    right.
+    """
+    task_ids = queryset.values("id")
+    with transaction.atomic():
+        version = versions.bump(user.id)
+        entries = models.Entry.objects.filter(task__in=task_ids).update(
+            project_id=project, version=version
+        )
+        models.ArchivedEntry.objects.filter(task__in=task_ids).update(
+            project_id=project
+        )
+        models.DailyRollup.objects.filter(task__in=task_ids).update(project_id=project)
+        updated = queryset.update(project_id=project, version=version)
+        # the running timer's state names the old project
+        transaction.on_commit(lambda: timers.forget(user.id))
+    return {"tasks": updated, "entries": entries}
+
+
+def batches(ids, size=None):
+    size = size or BATCH_SIZE
+    for start in range(0, len(ids), size):
+        yield ids[start : start + size]
+
+
+def delete(user, queryset):
+    """
+    Delete the tasks in ``queryset`` with their entries and rollups,
+    leaving tombstones for sync clients. Each table is one statement per
+    batch of ids rather than the per-row cascade and signals of
+    ``QuerySet.delete()``.
+
+    The tasks are locked and every delete goes by the ids read under that
+    lock, so a row that starts matching the filter meanwhile is never
+    deleted without its tombstone.
+    """
+    with transaction.atomic():
+        version = versions.bump(user.id)
+        # on PostgreSQL the lock also holds off new entries on these tasks
+        deleted_tasks = list(
+            queryset.order_by().select_for_update().values_list("id", flat=True)
+        )
+        counts = purge(user, version, [], deleted_tasks)
+    return {"tasks": counts["tasks"], "entries": counts["entries"]}
+
+
+def delete_projects(user, queryset):
+    """
+    Delete the projects in ``queryset`` with their tasks, entries and
+    rollups the way ``delete`` deletes tasks.
+    """
+    with transaction.atomic():
+        version = versions.bump(user.id)
+        deleted_projects = list(
+            queryset.order_by().select_for_update().values_list("id", flat=True)
+        )
+        deleted_tasks = []
+        for project_ids in batches(deleted_projects):
+            deleted_tasks += (
+                models.Task.objects.filter(project__in=project_ids)
+                .order_by()
+                .select_for_update()
+                .values_list("id", flat=True)
+            )
+        return purge(user, version, deleted_projects, deleted_tasks)
+
+
+def purge(user, version, project_ids, task_ids):
+    """
+    Delete the projects and tasks of ``project_ids`` and ``task_ids``,
+    which the caller locked, with everything referencing them, stamping
+    their tombstones with ``version``.
+    """
+    # entries without a task hang off their project only
+    deleted_entries = {}
+    for field, ids in [("project__in", project_ids), ("task__in", task_ids)]:
+        for batch in batches(ids):
+            entries = models.Entry.objects.filter(**{field: batch}).order_by()
+            for entry_id, created_by_id, is_tracked in entries.values_list(
+                "id", "created_by_id", "is_tracked"
+            ):
+                deleted_entries[entry_id] = (created_by_id, is_tracked)
+    models.Tombstone.objects.bulk_create(
+        [
+            models.Tombstone(
+                user_id=user.id, kind=kind, object_id=object_id, version=version
+            )
+            for kind, ids in [("project", project_ids), ("task", task_ids)]
+            for object_id in ids
+        ]
+        + [
+            models.Tombstone(
+                user_id=created_by_id,
+                kind="entry",
+                object_id=entry_id,
+                version=version,
+            )
+            for entry_id, (created_by_id, _) in deleted_entries.items()
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    for field, ids in [("project__in", project_ids), ("task__in", task_ids)]:
+        for batch in batches(ids):
+            models.DailyRollup.objects.filter(**{field: batch}).delete()
+            # archived entries were never synced as such, clients drop them
+            # with their task
+            models.ArchivedEntry.objects.filter(**{field: batch}).delete()
+    # _raw_delete skips the collector, the rows above are all that
+    # reference these tasks and projects
+    counts = {}
+    for kind, model, ids in [
+        ("entries", models.Entry, list(deleted_entries)),
+        ("tasks", models.Task, task_ids),
+        ("projects", models.Project, project_ids),
+    ]:
+        counts[kind] = 0
+        for batch in batches(ids):
+            rows = model.objects.filter(id__in=batch)
+            counts[kind] += rows._raw_delete(rows.db)
+    if any(is_tracked for _, is_tracked in deleted_entries.values()):
+        transaction.on_commit(lambda: timers.forget(user.id))
+    return counts
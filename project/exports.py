@@ -0,0 +1,100 @@
+import csv
+import heapq
+import json
+from datetime import datetime, time, timedelta
+from operator import itemgetter
+
+from django.conf import settings
+from django.db.models import BooleanField, Value
+from django.utils import timezone
+
+from project import models
+
+FIELDS = [
+    "id",
+    "created_at",
+    "minutes",
+    "is_tracked",
+    "project_id",
+    "project__title",
+    "task_id",
+    "task__title",
+    "task__status",
+]
+HEADER = [field.replace("__", "_") for field in FIELDS]
+CONTENT_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def day_start(day):
+    """
+    Return the aware start of ``day`` in the current time zone.
+    """
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def entries(user, start=None, end=None, project=None, task=None, status=None):
+    """
+    Return querysets of the user's live and archived entries matching the
+    export filters, as rows of ``FIELDS`` in chronological order.
+    """
+    filters = {"created_by": user}
+    if start is not None:
+        filters["created_at__gte"] = day_start(start)
+    if end is not None:
+        filters["created_at__lt"] = day_start(end + timedelta(days=1))
+    if project is not None:
+        filters["project_id"] = project
+    if task is not None:
+        filters["task_id"] = task
+    if status is not None:
+        filters["task__status"] = status
+    return [
+        models.Entry.objects.filter(**filters),
+        # archived entries are never tracked
+        models.ArchivedEntry.objects.filter(**filters).annotate(
+            is_tracked=Value(False, output_field=BooleanField())
+        ),
+    ]
+
+
+class Echo:
+    """
+    File-like object handing back what is written, for csv.writer.
+    """
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(HEADER)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        record = dict(zip(HEADER, row))
+        record["created_at"] = record["created_at"].isoformat()
+        yield json.dumps(record) + "\n"
+
+
+def lines(querysets, output, chunk_size=None):
+    """
+    Stream an export of the ``entries`` querysets as CSV or NDJSON lines,
+    merged in order and fetched ``chunk_size`` rows at a time.
+    """
+    chunk_size = chunk_size or settings.ENTRY_EXPORT_CHUNK_SIZE
+    rows = heapq.merge(
+        *(
+            queryset.order_by("created_at", "id")
+            .values_list(*FIELDS)
+            .iterator(chunk_size=chunk_size)
+            for queryset in querysets
+        ),
+        key=itemgetter(1, 0),
+    )
+    if output == "ndjson":
+        return ndjson_lines(rows)
+    return csv_lines(rows)
@@ -1,4 +1,5 @@
 import factory
+from django.utils import timezone
 
 from project import models
 
@@ -9,3 +10,25 @@ class ProjectFactory(factory.django.DjangoModelFactory):
 
     title = factory.Faker("name")
     user = None
+
+
+class TaskFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = models.Task
+
+    title = factory.Faker("sentence", nb_words=4)
+    user = None
+    project = factory.SubFactory(ProjectFactory, user=factory.SelfAttribute("..user"))
+
+
+class EntryFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = models.Entry
+
+    task = None
+    project = factory.SelfAttribute("task.project")
+    created_by = factory.SelfAttribute("task.user")
+    minutes = factory.Faker("random_int", min=1, max=240)
+    created_at = factory.Faker(
+        "date_time_this_year", tzinfo=timezone.get_default_timezone()
+    )
@@ -0,0 +1,79 @@
+from itertools import islice
+
+from django.db import transaction
+
+from project import models, rollups, serializers, versions
+
+
+def batches(rows, size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def owned_ids(rows, field):
+    """
+    Collect the ids a batch refers to so ownership is checked with one
+    query per batch instead of one per row.
+    """
+    ids = set()
+    for row in rows:
+        if isinstance(row, dict):
+            try:
+                ids.add(int(row.get(field)))
+            except (TypeError, ValueError):
+                pass
+    return ids
+
+
+def import_entries(user, rows, batch_size):
+    """
+    Validate and insert closed entries for ``user`` in batches of
+    ``batch_size``, each in its own transaction. Invalid rows are reported
+    by their position and don't stop the import.
+    """
+    result = {"created": 0, "errors": []}
+    offset = 0
+    for batch in batches(rows, batch_size):
+        context = {
+            "tasks": dict(
+                user.tasks.filter(id__in=owned_ids(batch, "task")).values_list(
+                    "id", "project_id"
+                )
+            ),
+            "projects": set(
+                user.projects.filter(id__in=owned_ids(batch, "project")).values_list(
+                    "id", flat=True
+                )
+            ),
+        }
+        entries = []
+        for index, row in enumerate(batch, start=offset):
+            serializer = serializers.EntryImportSerializer(data=row, context=context)
+            if not serializer.is_valid():
+                result["errors"].append({"row": index, "errors": serializer.errors})
+                continue
+            data = serializer.validated_data
+            entries.append(
+                models.Entry(
+                    project_id=data.get("project"),
+                    task_id=data.get("task"),
+                    minutes=data.get("minutes", 0),
+                    created_at=data["created_at"],
+                    created_by=user,
+                )
+            )
+        offset += len(batch)
+
+        with transaction.atomic():
+            # bulk_create skips Entry.save(), stamp the batch's version here
+            version = versions.bump(user.id)
+            for entry in entries:
+                entry.version = version
+            models.Entry.objects.bulk_create(entries, batch_size=batch_size)
+            rollups.entries_created(entries)
+        result["created"] += len(entries)
+    return result
@@ -0,0 +1,143 @@
+import logging
+import os
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from project import exports, models, reports, serializers
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = {"json": "application/json", **exports.CONTENT_TYPES}
+
+
+def filters(kind, params):
+    """
+    Validate a job's parameters like the query parameters of the matching
+    endpoint. Raises ``ValidationError``.
+    """
+    serializer = serializers.JobSerializer.filters[kind](data=params)
+    serializer.is_valid(raise_exception=True)
+    return dict(serializer.validated_data)
+
+
+def result_path(job):
+    return Path(settings.JOB_RESULTS_DIR) / job.result
+
+
+def content_type(job):
+    return CONTENT_TYPES[job.result.rsplit(".", 1)[-1]]
+
+
+def generate(job):
+    """
+    Return the result file name of the job and the chunks to write to it.
+    """
+    params = filters(job.kind, job.params)
+    if job.kind == "report":
+        data = reports.summary(job.user, **params)
+        return f"{job.id}.json", [JSONRenderer().render(data)]
+
+    output = params.pop("output")
+    querysets = exports.entries(job.user, **params)
+    return f"{job.id}.{output}", exports.lines(querysets, output)
+
+
+def run(job):
+    """
+    Generate the job's result file and record the outcome. Each attempt
+    writes its own temporary file, moved in place only while the job is
+    still claimed by this attempt, so downloads never see half of it and
+    a worker whose job was requeued as stale can't overwrite the newer
+    run.
+    """
+    # the claim this attempt made, lost once the job is requeued
+    jobs = models.Job.objects.filter(
+        id=job.id, status=models.Job.RUNNING, started_at=job.started_at
+    )
+    partial = None
+    try:
+        filename, chunks = generate(job)
+        path = Path(settings.JOB_RESULTS_DIR) / filename
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=path.parent, prefix=f"{filename}.", suffix=".part", delete=False
+        ) as result_file:
+            partial = result_file.name
+            for chunk in chunks:
+                result_file.write(chunk if isinstance(chunk, bytes) else chunk.encode())
+        with transaction.atomic():
+            claimed = jobs.update(
+                status=models.Job.DONE, result=filename, finished_at=timezone.now()
+            )
+            if claimed:
+                os.replace(partial, path)
+                partial = None
+    except Exception as error:
+        logger.exception("Job %s failed", job.id)
+        jobs.update(
+            status=models.Job.FAILED, error=str(error), finished_at=timezone.now()
+        )
+        return False
+    finally:
+        if partial is not None:
+            Path(partial).unlink(missing_ok=True)
+    return bool(claimed)
+
+
+def claim():
+    """
+    Mark the oldest queued job as running and return it, or None when the
+    queue is empty. Claiming is a conditional update rather than a row
+    lock, which SQLite lacks, so concurrent workers never share a job.
+    """
+    queued = models.Job.objects.filter(status=models.Job.QUEUED)
+    while True:
+        job = queued.select_related("user").order_by("created_at", "id").first()
+        if job is None:
+            return None
+        job.started_at = timezone.now()
+        if queued.filter(id=job.id).update(
+            status=models.Job.RUNNING, started_at=job.started_at
+        ):
+            job.status = models.Job.RUNNING
+            return job
+
+
+def requeue_stale():
+    """
+    Queue again the jobs running for longer than ``JOB_STALE_AFTER``
+    seconds, whose worker must have died.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.JOB_STALE_AFTER)
+    return models.Job.objects.filter(
+        status=models.Job.RUNNING, started_at__lt=cutoff
+    ).update(status=models.Job.QUEUED, started_at=None)
+
+
+def work(poll_interval=None, burst=False):
+    """
+    Run queued jobs one after another, waiting ``poll_interval`` seconds
+    whenever the queue is empty, or returning then when ``burst`` is set.
+    Returns the number of jobs run.
+    """
+    poll_interval = poll_interval or settings.JOB_POLL_INTERVAL
+    processed = 0
+    while True:
+        job = claim()
+        if job is None:
+            if burst:
+                return processed
+            requeue_stale()
+            # don't hold a connection open while idle
+            connections.close_all()
+            time.sleep(poll_interval)
+            continue
+        run(job)
+        processed += 1
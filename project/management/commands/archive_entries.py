@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from project import archive
+
+
+class Command(BaseCommand):
+    help = "Move old finished entries into the archive table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            help="Archive entries older than this many days (ENTRY_ARCHIVE_DAYS).",
+        )
+        parser.add_argument(
+            "--no-age-cutoff",
+            action="store_true",
+            help="Archive by --archived-tasks only, whatever the entries' age.",
+        )
+        parser.add_argument(
+            "--archived-tasks",
+            action="store_true",
+            help="Also archive the entries of archived tasks, whatever their age.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Entries moved per transaction (ENTRY_ARCHIVE_BATCH_SIZE).",
+        )
+
+    def handle(self, *args, **options):
+        before = None
+        if options["no_age_cutoff"]:
+            if options["days"] is not None or not options["archived_tasks"]:
+                raise CommandError(
+                    "--no-age-cutoff needs --archived-tasks and no --days."
+                )
+        else:
+            before = archive.cutoff(options["days"])
+        moved = archive.archive(
+            before=before,
+            archived_tasks=options["archived_tasks"],
+            batch_size=options["batch_size"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} entries."))
@@ -0,0 +1,36 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from project import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent write throughput of the database connection "
+        "modes in-process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--pairs", type=int, default=100, help="Start/stop pairs per worker."
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=8, help="Concurrent clients."
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        try:
+            report = benchmark.compare_database_modes(
+                options["pairs"], options["concurrency"]
+            )
+        except ValueError as error:
+            raise CommandError(error)
+
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options["output"]:
+            with open(options["output"], "w") as report_file:
+                report_file.write(output + "\n")
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,25 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from project import benchmark
+
+
+class Command(BaseCommand):
+    help = "Compare title search through the search index with an icontains scan."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--queries", type=int, default=100, help="Searches timed per method."
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        report = benchmark.compare_search(options["queries"])
+
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options["output"]:
+            with open(options["output"], "w") as report_file:
+                report_file.write(output + "\n")
+        else:
+            self.stdout.write(output)
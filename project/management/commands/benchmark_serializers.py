@@ -0,0 +1,29 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from project import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare serializing and rendering tasks and entries through the model "
+        "serializers and the values() serializers in-process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=10000, help="Number of tasks.")
+        parser.add_argument(
+            "--entries", type=int, default=100000, help="Number of entries."
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        report = benchmark.compare_serializers(options["tasks"], options["entries"])
+
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options["output"]:
+            with open(options["output"], "w") as report_file:
+                report_file.write(output + "\n")
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,25 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from project import benchmark
+
+
+class Command(BaseCommand):
+    help = "Measure the per-request overhead of the token bucket throttle."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations", type=int, default=10000, help="Throttle checks timed."
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        report = benchmark.compare_throttling(options["iterations"])
+
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options["output"]:
+            with open(options["output"], "w") as report_file:
+                report_file.write(output + "\n")
+        else:
+            self.stdout.write(output)
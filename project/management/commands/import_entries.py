@@ -0,0 +1,51 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from project import imports, parsers
+
+
+class Command(BaseCommand):
+    help = "Import closed time entries for a user from a JSON or NDJSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, '.json' or '.ndjson'.")
+        parser.add_argument("--user", type=int, required=True, help="Owner id.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.ENTRY_IMPORT_BATCH_SIZE,
+            help="Rows inserted per transaction.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=["json", "ndjson"],
+            help="Input format, guessed from the file extension by default.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(id=options["user"])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['user']} does not exist.")
+
+        path = options["path"]
+        fmt = options["format"] or ("json" if path.endswith(".json") else "ndjson")
+        with open(path, encoding="utf-8") as lines:
+            if fmt == "json":
+                # a JSON array has to be loaded whole, use NDJSON for big files
+                rows = json.load(lines)
+            else:
+                rows = parsers.read_ndjson(lines)
+            result = imports.import_entries(user, rows, options["batch_size"])
+
+        for error in result["errors"]:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result['created']} entries, "
+                f"{len(result['errors'])} rows rejected."
+            )
+        )
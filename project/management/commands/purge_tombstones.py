@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from project import sync
+
+
+class Command(BaseCommand):
+    help = "Delete the sync tombstones of rows deleted long ago."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            help="Keep tombstones this many days (SYNC_TOMBSTONE_DAYS).",
+        )
+
+    def handle(self, *args, **options):
+        deleted = sync.purge_tombstones(options["days"])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} tombstones."))
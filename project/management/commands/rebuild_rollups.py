@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from project import rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily time rollups from the raw entries."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="users",
+            help="Only repair the rollups of this user id (repeatable).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Number of users rebuilt per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        written = rollups.rebuild(
+            user_ids=options["users"], chunk_size=options["chunk_size"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} rollup buckets."))
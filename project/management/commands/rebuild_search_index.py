@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from project import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the project and task title search index."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database whose index is rebuilt.",
+        )
+
+    def handle(self, *args, **options):
+        search.rebuild(options["database"])
+        self.stdout.write(self.style.SUCCESS("Rebuilt the title search index."))
@@ -0,0 +1,44 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from project import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the API in-process and report latency percentiles, queries "
+        "per request and peak memory per endpoint as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=int,
+            help="User to run as, the one with the most entries by default.",
+        )
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument(
+            "--endpoint",
+            action="append",
+            dest="endpoints",
+            help="Only run this endpoint, e.g. 'timer:start' (repeatable).",
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        if options["user"] is not None:
+            user = User.objects.filter(id=options["user"]).first()
+        else:
+            user = benchmark.heaviest_user()
+        if user is None or not user.tasks.exists():
+            raise CommandError("No user with tasks to benchmark, run seed_benchmark.")
+
+        report = benchmark.run(user, options["iterations"], options["endpoints"])
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options["output"]:
+            with open(options["output"], "w") as report_file:
+                report_file.write(output + "\n")
+        else:
+            self.stdout.write(output)
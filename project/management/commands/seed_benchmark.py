@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from project import seed
+
+
+class Command(BaseCommand):
+    help = "Bulk-generate a realistic, skewed dataset for benchmarking."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--entries", type=int, default=100000)
+        parser.add_argument(
+            "--projects", type=int, default=10, help="Most projects per user."
+        )
+        parser.add_argument(
+            "--tasks", type=int, default=20, help="Most tasks per project."
+        )
+        parser.add_argument(
+            "--days", type=int, default=365, help="Days of history to spread over."
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        users = seed.seed(
+            options["users"],
+            options["entries"],
+            projects=options["projects"],
+            tasks=options["tasks"],
+            days=options["days"],
+            batch_size=options["batch_size"],
+            seed=options["seed"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {len(users)} users and {options['entries']} entries, "
+                f"password '{seed.PASSWORD}'."
+            )
+        )
@@ -0,0 +1,54 @@
+# Generated by Django 4.0.1 on 2026-10-18 18:44
+
+from django.db import migrations, models
+
+
+def stop_duplicate_timers(apps, schema_editor):
+    """
+    Keep only the latest running timer of each user so the unique
+    constraint can be created.
+    """
+    Entry = apps.get_model('project', 'Entry')
+    seen = set()
+    duplicates = []
+    tracked = Entry.objects.filter(is_tracked=True).order_by('created_by', '-created_at')
+    for pk, user_id in tracked.values_list('pk', 'created_by'):
+        if user_id in seen:
+            duplicates.append(pk)
+        seen.add(user_id)
+    Entry.objects.filter(pk__in=duplicates).update(is_tracked=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0004_dailyrollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='entry',
+            index=models.Index(fields=['created_by', '-created_at'], name='entry_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='entry',
+            index=models.Index(fields=['task', '-created_at'], name='entry_task_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='entry',
+            index=models.Index(fields=['project', '-created_at'], name='entry_project_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['user', 'title'], name='project_user_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', '-created_at'], name='task_user_created_idx'),
+        ),
+        migrations.RunPython(stop_duplicate_timers, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='entry',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_tracked', True)), fields=('created_by',), name='one_tracked_entry_per_user'),
+        ),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 4.0.1 on 2026-10-18 20:05
+
+from django.db import migrations
+
+# The title search index as this migration creates it, inline so later
+# changes to project.search don't change what it does.
+TABLE = 'project_title_search'
+SOURCES = [
+    # (kind, table, rowid of a row)
+    ('project', 'project_project', '{row}.id * 2'),
+    ('task', 'project_task', '{row}.id * 2 + 1'),
+]
+
+
+def create_sqlite(cursor):
+    cursor.execute(
+        f"CREATE VIRTUAL TABLE {TABLE} USING fts5(title, owner, "
+        "prefix='1 2 3 4', tokenize='unicode61 remove_diacritics 2')"
+    )
+    for kind, table, rowid in SOURCES:
+        insert = (
+            f"INSERT INTO {TABLE} (rowid, title, owner) VALUES "
+            f"({rowid.format(row='new')}, new.title, CAST(new.user_id AS TEXT));"
+        )
+        delete = f"DELETE FROM {TABLE} WHERE rowid = {rowid.format(row='old')};"
+        cursor.execute(
+            f"CREATE TRIGGER {TABLE}_{kind}_insert AFTER INSERT ON {table} "
+            f"BEGIN {insert} END"
+        )
+        cursor.execute(
+            f"CREATE TRIGGER {TABLE}_{kind}_update "
+            f"AFTER UPDATE OF title, user_id ON {table} "
+            f"BEGIN {delete} {insert} END"
+        )
+        cursor.execute(
+            f"CREATE TRIGGER {TABLE}_{kind}_delete AFTER DELETE ON {table} "
+            f"BEGIN {delete} END"
+        )
+        cursor.execute(
+            f"INSERT INTO {TABLE} (rowid, title, owner) "
+            f"SELECT {rowid.format(row=table)}, title, CAST(user_id AS TEXT) "
+            f"FROM {table}"
+        )
+    cursor.execute(f"INSERT INTO {TABLE} ({TABLE}) VALUES ('optimize')")
+
+
+def drop_sqlite(cursor):
+    for kind, _, _ in SOURCES:
+        for event in ['insert', 'update', 'delete']:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {TABLE}_{kind}_{event}")
+    cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+
+def create_postgresql(cursor):
+    # like SQLite's remove_diacritics: words are unaccented, then lowercased
+    cursor.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    cursor.execute("CREATE TEXT SEARCH CONFIGURATION title_search (COPY = simple)")
+    cursor.execute(
+        "ALTER TEXT SEARCH CONFIGURATION title_search "
+        "ALTER MAPPING FOR hword, hword_part, word WITH unaccent, simple"
+    )
+    for _, table, _ in SOURCES:
+        cursor.execute(
+            f"CREATE INDEX {table}_title_search_idx "
+            f"ON {table} USING gin (to_tsvector('title_search', title))"
+        )
+
+
+def drop_postgresql(cursor):
+    for _, table, _ in SOURCES:
+        cursor.execute(f"DROP INDEX IF EXISTS {table}_title_search_idx")
+    cursor.execute("DROP TEXT SEARCH CONFIGURATION IF EXISTS title_search")
+
+
+def run(operations):
+    def operation(apps, schema_editor):
+        connection = schema_editor.connection
+        if connection.vendor not in operations:
+            raise NotImplementedError(f"No title search on {connection.vendor}.")
+        with connection.cursor() as cursor:
+            operations[connection.vendor](cursor)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0009_archived_entries'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({'sqlite': create_sqlite, 'postgresql': create_postgresql}),
+            run({'sqlite': drop_sqlite, 'postgresql': drop_postgresql}),
+        ),
+    ]
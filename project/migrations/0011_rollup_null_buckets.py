@@ -0,0 +1,55 @@
+# Generated by Django 4.0.1 on 2026-10-18 20:25
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Q, Sum
+
+
+def merge_duplicates(apps, schema_editor):
+    """
+    Fold rollups duplicated in buckets without a project or task into one
+    row, so the constraints below can be added.
+    """
+    DailyRollup = apps.get_model('project', 'DailyRollup')
+    duplicates = (
+        DailyRollup.objects.filter(Q(project__isnull=True) | Q(task__isnull=True))
+        .values('user', 'project', 'task', 'day')
+        .annotate(
+            count=Count('id'),
+            keep=Min('id'),
+            minutes_sum=Sum('minutes'),
+            entries_sum=Sum('entries'),
+        )
+        .filter(count__gt=1)
+    )
+    for bucket in duplicates:
+        rows = DailyRollup.objects.filter(
+            user=bucket['user'],
+            project=bucket['project'],
+            task=bucket['task'],
+            day=bucket['day'],
+        )
+        rows.exclude(id=bucket['keep']).delete()
+        rows.update(minutes=bucket['minutes_sum'], entries=bucket['entries_sum'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0010_title_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='dailyrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('project__isnull', False), ('task__isnull', True)), fields=('user', 'project', 'day'), name='unique_daily_rollup_no_task'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('project__isnull', True), ('task__isnull', False)), fields=('user', 'task', 'day'), name='unique_daily_rollup_no_project'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('project__isnull', True), ('task__isnull', True)), fields=('user', 'day'), name='unique_daily_rollup_no_project_task'),
+        ),
+    ]
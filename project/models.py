@@ -1,26 +1,99 @@
-from django.db import models
+from django.db import connections, models, router, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 
-class Project(models.Model):
+def _minutes_subquery(field):
+    """
+    Correlated subquery summing the rollup minutes for the outer row,
+    kept separate from other annotations to avoid join fan-out. Rollups
+    also hold the minutes of archived entries.
+    """
+    minutes = (
+        DailyRollup.objects.filter(**{field: OuterRef("pk")})
+        .order_by()
+        .values(field)
+        .annotate(total=Sum("minutes"))
+        .values("total")
+    )
+    return Coalesce(Subquery(minutes), 0)
+
+
+class ProjectQuerySet(models.QuerySet):
+    def with_registered_time(self):
+        return self.annotate(total_minutes=_minutes_subquery("project"))
+
+    def with_todo_count(self):
+        todo = (
+            Task.objects.filter(project=OuterRef("pk"), status="todo")
+            .order_by()
+            .values("project")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        return self.annotate(todo_count=Coalesce(Subquery(todo), 0))
+
+
+class TaskQuerySet(models.QuerySet):
+    def with_registered_time(self):
+        return self.annotate(total_minutes=_minutes_subquery("task"))
+
+
+class Versioned(models.Model):
+    """
+    Stamps each saved row with its owner's new version, in the transaction
+    of the write, so ``sync/`` can return the rows changed since a version.
+    """
+
+    owner_field = "user_id"
+
+    version = models.BigIntegerField(default=0, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, using=None, update_fields=None, **kwargs):
+        using = using or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            self.version = UserVersion.objects.using(using).bump(
+                getattr(self, self.owner_field)
+            )
+            if update_fields is not None:
+                update_fields = {*update_fields, "version"}
+            super().save(*args, using=using, update_fields=update_fields, **kwargs)
+
+
+class Project(Versioned):
     title = models.CharField(max_length=255)
     user = models.ForeignKey(User, related_name="projects", on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = ProjectQuerySet.as_manager()
+
     class Meta:
         ordering = ["title"]
+        indexes = [
+            models.Index(fields=["user", "title"], name="project_user_title_idx"),
+            models.Index(fields=["user", "version"], name="project_user_version_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
     def registered_time(self):
-        return sum(entry.minutes for entry in self.entries.all())
+        if hasattr(self, "total_minutes"):
+            return self.total_minutes
+        return self.rollups.aggregate(total=Coalesce(Sum("minutes"), 0))["total"]
 
     def num_tasks_todo(self):
+        if hasattr(self, "todo_count"):
+            return self.todo_count
         return self.tasks.filter(status="todo").count()
 
 
-class Task(models.Model):
+class Task(Versioned):
     CHOICES_STATUS = [("todo", "Todo"), ("done", "Done"), ("archived", "Archived")]
 
     project = models.ForeignKey(Project, related_name="tasks", on_delete=models.CASCADE)
@@ -29,17 +102,27 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=20, choices=CHOICES_STATUS, default="todo")
 
+    objects = TaskQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "-created_at"], name="task_user_created_idx"),
+            models.Index(fields=["user", "version"], name="task_user_version_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
     def registered_time(self):
-        return sum(entry.minutes for entry in self.entries.all())
+        if hasattr(self, "total_minutes"):
+            return self.total_minutes
+        return self.rollups.aggregate(total=Coalesce(Sum("minutes"), 0))["total"]
 
 
-class Entry(models.Model):
+class Entry(Versioned):
+    owner_field = "created_by_id"
+
     project = models.ForeignKey(
         Project, related_name="entries", on_delete=models.CASCADE, blank=True, null=True
     )
@@ -55,9 +138,234 @@ class Entry(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["created_by", "-created_at"], name="entry_user_created_idx"
+            ),
+            models.Index(fields=["task", "-created_at"], name="entry_task_created_idx"),
+            models.Index(
+                fields=["project", "-created_at"], name="entry_project_created_idx"
+            ),
+            models.Index(
+                fields=["created_by", "version"], name="entry_user_version_idx"
+            ),
+        ]
+        constraints = [
+            # doubles as the partial index used to find a user's running timer
+            models.UniqueConstraint(
+                fields=["created_by"],
+                condition=Q(is_tracked=True),
+                name="one_tracked_entry_per_user",
+            )
+        ]
 
     def __str__(self):
         if self.task:
             return f"{self.task.title} - {self.created_at}"
 
         return f"{self.created_at}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember what was loaded so rollups can reverse the old contribution
+        if models.DEFERRED not in values:
+            instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+
+class ArchivedEntry(models.Model):
+    """
+    A finished entry moved out of the entry table by ``archive_entries``.
+    It keeps its id and only the columns reports and exports read, and its
+    minutes stay in the daily rollups.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    project = models.ForeignKey(
+        Project,
+        related_name="archived_entries",
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+    )
+    task = models.ForeignKey(
+        Task,
+        related_name="archived_entries",
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+    )
+    minutes = models.IntegerField(default=0)
+    created_by = models.ForeignKey(
+        User, related_name="archived_entries", on_delete=models.CASCADE, db_index=False
+    )
+    created_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["created_by", "created_at"], name="archive_user_created_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.created_by_id} - {self.created_at}"
+
+
+class DailyRollup(models.Model):
+    """
+    Tracked minutes bucketed per day for a (user, project, task), kept
+    current from the entry signals and rebuilt by ``rebuild_rollups``.
+    """
+
+    user = models.ForeignKey(User, related_name="rollups", on_delete=models.CASCADE)
+    project = models.ForeignKey(
+        Project, related_name="rollups", on_delete=models.CASCADE, blank=True, null=True
+    )
+    task = models.ForeignKey(
+        Task, related_name="rollups", on_delete=models.CASCADE, blank=True, null=True
+    )
+    day = models.DateField()
+    minutes = models.IntegerField(default=0)
+    entries = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["-day"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "project", "task", "day"], name="unique_daily_rollup"
+            ),
+            # NULLs are distinct in the constraint above, buckets without a
+            # project or task need their own
+            models.UniqueConstraint(
+                fields=["user", "project", "day"],
+                condition=Q(project__isnull=False, task__isnull=True),
+                name="unique_daily_rollup_no_task",
+            ),
+            models.UniqueConstraint(
+                fields=["user", "task", "day"],
+                condition=Q(project__isnull=True, task__isnull=False),
+                name="unique_daily_rollup_no_project",
+            ),
+            models.UniqueConstraint(
+                fields=["user", "day"],
+                condition=Q(project__isnull=True, task__isnull=True),
+                name="unique_daily_rollup_no_project_task",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.day}: {self.minutes}"
+
+
+class Job(models.Model):
+    """
+    A report or export generated in the background by ``run_workers``,
+    its result written to a file under ``JOB_RESULTS_DIR``.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CHOICES_STATUS = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+    CHOICES_KIND = [("report", "Report"), ("export", "Export")]
+
+    user = models.ForeignKey(User, related_name="jobs", on_delete=models.CASCADE)
+    kind = models.CharField(max_length=20, choices=CHOICES_KIND)
+    params = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=CHOICES_STATUS, default=QUEUED)
+    error = models.TextField(blank=True)
+    result = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "-created_at"], name="job_user_created_idx"),
+            models.Index(
+                fields=["status", "created_at"], name="job_status_created_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.id} - {self.status}"
+
+
+class UserVersionQuerySet(models.QuerySet):
+    def bump(self, user_id):
+        """
+        Advance the user's version and return it, 0 for a user without a
+        version row.
+        """
+        connection = connections[self.db]
+        if not connection.features.can_return_columns_from_insert:
+            versions = self.filter(user_id=user_id)
+            versions.update(version=F("version") + 1, updated_at=timezone.now())
+            return versions.values_list("version", flat=True).first() or 0
+
+        # PostgreSQL and SQLite 3.35+ return the new value in one round trip
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET version = version + 1, updated_at = %s "
+                "WHERE user_id = %s RETURNING version",
+                [connection.ops.adapt_datetimefield_value(timezone.now()), user_id],
+            )
+            row = cursor.fetchone()
+        return row[0] if row else 0
+
+
+class UserVersion(models.Model):
+    """
+    Per-user counter bumped by every write to the user's projects, tasks
+    and entries, so cached listings can be validated with one lookup.
+    """
+
+    user = models.OneToOneField(
+        User, primary_key=True, related_name="version", on_delete=models.CASCADE
+    )
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    objects = UserVersionQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.user_id}: {self.version}"
+
+
+class Tombstone(models.Model):
+    """
+    Left behind by every deleted project, task and entry, cascades
+    included, so sync clients learn what to drop. ``user_id`` is a plain
+    column because tombstones outlive the rows of a deleted user.
+    """
+
+    CHOICES_KIND = [("project", "Project"), ("task", "Task"), ("entry", "Entry")]
+
+    user_id = models.BigIntegerField()
+    kind = models.CharField(max_length=20, choices=CHOICES_KIND)
+    object_id = models.BigIntegerField()
+    version = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["version"]
+        indexes = [
+            models.Index(
+                fields=["user_id", "version"], name="tombstone_user_version_idx"
+            ),
+            models.Index(fields=["deleted_at"], name="tombstone_deleted_at_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} - {self.version}"
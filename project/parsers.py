@@ -0,0 +1,33 @@
+import json
+
+from django.conf import settings
+from rest_framework.parsers import BaseParser
+
+
+def read_ndjson(lines, encoding=None):
+    """
+    Lazily decode newline-delimited JSON. Lines that aren't valid JSON are
+    yielded as-is so they can be reported as invalid rows.
+    """
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode(encoding or settings.DEFAULT_CHARSET)
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield line
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parses newline-delimited JSON into a lazy iterator of rows.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        return read_ndjson(stream, parser_context.get("encoding"))
@@ -0,0 +1,81 @@
+from datetime import datetime, time, timedelta
+
+from django.db.models import DateField, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from project import models
+
+
+def report(user, start, end, bucket="day", group="project", tz=None):
+    """
+    Return the user's tracked minutes between ``start`` and ``end``
+    (inclusive) summed per ``bucket`` (day, week or month) and per
+    ``group`` (project or task), oldest period first.
+
+    Days in the server time zone are read from the daily rollups, so the
+    cost depends on the number of days rather than entries. Any other
+    time zone is aggregated from the raw and archived entries.
+    """
+    fields = ["project"] if group == "project" else ["project", "task"]
+    if tz is None or tz.key == timezone.get_current_timezone_name():
+        return list(
+            models.DailyRollup.objects.filter(user=user, day__gte=start, day__lte=end)
+            .annotate(period=Trunc("day", bucket, output_field=DateField()))
+            .order_by()
+            .values("period", *fields)
+            .annotate(minutes=Sum("minutes"))
+            .order_by("period", *(f"{field}_id" for field in fields))
+        )
+
+    window = {
+        "created_by": user,
+        "created_at__gte": datetime.combine(start, time.min, tzinfo=tz),
+        "created_at__lt": datetime.combine(
+            end + timedelta(days=1), time.min, tzinfo=tz
+        ),
+    }
+    rows = {}
+    for queryset in [
+        models.Entry.objects.filter(is_tracked=False, **window),
+        models.ArchivedEntry.objects.filter(**window),
+    ]:
+        totals = (
+            queryset.annotate(
+                period=Trunc("created_at", bucket, output_field=DateField(), tzinfo=tz)
+            )
+            .order_by()
+            .values("period", *fields)
+            .annotate(minutes=Sum("minutes"))
+        )
+        for row in totals:
+            key = (row["period"], *(row[field] for field in fields))
+            if key in rows:
+                rows[key]["minutes"] += row["minutes"]
+            else:
+                rows[key] = row
+    # the order of the rollup query, rows without a project or task first
+    return sorted(
+        rows.values(),
+        key=lambda row: (
+            row["period"],
+            *((row[field] is not None, row[field] or 0) for field in fields),
+        ),
+    )
+
+
+def summary(user, start, end, bucket="day", group="project", tz=None):
+    """
+    Return the report payload served by the reports endpoint and written
+    by report jobs: the filters, the total and the per-period rows.
+    """
+    results = report(user, start, end, bucket, group, tz)
+    return {
+        "start": start,
+        "end": end,
+        "bucket": bucket,
+        "group": group,
+        "timezone": str(tz or timezone.get_current_timezone()),
+        "total": sum(row["minutes"] for row in results),
+        "results": results,
+    }
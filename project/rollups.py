@@ -0,0 +1,211 @@
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from project import models
+
+
+def bucket(created_at):
+    """
+    Return the day an entry is bucketed into, in the current time zone.
+    """
+    if timezone.is_naive(created_at):
+        created_at = timezone.make_aware(created_at)
+    return timezone.localdate(created_at)
+
+
+def contribution(values):
+    """
+    Return the rollup key an entry contributes to, or None when the entry
+    is still being tracked and has no minutes yet.
+    """
+    if values["is_tracked"]:
+        return None
+    return (
+        values["created_by_id"],
+        values["project_id"],
+        values["task_id"],
+        bucket(values["created_at"]),
+    )
+
+
+def entry_values(entry):
+    return {
+        "is_tracked": entry.is_tracked,
+        "created_by_id": entry.created_by_id,
+        "project_id": entry.project_id,
+        "task_id": entry.task_id,
+        "created_at": entry.created_at,
+        "minutes": entry.minutes,
+    }
+
+
+def apply(key, minutes, entries):
+    """
+    Add ``minutes`` and ``entries`` to the bucket for ``key``.
+
+    Negative deltas only ever update existing rows, so removing an entry
+    whose bucket was already cascaded away is a no-op.
+    """
+    user_id, project_id, task_id, day = key
+    rollups = models.DailyRollup.objects.filter(
+        user_id=user_id, project_id=project_id, task_id=task_id, day=day
+    )
+    updated = rollups.update(
+        minutes=F("minutes") + minutes, entries=F("entries") + entries
+    )
+    if updated:
+        if entries < 0:
+            rollups.filter(entries__lte=0).delete()
+        return
+    if entries <= 0:
+        return
+    try:
+        with transaction.atomic():
+            models.DailyRollup.objects.create(
+                user_id=user_id,
+                project_id=project_id,
+                task_id=task_id,
+                day=day,
+                minutes=minutes,
+                entries=entries,
+            )
+    except IntegrityError:
+        # someone else created the bucket first
+        rollups.update(minutes=F("minutes") + minutes, entries=F("entries") + entries)
+
+
+def entry_saved(entry):
+    old = getattr(entry, "_loaded_values", None)
+    new = entry_values(entry)
+    old_key = contribution(old) if old else None
+    new_key = contribution(new)
+
+    if old_key == new_key and old_key is not None:
+        delta = new["minutes"] - old["minutes"]
+        if delta:
+            apply(new_key, delta, 0)
+    else:
+        if old_key is not None:
+            apply(old_key, -old["minutes"], -1)
+        if new_key is not None:
+            apply(new_key, new["minutes"], 1)
+
+    entry._loaded_values = new
+
+
+def entry_deleted(entry):
+    values = getattr(entry, "_loaded_values", None) or entry_values(entry)
+    key = contribution(values)
+    if key is not None:
+        apply(key, -values["minutes"], -1)
+
+
+def rebuild(user_ids=None, chunk_size=500):
+    """
+    Recompute rollups from the raw and archived entries, ``chunk_size``
+    users at a time, replacing whatever is stored for them. Returns the
+    number of buckets written.
+    """
+    users = User.objects.order_by("id").values_list("id", flat=True)
+    if user_ids is not None:
+        users = users.filter(id__in=user_ids)
+    users = list(users)
+
+    written = 0
+    for start in range(0, len(users), chunk_size):
+        chunk = users[start : start + chunk_size]
+        with transaction.atomic():
+            models.DailyRollup.objects.filter(user__in=chunk).delete()
+            written += len(
+                models.DailyRollup.objects.bulk_create(
+                    computed(chunk, chunk_size), batch_size=chunk_size
+                )
+            )
+    return written
+
+
+def computed(user_ids, chunk_size):
+    """
+    Yield unsaved rollups summing the users' finished entries, archived
+    ones included.
+    """
+
+    def totals(queryset):
+        rows = (
+            queryset.filter(created_by__in=user_ids)
+            .annotate(day=TruncDate("created_at"))
+            .order_by()
+            .values("created_by", "project", "task", "day")
+            .annotate(total=Sum("minutes"), count=Count("id"))
+        )
+        for row in rows.iterator(chunk_size=chunk_size):
+            key = (row["created_by"], row["project"], row["task"], row["day"])
+            yield key, (row["total"], row["count"])
+
+    buckets = dict(totals(models.ArchivedEntry.objects.all()))
+    for key, (minutes, count) in totals(models.Entry.objects.filter(is_tracked=False)):
+        archived_minutes, archived_count = buckets.get(key, (0, 0))
+        buckets[key] = (minutes + archived_minutes, count + archived_count)
+    for (user_id, project_id, task_id, day), (minutes, count) in buckets.items():
+        yield models.DailyRollup(
+            user_id=user_id,
+            project_id=project_id,
+            task_id=task_id,
+            day=day,
+            minutes=minutes,
+            entries=count,
+        )
+
+
+def entries_created(entries):
+    """
+    Add entries that were inserted without signals, e.g. by bulk_create.
+    Existing buckets are locked and updated together and missing ones
+    created in one insert, so this must run inside a transaction.
+    """
+    totals = {}
+    for entry in entries:
+        key = contribution(entry_values(entry))
+        if key is None:
+            continue
+        minutes, count = totals.get(key, (0, 0))
+        totals[key] = (minutes + entry.minutes, count + 1)
+    if not totals:
+        return
+
+    existing = models.DailyRollup.objects.select_for_update().filter(
+        user_id__in={key[0] for key in totals}, day__in={key[3] for key in totals}
+    )
+    updated = []
+    for rollup in existing:
+        key = (rollup.user_id, rollup.project_id, rollup.task_id, rollup.day)
+        if key in totals:
+            minutes, count = totals.pop(key)
+            rollup.minutes += minutes
+            rollup.entries += count
+            updated.append(rollup)
+    models.DailyRollup.objects.bulk_update(updated, ["minutes", "entries"])
+
+    try:
+        with transaction.atomic():
+            models.DailyRollup.objects.bulk_create(
+                models.DailyRollup(
+                    user_id=user_id,
+                    project_id=project_id,
+                    task_id=task_id,
+                    day=day,
+                    minutes=minutes,
+                    entries=count,
+                )
+                for (user_id, project_id, task_id, day), (
+                    minutes,
+                    count,
+                ) in totals.items()
+            )
+    except IntegrityError:
+        # a concurrent writer created some of the buckets first
+        for key, (minutes, count) in totals.items():
+            apply(key, minutes, count)
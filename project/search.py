@@ -0,0 +1,143 @@
+import re
+
+from django.db import connections, router
+
+from project import models
+
+KINDS = ["project", "task"]
+MAX_TERMS = 8
+WORDS = re.compile(r"\w+")
+
+
+class SQLiteIndex:
+    """
+    One FTS5 table over project and task titles, kept current by triggers
+    on both tables. The rowid encodes the kind and id so changes find
+    their row without a scan, and the owner is an indexed column so
+    matches are narrowed to the user's rows by the index rather than
+    filtered afterwards. Prefixes of up to four characters are indexed
+    on their own, longer ones are read from the words' lists. Migration
+    0010 creates the table and triggers.
+    """
+
+    table = "project_title_search"
+    sources = [
+        # (kind, table, rowid of a row)
+        ("project", "project_project", "{row}.id * 2"),
+        ("task", "project_task", "{row}.id * 2 + 1"),
+    ]
+
+    def rebuild(self, cursor):
+        cursor.execute(f"DELETE FROM {self.table}")
+        for _, table, rowid in self.sources:
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, title, owner) "
+                f"SELECT {rowid.format(row=table)}, title, CAST(user_id AS TEXT) "
+                f"FROM {table}"
+            )
+        # merge the index segments written above into one
+        cursor.execute(f"INSERT INTO {self.table} ({self.table}) VALUES ('optimize')")
+
+    def query(self, user_id, terms, kinds, limit, offset):
+        # every term is a quoted prefix, so input is never FTS5 syntax
+        match = 'owner : "{}" AND title : ({})'.format(
+            user_id, " ".join(f'"{term}"*' for term in terms)
+        )
+        sql = f"SELECT rowid, title FROM {self.table} WHERE {self.table} MATCH %s"
+        params = [match]
+        if len(kinds) == 1:
+            sql += " AND rowid %% 2 = %s"
+            params.append(KINDS.index(kinds[0]))
+        sql += " ORDER BY length(title), rowid LIMIT %s OFFSET %s"
+        return sql, [*params, limit, offset]
+
+    def rows(self, rows):
+        return [
+            {"kind": KINDS[rowid % 2], "id": rowid // 2, "title": title}
+            for rowid, title in rows
+        ]
+
+
+class PostgreSQLIndex:
+    """
+    GIN indexes on the title vectors of the project and task tables,
+    maintained by PostgreSQL itself. The user filter is combined with them
+    through the user id indexes. Migration 0010 creates the indexes and
+    the ``title_search`` configuration, which unaccents words like the
+    SQLite tokenizer does.
+    """
+
+    config = "title_search"
+    tables = {"project": "project_project", "task": "project_task"}
+    vector = f"to_tsvector('{config}', title)"
+
+    def rebuild(self, cursor):
+        for table in self.tables.values():
+            cursor.execute(f"REINDEX INDEX {table}_title_search_idx")
+
+    def query(self, user_id, terms, kinds, limit, offset):
+        query = " & ".join(f"'{term}':*" for term in terms)
+        selects, params = [], []
+        for kind in kinds:
+            selects.append(
+                f"SELECT '{kind}' AS kind, id, title "
+                f"FROM {self.tables[kind]}, to_tsquery('{self.config}', %s) query "
+                f"WHERE user_id = %s AND {self.vector} @@ query"
+            )
+            params += [query, user_id]
+        sql = (
+            f"SELECT kind, id, title FROM ({' UNION ALL '.join(selects)}) results "
+            "ORDER BY length(title), kind, id LIMIT %s OFFSET %s"
+        )
+        return sql, [*params, limit, offset]
+
+    def rows(self, rows):
+        return [{"kind": kind, "id": id, "title": title} for kind, id, title in rows]
+
+
+INDEXES = {"sqlite": SQLiteIndex, "postgresql": PostgreSQLIndex}
+
+
+def index(connection):
+    try:
+        return INDEXES[connection.vendor]()
+    except KeyError:
+        raise NotImplementedError(f"No title search on {connection.vendor}.")
+
+
+def rebuild(using=None):
+    """
+    Rebuild the title search index from the project and task tables.
+    """
+    connection = connections[using or router.db_for_write(models.Task)]
+    with connection.cursor() as cursor:
+        index(connection).rebuild(cursor)
+
+
+def terms(query):
+    """
+    Return the lowercased words of ``query`` to match as title prefixes.
+    """
+    return WORDS.findall(query.lower())[:MAX_TERMS]
+
+
+def search(user, query, kinds=None, limit=20, offset=0):
+    """
+    Return the user's projects and tasks, of ``kinds`` (both by default),
+    with a title word starting with each word of ``query``, best match
+    first, as dicts of kind, id and title.
+
+    Every result holds every word, so results rank by how much of the
+    title the words cover: shortest title first. Among such results that
+    is mostly the order of bm25, without the statistics it reads from the
+    whole index for every prefix.
+    """
+    words = terms(query)
+    if not words:
+        return []
+    connection = connections[router.db_for_read(models.Task)]
+    title_index = index(connection)
+    sql, params = title_index.query(user.id, words, kinds or KINDS, limit, offset)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return title_index.rows(cursor.fetchall())
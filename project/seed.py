@@ -0,0 +1,133 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from project import models, rollups
+
+PASSWORD = "benchmark-password"
+STATUSES = ["todo"] * 6 + ["done"] * 3 + ["archived"]
+# title words, so title search has realistic matches
+WORDS = (
+    "api app audit backend billing bug cache client cleanup dashboard data "
+    "deploy design docs email export fix frontend import invoice login meeting "
+    "migration mobile onboarding payment performance planning release report "
+    "research review search security setup support sync test update website"
+).split()
+
+
+def weights(rng, count, alpha=1.2):
+    """
+    Pareto weights, so a few users/projects/tasks get most of the work.
+    """
+    return [rng.paretovariate(alpha) for _ in range(count)]
+
+
+def entry_time(rng, now, days):
+    """
+    A start time on a weekday during working hours within the last ``days``.
+    """
+    while True:
+        moment = now - timedelta(days=rng.randrange(days))
+        if moment.weekday() < 5:
+            break
+    return moment.replace(
+        hour=rng.randint(8, 18),
+        minute=rng.randrange(60),
+        second=rng.randrange(60),
+        microsecond=rng.randrange(1000000),
+    )
+
+
+def seed(users, entries, projects=10, tasks=20, days=365, batch_size=5000, seed=0):
+    """
+    Bulk-generate ``users`` users with tokens, up to ``projects`` projects
+    each holding up to ``tasks`` tasks, and ``entries`` closed entries
+    skewed towards a few heavy users, projects and tasks. Rollups are
+    rebuilt for the new users. Returns the created users.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    password = make_password(PASSWORD)
+    prefix = f"bench{now:%Y%m%d%H%M%S}"
+
+    with transaction.atomic():
+        # bulk_create only sets primary keys on some backends, read them back
+        User.objects.bulk_create(
+            User(
+                username=f"{prefix}-{index}",
+                email=f"{prefix}-{index}@example.com",
+                password=password,
+            )
+            for index in range(users)
+        )
+        created = list(User.objects.filter(username__startswith=f"{prefix}-"))
+        Token.objects.bulk_create(
+            Token(key=Token.generate_key(), user=user) for user in created
+        )
+        models.UserVersion.objects.bulk_create(
+            models.UserVersion(user=user) for user in created
+        )
+
+        models.Project.objects.bulk_create(
+            models.Project(
+                title=f"{rng.choice(WORDS).capitalize()} {index}",
+                user=user,
+                created_at=now,
+            )
+            for user in created
+            for index in range(rng.randint(1, projects))
+        )
+        all_projects = list(models.Project.objects.filter(user__in=created))
+        models.Task.objects.bulk_create(
+            (
+                models.Task(
+                    project=project,
+                    title=" ".join(rng.sample(WORDS, 3)).capitalize(),
+                    user_id=project.user_id,
+                    status=rng.choice(STATUSES),
+                )
+                for project in all_projects
+                for index in range(rng.randint(1, tasks))
+            ),
+            batch_size=batch_size,
+        )
+
+    tasks_by_user = {}
+    for task in models.Task.objects.filter(user__in=created).values_list(
+        "id", "project_id", "user_id"
+    ):
+        tasks_by_user.setdefault(task[2], []).append(task)
+    user_ids = list(tasks_by_user)
+    user_weights = weights(rng, len(user_ids))
+    task_weights = {
+        user_id: weights(rng, len(tasks)) for user_id, tasks in tasks_by_user.items()
+    }
+
+    def generate():
+        for user_id in rng.choices(user_ids, user_weights, k=entries):
+            task_id, project_id, _ = rng.choices(
+                tasks_by_user[user_id], task_weights[user_id]
+            )[0]
+            yield models.Entry(
+                project_id=project_id,
+                task_id=task_id,
+                created_by_id=user_id,
+                minutes=max(1, int(rng.lognormvariate(3.5, 0.8))),
+                created_at=entry_time(rng, now, days),
+            )
+
+    rows = generate()
+    while True:
+        batch = [entry for _, entry in zip(range(batch_size), rows)]
+        if not batch:
+            break
+        with transaction.atomic():
+            models.Entry.objects.bulk_create(batch)
+
+    rollups.rebuild(user_ids=[user.id for user in created])
+    return created
@@ -1,8 +1,18 @@
-from rest_framework import serializers
+try:
+    import zoneinfo
+except ImportError:
+    from backports import zoneinfo
+
+from django.conf import settings
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 from project import models
 
 
 class ProjectSerializer(serializers.ModelSerializer):
+    registered_time = serializers.IntegerField(read_only=True)
+    num_tasks_todo = serializers.IntegerField(read_only=True)
+
     class Meta:
         model = models.Project
         fields = "__all__"
@@ -10,13 +20,318 @@ class ProjectSerializer(serializers.ModelSerializer):
 
 
 class TaskSerializer(serializers.ModelSerializer):
+    registered_time = serializers.IntegerField(read_only=True)
+
     class Meta:
         model = models.Task
         fields = "__all__"
         read_only_fields = ["user"]
 
 
+class TaskBulkFilterSerializer(serializers.Serializer):
+    project = serializers.IntegerField(required=False)
+    status = serializers.ChoiceField(choices=models.Task.CHOICES_STATUS, required=False)
+    created_before = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError("Give at least one filter.")
+        return attrs
+
+
+class TaskBulkSerializer(serializers.Serializer):
+    """
+    A status change, move to another project or delete of the tasks with
+    one of ``ids`` or matching every field of ``filter``.
+    """
+
+    action = serializers.ChoiceField(choices=["status", "move", "delete"])
+    status = serializers.ChoiceField(choices=models.Task.CHOICES_STATUS, required=False)
+    project = serializers.IntegerField(required=False)
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=10000,
+        required=False,
+    )
+    filter = TaskBulkFilterSerializer(required=False)
+
+    def validate_project(self, value):
+        if not self.context["user"].projects.filter(id=value).exists():
+            raise serializers.ValidationError(
+                f'Invalid pk "{value}" - object does not exist.'
+            )
+        return value
+
+    def validate(self, attrs):
+        if ("ids" in attrs) == ("filter" in attrs):
+            raise serializers.ValidationError("Give either ids or filter.")
+        required = {"status": "status", "move": "project"}.get(attrs["action"])
+        if required and required not in attrs:
+            raise serializers.ValidationError({required: ["This field is required."]})
+        return attrs
+
+
 class EntrySerializer(serializers.ModelSerializer):
     class Meta:
         model = models.Entry
         fields = "__all__"
+
+
+class EntryImportSerializer(serializers.ModelSerializer):
+    """
+    Validates one imported entry against the ``tasks`` ({id: project id})
+    and ``projects`` ids owned by the importing user, which are looked up
+    once per batch and passed in the context.
+    """
+
+    project = serializers.IntegerField(required=False, allow_null=True)
+    task = serializers.IntegerField(required=False, allow_null=True)
+
+    class Meta:
+        model = models.Entry
+        fields = ["project", "task", "minutes", "created_at"]
+        extra_kwargs = {"minutes": {"min_value": 0}}
+
+    def does_not_exist(self, value):
+        return serializers.ValidationError(
+            serializers.PrimaryKeyRelatedField.default_error_messages[
+                "does_not_exist"
+            ].format(pk_value=value)
+        )
+
+    def validate_project(self, value):
+        if value is not None and value not in self.context["projects"]:
+            raise self.does_not_exist(value)
+        return value
+
+    def validate_task(self, value):
+        if value is not None and value not in self.context["tasks"]:
+            raise self.does_not_exist(value)
+        return value
+
+    def validate(self, attrs):
+        task = attrs.get("task")
+        if task is not None:
+            project = self.context["tasks"][task]
+            if attrs.setdefault("project", project) != project:
+                raise serializers.ValidationError(
+                    {"task": ["The task doesn't belong to the project."]}
+                )
+        return attrs
+
+
+class EntryExportFilterSerializer(serializers.Serializer):
+    """
+    Query parameters of an entry export, dates are inclusive.
+    """
+
+    output = serializers.ChoiceField(choices=["csv", "ndjson"], default="csv")
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    project = serializers.IntegerField(required=False)
+    task = serializers.IntegerField(required=False)
+    status = serializers.ChoiceField(choices=models.Task.CHOICES_STATUS, required=False)
+
+    def validate(self, attrs):
+        if "start" in attrs and "end" in attrs and attrs["start"] > attrs["end"]:
+            raise serializers.ValidationError({"end": ["End is before start."]})
+        return attrs
+
+
+class ReportFilterSerializer(serializers.Serializer):
+    """
+    Query parameters of a time report, dates are inclusive and read in
+    ``tz`` (the server time zone by default).
+    """
+
+    start = serializers.DateField()
+    end = serializers.DateField()
+    bucket = serializers.ChoiceField(choices=["day", "week", "month"], default="day")
+    group = serializers.ChoiceField(choices=["project", "task"], default="project")
+    tz = serializers.CharField(required=False)
+
+    def validate_tz(self, value):
+        try:
+            return zoneinfo.ZoneInfo(value)
+        except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+            raise serializers.ValidationError(f'Unknown time zone "{value}".')
+
+    def validate(self, attrs):
+        if attrs["start"] > attrs["end"]:
+            raise serializers.ValidationError({"end": ["End is before start."]})
+        return attrs
+
+
+class SearchFilterSerializer(serializers.Serializer):
+    """
+    Query parameters of a title search, ``q`` holds the word prefixes.
+    """
+
+    q = serializers.CharField(max_length=200)
+    kind = serializers.ChoiceField(choices=["project", "task"], required=False)
+    page = serializers.IntegerField(min_value=1, default=1)
+    page_size = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """
+    A background report or export, ``params`` are the query parameters of
+    the reports or export endpoint.
+    """
+
+    filters = {"report": ReportFilterSerializer, "export": EntryExportFilterSerializer}
+
+    class Meta:
+        model = models.Job
+        fields = [
+            "id",
+            "kind",
+            "params",
+            "status",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = ["status", "error", "started_at", "finished_at"]
+
+    def validate(self, attrs):
+        params = attrs.get("params", {})
+        if not isinstance(params, dict):
+            raise serializers.ValidationError({"params": ["Expected an object."]})
+        filters = self.filters[attrs["kind"]](data=params)
+        if not filters.is_valid():
+            raise serializers.ValidationError({"params": filters.errors})
+        return attrs
+
+
+class ValuesSerializer:
+    """
+    Read-only counterpart of a ``ModelSerializer`` building the same output
+    straight from ``values()`` rows, for list responses where model
+    instances and per-field ``to_representation`` calls dominate.
+    ``fields`` maps output keys, in output order, to row keys.
+    """
+
+    fields = {}
+    datetime_fields = ["created_at"]
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    @classmethod
+    def values(cls):
+        """
+        The row keys to pass to ``values()``.
+        """
+        return list(cls.fields.values())
+
+    @staticmethod
+    def datetime_representation():
+        """
+        ``DateTimeField.to_representation`` with the current time zone
+        looked up once rather than for every value.
+        """
+        field = serializers.DateTimeField()
+        if api_settings.DATETIME_FORMAT.lower() != ISO_8601 or not settings.USE_TZ:
+            return field.to_representation
+        tz = field.default_timezone()
+
+        def to_representation(value):
+            if value is None or value.tzinfo is None:
+                return field.to_representation(value)
+            value = value.astimezone(tz).isoformat()
+            return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+        return to_representation
+
+    @property
+    def data(self):
+        fields = list(self.fields.items())
+        to_representation = self.datetime_representation()
+        datetimes = [(name, to_representation) for name in self.datetime_fields]
+        data = []
+        for row in self.rows:
+            item = {name: row[key] for name, key in fields}
+            for name, to_representation in datetimes:
+                item[name] = to_representation(item[name])
+            data.append(item)
+        return data
+
+
+class ProjectValuesSerializer(ValuesSerializer):
+    """
+    ``ProjectSerializer`` output of rows annotated by ``with_registered_time``
+    and ``with_todo_count``.
+    """
+
+    fields = {
+        "id": "id",
+        "registered_time": "total_minutes",
+        "num_tasks_todo": "todo_count",
+        "version": "version",
+        "title": "title",
+        "created_at": "created_at",
+        "user": "user_id",
+    }
+
+
+class ProjectSyncSerializer(ValuesSerializer):
+    """
+    A project as stored, without the totals clients derive from entries.
+    """
+
+    fields = {
+        "id": "id",
+        "version": "version",
+        "title": "title",
+        "created_at": "created_at",
+        "user": "user_id",
+    }
+
+
+class TaskValuesSerializer(ValuesSerializer):
+    """
+    ``TaskSerializer`` output of rows annotated by ``with_registered_time``.
+    """
+
+    fields = {
+        "id": "id",
+        "registered_time": "total_minutes",
+        "version": "version",
+        "title": "title",
+        "created_at": "created_at",
+        "status": "status",
+        "project": "project_id",
+        "user": "user_id",
+    }
+
+
+class TaskSyncSerializer(ValuesSerializer):
+    fields = {
+        "id": "id",
+        "version": "version",
+        "title": "title",
+        "created_at": "created_at",
+        "status": "status",
+        "project": "project_id",
+        "user": "user_id",
+    }
+
+
+class EntryValuesSerializer(ValuesSerializer):
+    """
+    ``EntrySerializer`` output.
+    """
+
+    fields = {
+        "id": "id",
+        "version": "version",
+        "minutes": "minutes",
+        "is_tracked": "is_tracked",
+        "created_at": "created_at",
+        "project": "project_id",
+        "task": "task_id",
+        "created_by": "created_by_id",
+    }
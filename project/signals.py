@@ -0,0 +1,71 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from project import jobs, models, rollups, timers, versions
+
+
+@receiver(pre_save, sender=models.Entry)
+def load_entry_values(sender, instance=None, raw=False, **kwargs):
+    if raw or instance._state.adding or hasattr(instance, "_loaded_values"):
+        return
+    instance._loaded_values = (
+        sender.objects.filter(pk=instance.pk)
+        .values(
+            "is_tracked",
+            "created_by_id",
+            "project_id",
+            "task_id",
+            "created_at",
+            "minutes",
+        )
+        .first()
+    )
+
+
+@receiver(post_save, sender=models.Entry)
+def update_rollups_on_save(sender, instance=None, raw=False, **kwargs):
+    if not raw:
+        rollups.entry_saved(instance)
+
+
+@receiver(post_delete, sender=models.Entry)
+def update_rollups_on_delete(sender, instance=None, **kwargs):
+    rollups.entry_deleted(instance)
+
+
+@receiver(post_delete, sender=models.Entry)
+def forget_running_timer(sender, instance=None, **kwargs):
+    # e.g. the task or project of a running timer was deleted
+    if instance.is_tracked:
+        transaction.on_commit(lambda: timers.forget(instance.created_by_id))
+
+
+@receiver(post_delete, sender=models.Job)
+def delete_job_result(sender, instance=None, **kwargs):
+    if instance.result:
+        transaction.on_commit(
+            lambda: jobs.result_path(instance).unlink(missing_ok=True)
+        )
+
+
+@receiver(post_save, sender=User)
+def create_user_version(sender, instance=None, created=False, raw=False, **kwargs):
+    if created and not raw:
+        models.UserVersion.objects.create(user=instance)
+
+
+@receiver(post_delete, sender=models.Project)
+@receiver(post_delete, sender=models.Task)
+@receiver(post_delete, sender=models.Entry)
+def record_deletion(sender, instance=None, **kwargs):
+    # cascades delete through the collector, which sends this for every row;
+    # the project and task APIs delete through bulk.purge instead
+    user_id = getattr(instance, instance.owner_field)
+    models.Tombstone.objects.create(
+        user_id=user_id,
+        kind=sender._meta.model_name,
+        object_id=instance.pk,
+        version=versions.bump(user_id),
+    )
@@ -0,0 +1,147 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from project import models, serializers
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorExpired(Exception):
+    pass
+
+
+ROWS = {
+    "projects": (models.Project, "user", serializers.ProjectSyncSerializer),
+    "tasks": (models.Task, "user", serializers.TaskSyncSerializer),
+    "entries": (models.Entry, "created_by", serializers.EntryValuesSerializer),
+}
+
+
+def encode_cursor(version, issued_at, positions=None):
+    cursor = {"v": version, "t": issued_at.isoformat()}
+    if positions:
+        cursor["p"] = positions
+    cursor = json.dumps(cursor)
+    return urlsafe_b64encode(cursor.encode()).decode()
+
+
+def decode_cursor(encoded):
+    """
+    Return the version held by a cursor of ``changes``, None for a full
+    sync, with the (version, id) of the last row of each kind sent when
+    the cursor continues a sync. Raises ``CursorExpired`` when the
+    tombstones it needs may have been purged.
+    """
+    try:
+        cursor = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+        issued_at = datetime.fromisoformat(cursor["t"])
+        positions = {
+            name: (int(version), int(id))
+            for name, (version, id) in cursor.get("p", {}).items()
+            if name in [*ROWS, "deleted"]
+        }
+        if cursor["v"] is None and not positions:
+            raise ValueError
+        version = None if cursor["v"] is None else int(cursor["v"])
+    except (TypeError, ValueError, KeyError, AttributeError, UnicodeEncodeError):
+        raise InvalidCursor
+    if issued_at < timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS):
+        raise CursorExpired
+    return version, issued_at, positions
+
+
+def after(queryset, since, position):
+    """
+    Narrow ``queryset`` to the rows past ``position``, a (version, id), or
+    else saved after version ``since``.
+    """
+    if position is not None:
+        version, id = position
+        return queryset.filter(Q(version__gt=version) | Q(version=version, id__gt=id))
+    if since is not None:
+        return queryset.filter(version__gt=since)
+    return queryset
+
+
+def changes(user, cursor=None, page_size=None):
+    """
+    Return the user's projects, tasks and entries saved after the version
+    of ``cursor``, the ids deleted since, and the cursor to send next
+    time. Without a cursor every row is returned and nothing deleted.
+
+    Each call returns at most ``page_size`` (``SYNC_PAGE_SIZE``) rows of
+    each kind, oldest version first. While ``more`` is true the cursor
+    continues after the last rows sent and the client calls again at once.
+    """
+    page_size = page_size or settings.SYNC_PAGE_SIZE
+    since, issued_at, positions = (
+        decode_cursor(cursor) if cursor else (None, timezone.now(), {})
+    )
+    # read first: rows saved meanwhile come again with the next cursor
+    version = (
+        models.UserVersion.objects.filter(user=user)
+        .values_list("version", flat=True)
+        .first()
+    ) or 0
+
+    result, more = {}, False
+    positions = dict(positions)
+    for name, (model, owner, serializer_class) in ROWS.items():
+        queryset = after(
+            model.objects.filter(**{owner: user}), since, positions.get(name)
+        )
+        rows = list(
+            queryset.order_by("version", "id").values(*serializer_class.values())[
+                : page_size + 1
+            ]
+        )
+        more |= len(rows) > page_size
+        rows = rows[:page_size]
+        if rows:
+            positions[name] = (rows[-1]["version"], rows[-1]["id"])
+        result[name] = serializer_class(rows).data
+
+    result["deleted"] = {kind: [] for kind, _ in models.Tombstone.CHOICES_KIND}
+    if since is not None:
+        tombstones = list(
+            after(
+                models.Tombstone.objects.filter(user_id=user.id),
+                since,
+                positions.get("deleted"),
+            )
+            .order_by("version", "id")
+            .values_list("version", "id", "kind", "object_id")[: page_size + 1]
+        )
+        more |= len(tombstones) > page_size
+        tombstones = tombstones[:page_size]
+        if tombstones:
+            positions["deleted"] = tombstones[-1][:2]
+        for _, _, kind, object_id in tombstones:
+            result["deleted"][kind].append(object_id)
+
+    result["more"] = more
+    if more:
+        # rows saved meanwhile get higher versions, so they still come
+        # after the positions reached
+        result["cursor"] = encode_cursor(since, issued_at, positions)
+    else:
+        result["cursor"] = encode_cursor(version, timezone.now())
+    return result
+
+
+def purge_tombstones(days=None):
+    """
+    Delete tombstones older than ``days`` (``SYNC_TOMBSTONE_DAYS`` by
+    default), cursors issued before then must sync from scratch.
+    """
+    days = settings.SYNC_TOMBSTONE_DAYS if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = models.Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,179 @@
+from datetime import date, datetime, timezone
+from io import StringIO
+from zoneinfo import ZoneInfo
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from project import archive, bulk, exports, factories, models, reports, rollups
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+
+class ArchiveTest(APITestCase):
+    def setUp(self):
+        """
+        We want old and recent entries, one of them running, on an open and
+        an archived task
+        """
+        self.test_user = User.objects.create_user(
+            "testuser", "test@example.com", "testpassword"
+        )
+        self.user_token = Token.objects.get(user=self.test_user).key
+        self.project = factories.ProjectFactory(user=self.test_user)
+        self.task = models.Task.objects.create(
+            project=self.project, title="Task", user=self.test_user
+        )
+        self.archived_task = models.Task.objects.create(
+            project=self.project, title="Old", user=self.test_user, status="archived"
+        )
+        self.old = [
+            self.create_entry(self.task, 10, datetime(2022, 1, 1, 23, 30)),
+            self.create_entry(self.task, 20, datetime(2022, 1, 2, 10)),
+            self.create_entry(self.archived_task, 30, datetime(2022, 1, 2, 11)),
+        ]
+        self.recent = self.create_entry(self.task, 40, datetime(2022, 3, 1, 10))
+        self.on_archived_task = self.create_entry(
+            self.archived_task, 50, datetime(2022, 3, 1, 11)
+        )
+        self.running = self.create_entry(
+            self.task, 0, datetime(2022, 1, 3, 9), is_tracked=True
+        )
+
+    def create_entry(self, task, minutes, created_at, **kwargs):
+        return models.Entry.objects.create(
+            project=self.project,
+            task=task,
+            minutes=minutes,
+            created_by=self.test_user,
+            created_at=created_at.replace(tzinfo=timezone.utc),
+            **kwargs,
+        )
+
+    def rollups(self):
+        return list(
+            models.DailyRollup.objects.order_by("day", "task").values_list(
+                "day", "task", "minutes", "entries"
+            )
+        )
+
+    def test_archive_entries(self):
+        """
+        Ensure old finished entries and those of archived tasks move to the
+        archive while rollups and registered time stay unchanged
+        """
+        before = self.rollups()
+        out = StringIO()
+        with self.settings(ENTRY_ARCHIVE_DAYS=0):
+            call_command("archive_entries", "--batch-size=2", stdout=out)
+        self.assertIn("Archived 5 entries.", out.getvalue())
+
+        self.assertEqual(
+            list(models.Entry.objects.values_list("id", flat=True)), [self.running.id]
+        )
+        self.assertEqual(models.ArchivedEntry.objects.count(), 5)
+        self.assertEqual(self.rollups(), before)
+        self.assertEqual(self.project.registered_time(), 150)
+        self.assertEqual(
+            models.Task.objects.with_registered_time()
+            .get(id=self.task.id)
+            .total_minutes,
+            70,
+        )
+
+    def test_archive_archived_tasks_only(self):
+        """
+        Ensure the command can archive by task status alone, entries of
+        open tasks staying whatever their age
+        """
+        out = StringIO()
+        call_command(
+            "archive_entries", "--archived-tasks", "--no-age-cutoff", stdout=out
+        )
+        self.assertIn("Archived 2 entries.", out.getvalue())
+        self.assertEqual(
+            set(models.ArchivedEntry.objects.values_list("id", flat=True)),
+            {self.old[2].id, self.on_archived_task.id},
+        )
+
+        with self.assertRaises(CommandError):
+            call_command("archive_entries", "--no-age-cutoff", stdout=out)
+
+    def test_archive_selection(self):
+        """
+        Ensure only entries past the cutoff or on archived tasks are moved
+        """
+        cutoff = datetime(2022, 2, 1, tzinfo=timezone.utc)
+        self.assertEqual(archive.archive(before=cutoff), 3)
+        self.assertEqual(archive.archive(archived_tasks=True), 1)
+        self.assertEqual(archive.archive(), 0)
+        self.assertEqual(
+            set(models.ArchivedEntry.objects.values_list("id", flat=True)),
+            {entry.id for entry in self.old} | {self.on_archived_task.id},
+        )
+        self.assertTrue(models.Entry.objects.filter(id=self.recent.id).exists())
+
+    def test_reads_include_archive(self):
+        """
+        Ensure exports, reports in other time zones and rebuilt rollups
+        still see archived entries
+        """
+        expected = {
+            "export": list(exports.lines(exports.entries(self.test_user), "csv")),
+            "report": reports.report(
+                self.test_user,
+                date(2022, 1, 1),
+                date(2022, 3, 31),
+                group="task",
+                tz=ZoneInfo("Asia/Tokyo"),
+            ),
+            "rollups": self.rollups(),
+        }
+        archive.archive(before=datetime(2022, 2, 1, tzinfo=timezone.utc))
+
+        self.assertEqual(
+            list(exports.lines(exports.entries(self.test_user), "csv")),
+            expected["export"],
+        )
+        self.assertEqual(
+            reports.report(
+                self.test_user,
+                date(2022, 1, 1),
+                date(2022, 3, 31),
+                group="task",
+                tz=ZoneInfo("Asia/Tokyo"),
+            ),
+            expected["report"],
+        )
+        rollups.rebuild()
+        self.assertEqual(self.rollups(), expected["rollups"])
+
+        response = self.client.get(
+            reverse("entries-export"),
+            {"start": "2022-01-02", "end": "2022-01-02"},
+            HTTP_AUTHORIZATION=f"Token {self.user_token}",
+        )
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual([line.split(",")[2] for line in lines[1:]], ["20", "30"])
+
+    def test_archived_entries_follow_their_task(self):
+        """
+        Ensure moving and deleting tasks take their archived entries along
+        """
+        archive.archive(archived_tasks=True)
+        other = factories.ProjectFactory(user=self.test_user)
+        tasks = models.Task.objects.filter(id=self.archived_task.id)
+
+        bulk.move(self.test_user, tasks, other.id)
+        self.assertEqual(other.registered_time(), 80)
+        self.assertEqual(
+            set(models.ArchivedEntry.objects.values_list("project", flat=True)),
+            {other.id},
+        )
+
+        bulk.delete(self.test_user, tasks)
+        self.assertFalse(models.ArchivedEntry.objects.exists())
+
+        archive.archive(before=datetime(2022, 2, 1, tzinfo=timezone.utc))
+        self.project.delete()
+        self.assertFalse(models.ArchivedEntry.objects.exists())
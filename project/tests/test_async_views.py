@@ -0,0 +1,179 @@
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from project import checks, factories, models, timers
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+
+class AsyncTimerTest(TransactionTestCase):
+    # the async views run in another thread than the test, transactions
+    # must really commit for the timer cache to be written
+    def setUp(self):
+        """
+        We want a task to start and stop through the async endpoints
+        """
+        cache.clear()
+        self.test_user = User.objects.create_user(
+            "testuser", "test@example.com", "testpassword"
+        )
+        self.header = f"Token {Token.objects.get(user=self.test_user).key}"
+        self.task = factories.TaskFactory(user=self.test_user)
+
+    async def test_start_current_and_end(self):
+        """
+        Ensure the async endpoints answer like the DRF ones
+        """
+        start_url = f"/projects/async/tasks/{self.task.id}/start/"
+        end_url = f"/projects/async/tasks/{self.task.id}/end/"
+
+        response = await self.async_client.post(start_url, AUTHORIZATION=self.header)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()["task"]["task"], self.task.id)
+
+        response = await self.async_client.post(start_url, AUTHORIZATION=self.header)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("message", response.json())
+
+        response = await self.async_client.get(
+            "/projects/timer/", AUTHORIZATION=self.header
+        )
+        self.assertEqual(response.json()["task"]["task"], self.task.id)
+
+        response = await self.async_client.post(end_url, AUTHORIZATION=self.header)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["task"]["minutes"], 1)
+        running = models.Entry.objects.filter(is_tracked=True).exists
+        self.assertFalse(await sync_to_async(running)())
+
+        response = await self.async_client.post(end_url, AUTHORIZATION=self.header)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = await self.async_client.get(
+            "/projects/timer/", AUTHORIZATION=self.header
+        )
+        self.assertIsNone(response.json()["task"])
+
+    async def test_authentication_and_ownership(self):
+        """
+        Ensure tokens are required and other users' tasks are not found
+        """
+        start_url = f"/projects/async/tasks/{self.task.id}/start/"
+        response = await self.async_client.post(start_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = await self.async_client.get(start_url, AUTHORIZATION=self.header)
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+        other = await sync_to_async(User.objects.create_user)(
+            "other", "other@example.com", "otherpassword"
+        )
+        token = await sync_to_async(Token.objects.get)(user=other)
+        response = await self.async_client.post(
+            start_url, AUTHORIZATION=f"Token {token.key}"
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(TIMER_POLL_INTERVAL=0.01)
+    async def test_wait_for_change(self):
+        """
+        Ensure the long-poll answers on a new version or after the timeout
+        """
+        response = await self.async_client.get(
+            "/projects/timer/", AUTHORIZATION=self.header
+        )
+        version = response.json()["version"]
+
+        response = await self.async_client.get(
+            "/projects/timer/wait/",
+            {"version": version, "timeout": 0.05},
+            AUTHORIZATION=self.header,
+        )
+        self.assertEqual(response.json(), {"task": None, "version": version})
+
+        await self.async_client.post(
+            f"/projects/async/tasks/{self.task.id}/start/", AUTHORIZATION=self.header
+        )
+        response = await self.async_client.get(
+            "/projects/timer/wait/",
+            {"version": version, "timeout": 5},
+            AUTHORIZATION=self.header,
+        )
+        self.assertNotEqual(response.json()["version"], version)
+        self.assertEqual(response.json()["task"]["task"], self.task.id)
+
+        response = await self.async_client.get(
+            "/projects/timer/wait/", {"version": "x"}, AUTHORIZATION=self.header
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(
+        REST_FRAMEWORK={
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": {"timer": "1/min", "timer_wait": "1/min"},
+        }
+    )
+    async def test_throttled(self):
+        """
+        Ensure timer clicks share the DRF views' budget and long-polls
+        have their own
+        """
+        start_url = f"/projects/async/tasks/{self.task.id}/start/"
+        response = await self.async_client.post(start_url, AUTHORIZATION=self.header)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = await self.async_client.post(start_url, AUTHORIZATION=self.header)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "60")
+
+        for expected in [status.HTTP_200_OK, status.HTTP_429_TOO_MANY_REQUESTS]:
+            response = await self.async_client.get(
+                "/projects/timer/wait/", {"timeout": 0}, AUTHORIZATION=self.header
+            )
+            self.assertEqual(response.status_code, expected)
+
+    def test_cold_read_racing_writes(self):
+        """
+        Ensure a cold cache read overlapping a start, and publishes landing
+        out of order, never leave an older timer state cached
+        """
+        add = cache.add
+
+        def start_then_add(*args, **kwargs):
+            # the start commits after the cold read looked at the database
+            timers.start(self.test_user, self.task.id)
+            return add(*args, **kwargs)
+
+        with mock.patch.object(cache, "add", start_then_add):
+            running = timers.state(self.test_user)
+        self.assertEqual(running["task"]["task"], self.task.id)
+        self.assertEqual(timers.state(self.test_user), running)
+
+        started = models.Entry.objects.get(is_tracked=True)
+        stopped = timers.stop(self.test_user, self.task.id)
+        # the start's publish arrives after the stop's
+        timers.publish(self.test_user.id, started)
+        state = timers.state(self.test_user)
+        self.assertIsNone(state["task"])
+        self.assertEqual(state["version"], stopped.version)
+
+
+class SharedCacheCheckTest(SimpleTestCase):
+    def test_process_local_cache(self):
+        """
+        Ensure deployments serving timers from a per-process cache are warned
+        """
+        locmem = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        redis = {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": "redis://localhost:6379",
+        }
+        with override_settings(CACHES={"default": locmem}):
+            warnings = checks.check_shared_cache(None)
+        self.assertEqual([warning.id for warning in warnings], ["project.W001"])
+        with override_settings(CACHES={"default": redis}):
+            self.assertEqual(checks.check_shared_cache(None), [])
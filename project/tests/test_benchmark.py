@@ -0,0 +1,123 @@
+import json
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from project import benchmark, factories, models
+from rest_framework.authtoken.models import Token
+from timetracking.renderers import FastJSONRenderer
+
+
+class SeedBenchmarkTest(TestCase):
+    def test_seed_benchmark(self):
+        """
+        Ensure the generator creates usable users, tasks, entries and rollups
+        """
+        call_command(
+            "seed_benchmark", "--users", "3", "--entries", "200", stdout=StringIO()
+        )
+        self.assertEqual(User.objects.count(), 3)
+        self.assertEqual(Token.objects.count(), 3)
+        self.assertEqual(models.Entry.objects.count(), 200)
+        self.assertFalse(models.Entry.objects.filter(is_tracked=True).exists())
+        self.assertEqual(
+            sum(models.DailyRollup.objects.values_list("minutes", flat=True)),
+            sum(models.Entry.objects.values_list("minutes", flat=True)),
+        )
+
+    def test_factories(self):
+        """
+        Ensure entries built by the factories are consistent with their task
+        """
+        user = User.objects.create_user("testuser", "test@example.com", "password")
+        task = factories.TaskFactory(user=user)
+        entry = factories.EntryFactory(task=task)
+        self.assertEqual(task.project.user, user)
+        self.assertEqual(entry.project, task.project)
+        self.assertEqual(entry.created_by, user)
+
+
+class RunBenchmarkTest(TestCase):
+    def test_run_benchmark(self):
+        """
+        Ensure every endpoint reports latency, queries and memory
+        """
+        call_command(
+            "seed_benchmark", "--users", "2", "--entries", "50", stdout=StringIO()
+        )
+        output = StringIO()
+        call_command("run_benchmark", "--iterations", "2", stdout=output)
+        report = json.loads(output.getvalue())
+
+        self.assertEqual(report["meta"]["user"], benchmark.heaviest_user().id)
+        for name, result in report["endpoints"].items():
+            self.assertLess(result["status"], 400, name)
+            for key in ["p50_ms", "p95_ms", "p99_ms", "queries", "peak_memory_kib"]:
+                self.assertIn(key, result)
+
+    def test_benchmark_throttling(self):
+        """
+        Ensure the throttle overhead is reported and the check never queries
+        """
+        call_command(
+            "seed_benchmark", "--users", "1", "--entries", "10", stdout=StringIO()
+        )
+        output = StringIO()
+        call_command("benchmark_throttling", "--iterations", "20", stdout=output)
+        report = json.loads(output.getvalue())
+
+        self.assertEqual(report["check"]["queries"], 0)
+        self.assertEqual(report["endpoint"]["status"], 304)
+        self.assertIn("overhead_ms", report["endpoint"])
+
+    def test_benchmark_search(self):
+        """
+        Ensure the index and the scan are both timed on seeded titles
+        """
+        call_command(
+            "seed_benchmark", "--users", "2", "--entries", "10", stdout=StringIO()
+        )
+        output = StringIO()
+        call_command("benchmark_search", "--queries", "5", stdout=output)
+        report = json.loads(output.getvalue())
+
+        self.assertEqual(report["meta"]["queries"], 5)
+        self.assertIn("mean_ms", report["index"])
+        self.assertIn("p95_ms", report["icontains"])
+
+    def test_percentile(self):
+        """
+        Ensure percentiles use the nearest rank
+        """
+        values = list(range(1, 101))
+        self.assertEqual(benchmark.percentile(values, 50), 50)
+        self.assertEqual(benchmark.percentile(values, 99), 99)
+        self.assertEqual(benchmark.percentile([7], 95), 7)
+
+
+class SerializerBenchmarkTest(SimpleTestCase):
+    def test_benchmark_serializers(self):
+        """
+        Ensure both serializer paths render identical bytes
+        """
+        output = StringIO()
+        call_command(
+            "benchmark_serializers", "--tasks", "50", "--entries", "200", stdout=output
+        )
+        report = json.loads(output.getvalue())
+        for name in ["tasks", "entries"]:
+            self.assertTrue(report[name]["identical"], name)
+            self.assertIn("serialize_ms", report[name]["values_serializer"])
+
+    def test_fast_renderer(self):
+        """
+        Ensure the fast renderer escapes like JSONRenderer and indents on
+        request
+        """
+        data = {"title": "a\u2028b", "minutes": [1, None]}
+        renderer = FastJSONRenderer()
+        self.assertEqual(
+            renderer.render(data), b'{"title":"a\\u2028b","minutes":[1,null]}'
+        )
+        self.assertIn(b"\n", renderer.render(data, "application/json; indent=2"))
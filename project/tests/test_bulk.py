@@ -0,0 +1,158 @@
+from datetime import datetime, timezone
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+from project import bulk, factories, models, timers
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+
+class TaskBulkTest(APITestCase):
+    def setUp(self):
+        """
+        We want two projects of tasks with entries, and another user's task
+        """
+        cache.clear()
+        self.test_user = User.objects.create_user(
+            "testuser", "test@example.com", "testpassword"
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Token {Token.objects.get(user=self.test_user).key}"
+        )
+        self.project, self.other_project = factories.ProjectFactory.create_batch(
+            2, user=self.test_user
+        )
+        self.tasks = [
+            models.Task.objects.create(
+                project=self.project, title=f"Task {i}", user=self.test_user
+            )
+            for i in range(3)
+        ]
+        for task in self.tasks:
+            models.Entry.objects.create(
+                project=self.project,
+                task=task,
+                minutes=10,
+                created_by=self.test_user,
+                created_at=datetime(2022, 1, 20, 12, tzinfo=timezone.utc),
+            )
+        other = User.objects.create_user("other", "other@example.com", "password")
+        self.other_task = factories.TaskFactory(user=other)
+
+    def bulk(self, data, expected_status=status.HTTP_200_OK):
+        response = self.client.post(reverse("tasks-bulk"), data, format="json")
+        self.assertEqual(response.status_code, expected_status)
+        return response.data
+
+    def test_status_by_ids(self):
+        """
+        Ensure a status change touches only the user's listed tasks in one
+        UPDATE and shows up in the next sync
+        """
+        cursor = self.client.get(reverse("sync")).data["cursor"]
+        ids = [self.tasks[0].id, self.tasks[1].id, self.other_task.id]
+        result = self.bulk({"action": "status", "status": "done", "ids": ids})
+        self.assertEqual(result, {"tasks": 2, "entries": 0})
+        self.assertEqual(
+            list(models.Task.objects.filter(status="done").order_by("id")),
+            self.tasks[:2],
+        )
+        self.assertEqual(models.Task.objects.get(id=self.other_task.id).status, "todo")
+
+        synced = self.client.get(reverse("sync"), {"cursor": cursor}).data
+        self.assertEqual(sorted(t["id"] for t in synced["tasks"]), ids[:2])
+
+    def test_move_by_filter(self):
+        """
+        Ensure moved tasks take their entries and rollups along
+        """
+        result = self.bulk(
+            {
+                "action": "move",
+                "project": self.other_project.id,
+                "filter": {"project": self.project.id},
+            }
+        )
+        self.assertEqual(result, {"tasks": 3, "entries": 3})
+        self.assertEqual(self.other_project.registered_time(), 30)
+        self.assertEqual(self.project.registered_time(), 0)
+        self.assertEqual(
+            set(models.DailyRollup.objects.values_list("project_id", flat=True)),
+            {self.other_project.id},
+        )
+
+        self.bulk(
+            {"action": "move", "project": self.other_task.project_id, "ids": [1]},
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+    def test_delete_by_filter(self):
+        """
+        Ensure deletes remove entries and rollups and leave tombstones
+        """
+        timers.start(self.test_user, self.tasks[2].id)
+        timers.state(self.test_user)
+        models.Task.objects.filter(id=self.tasks[0].id).update(status="archived")
+        with self.captureOnCommitCallbacks(execute=True):
+            result = self.bulk(
+                {
+                    "action": "delete",
+                    "filter": {
+                        "status": "todo",
+                        "created_before": datetime.now(timezone.utc).isoformat(),
+                    },
+                }
+            )
+        self.assertEqual(result, {"tasks": 2, "entries": 3})
+        self.assertEqual(
+            list(models.Task.objects.filter(user=self.test_user)), [self.tasks[0]]
+        )
+        self.assertEqual(models.Entry.objects.count(), 1)
+        self.assertEqual(models.DailyRollup.objects.count(), 1)
+        self.assertEqual(
+            sorted(models.Tombstone.objects.values_list("kind", flat=True)),
+            ["entry", "entry", "entry", "task", "task"],
+        )
+        self.assertIsNone(timers.state(self.test_user)["task"])
+
+    def test_delete_goes_by_the_ids_read(self):
+        """
+        Ensure a task that starts matching the filter while the delete runs
+        is kept rather than deleted without a tombstone
+        """
+        models.Task.objects.filter(id=self.tasks[0].id).update(status="done")
+        bulk_create = models.Tombstone.objects.bulk_create
+
+        def bulk_create_then_write(*args, **kwargs):
+            tombstones = bulk_create(*args, **kwargs)
+            models.Task.objects.filter(id=self.tasks[0].id).update(status="todo")
+            return tombstones
+
+        with mock.patch.object(bulk, "BATCH_SIZE", 1), mock.patch.object(
+            models.Tombstone.objects, "bulk_create", bulk_create_then_write
+        ):
+            result = bulk.delete(
+                self.test_user, bulk.tasks(self.test_user, status="todo")
+            )
+        self.assertEqual(result, {"tasks": 2, "entries": 2})
+        self.assertEqual(
+            list(models.Task.objects.filter(user=self.test_user)), [self.tasks[0]]
+        )
+        self.assertEqual(models.Entry.objects.get().task, self.tasks[0])
+        self.assertEqual(models.Tombstone.objects.count(), 4)
+
+    def test_invalid_requests(self):
+        """
+        Ensure ids and filters are exclusive and actions get their values
+        """
+        self.bulk(
+            {"action": "delete", "ids": [1], "filter": {"status": "todo"}},
+            status.HTTP_400_BAD_REQUEST,
+        )
+        self.bulk({"action": "delete", "filter": {}}, status.HTTP_400_BAD_REQUEST)
+        data = self.bulk({"action": "status", "ids": [1]}, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("status", data)
+        self.assertEqual(models.Task.objects.count(), 4)
@@ -0,0 +1,92 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from project import factories, models
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+
+class ConditionalRequestTest(APITestCase):
+    def setUp(self):
+        """
+        We want a user with a project and a task whose listings are cached
+        by the client
+        """
+        cache.clear()
+        self.test_user = User.objects.create_user(
+            "testuser", "test@example.com", "testpassword"
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Token {Token.objects.get(user=self.test_user).key}"
+        )
+        self.task = factories.TaskFactory(user=self.test_user)
+        self.urls = [
+            reverse("projects"),
+            reverse("tasks"),
+            f"/projects/{self.task.project_id}/",
+            f"/projects/tasks/{self.task.id}/",
+        ]
+
+    def test_not_modified(self):
+        """
+        Ensure unchanged listings are answered with 304 from the version
+        lookup alone
+        """
+        for url in self.urls:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("Last-Modified", response)
+
+            with self.assertNumQueries(1):
+                not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+            self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_if_modified_since_is_ignored(self):
+        """
+        Ensure a date alone never gets a 304 that could hide a write made
+        within the same second
+        """
+        response = self.client.get(
+            reverse("projects"), HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_writes_change_the_etag(self):
+        """
+        Ensure project, task and entry writes invalidate cached listings
+        """
+        etag = self.client.get(reverse("projects"))["ETag"]
+        writes = [
+            lambda: factories.ProjectFactory(user=self.test_user),
+            lambda: models.Task.objects.filter(id=self.task.id).get().save(),
+            lambda: models.Entry.objects.create(
+                task=self.task,
+                minutes=5,
+                created_by=self.test_user,
+                created_at=timezone.now(),
+            ),
+            lambda: models.Entry.objects.get().delete(),
+        ]
+        for write in writes:
+            write()
+            response = self.client.get(reverse("projects"), HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(response["ETag"], etag)
+            etag = response["ETag"]
+
+    def test_etag_is_per_user(self):
+        """
+        Ensure another user's copy never validates
+        """
+        etag = self.client.get(reverse("projects"))["ETag"]
+        other = User.objects.create_user("other", "other@example.com", "password")
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Token {Token.objects.get(user=other).key}"
+        )
+        response = self.client.get(reverse("projects"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
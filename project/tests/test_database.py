@@ -0,0 +1,118 @@
+import shutil
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+from django.test import SimpleTestCase
+from timetracking.db.pool import Pool
+from timetracking.db.sqlite3.base import DatabaseWrapper
+
+
+class SQLiteTunedTest(SimpleTestCase):
+    def setUp(self):
+        """
+        We want a connection to a database file in the tuned mode
+        """
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = Path(directory) / "db.sqlite3"
+        self.database = DatabaseWrapper(
+            {
+                **connection.settings_dict,
+                "NAME": self.path,
+                "OPTIONS": settings.SQLITE_TUNED_OPTIONS,
+            },
+            alias="tuned",
+        )
+        self.addCleanup(self.database.close)
+
+    def test_pragmas(self):
+        """
+        Ensure every new connection runs the configured pragmas
+        """
+        with self.database.cursor() as cursor:
+            for pragma, expected in [
+                ("journal_mode", "wal"),
+                ("synchronous", 1),
+                ("busy_timeout", 5000),
+                ("mmap_size", 256 * 1024 * 1024),
+                ("foreign_keys", 1),
+            ]:
+                cursor.execute(f"PRAGMA {pragma}")
+                self.assertEqual(cursor.fetchone()[0], expected)
+
+    def test_immediate_transactions(self):
+        """
+        Ensure transactions take the write lock as soon as they begin
+        """
+        self.database._start_transaction_under_autocommit()
+        other = sqlite3.connect(self.path, timeout=0)
+        self.addCleanup(other.close)
+        with self.assertRaisesMessage(sqlite3.OperationalError, "locked"):
+            other.execute("BEGIN IMMEDIATE")
+        self.database.connection.rollback()
+
+
+class StubConnection:
+    def __init__(self, reusable=True):
+        self.reusable = reusable
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class PoolTest(SimpleTestCase):
+    def setUp(self):
+        """
+        We want a pool of two connections that reuses the reusable ones
+        """
+        self.pool = Pool(2, 0.01, lambda connection: connection.reusable)
+
+    def test_checkout_and_return(self):
+        """
+        Ensure returned connections are handed out again, last one first
+        """
+        self.assertIsNone(self.pool.acquire())
+        self.assertIsNone(self.pool.acquire())
+        first, second = StubConnection(), StubConnection()
+        self.pool.release(first)
+        self.pool.release(second)
+
+        self.assertIs(self.pool.acquire(), second)
+        self.assertIs(self.pool.acquire(), first)
+        self.assertFalse(first.closed or second.closed)
+
+    def test_size_limit(self):
+        """
+        Ensure no more than ``size`` connections are out at once and a
+        checkout that opened none gives its slot back
+        """
+        self.pool.acquire()
+        self.pool.acquire()
+        with self.assertRaisesMessage(OSError, "No database connection free"):
+            self.pool.acquire()
+
+        self.pool.discard()
+        self.assertIsNone(self.pool.acquire())
+
+    def test_unusable_connections_are_closed(self):
+        """
+        Ensure connections the reset rejects or fails on are closed and
+        their slot freed
+        """
+        broken = StubConnection(reusable=False)
+        self.pool.acquire()
+        self.pool.release(broken)
+        self.assertTrue(broken.closed)
+
+        failing = StubConnection()
+        self.pool.reset = lambda connection: 1 / 0
+        self.pool.acquire()
+        self.pool.release(failing)
+        self.assertTrue(failing.closed)
+
+        self.assertIsNone(self.pool.acquire())
+        self.assertIsNone(self.pool.acquire())
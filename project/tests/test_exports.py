@@ -0,0 +1,90 @@
+import csv
+import json
+from datetime import datetime, timezone
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from project import factories, models
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+
+class EntryExportTest(APITestCase):
+    def setUp(self):
+        """
+        We want entries on several days, tasks and users to filter
+        """
+        self.test_user1 = User.objects.create_user(
+            "testuser1", "test1@example.com", "test1password"
+        )
+        self.user1_token = Token.objects.get(user=self.test_user1).key
+        self.test_user2 = User.objects.create_user(
+            "testuser2", "test2@example.com", "test2password"
+        )
+
+        self.project = factories.ProjectFactory(user=self.test_user1)
+        self.todo = models.Task.objects.create(
+            project=self.project, title="Todo", user=self.test_user1
+        )
+        self.done = models.Task.objects.create(
+            project=self.project, title="Done", user=self.test_user1, status="done"
+        )
+        for day, task in [(1, self.todo), (2, self.done), (3, self.todo)]:
+            models.Entry.objects.create(
+                project=self.project,
+                task=task,
+                minutes=day * 10,
+                created_by=self.test_user1,
+                created_at=datetime(2022, 1, day, 23, 30, tzinfo=timezone.utc),
+            )
+        other_project = factories.ProjectFactory(user=self.test_user2)
+        models.Entry.objects.create(
+            project=other_project,
+            minutes=5,
+            created_by=self.test_user2,
+            created_at=datetime(2022, 1, 2, tzinfo=timezone.utc),
+        )
+
+        # URLs
+        self.export_url = reverse("entries-export")
+
+    def export(self, **params):
+        response = self.client.get(
+            self.export_url, params, HTTP_AUTHORIZATION=f"Token {self.user1_token}"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b"".join(response.streaming_content).decode()
+
+    def test_export_csv(self):
+        """
+        Ensure the CSV export only holds the user's entries in the range
+        """
+        rows = list(
+            csv.DictReader(
+                self.export(start="2022-01-02", end="2022-01-03").splitlines()
+            )
+        )
+        self.assertEqual([row["minutes"] for row in rows], ["20", "30"])
+        self.assertEqual(rows[0]["task_title"], "Done")
+
+    def test_export_ndjson_filters(self):
+        """
+        Ensure NDJSON output and task/status filters
+        """
+        lines = self.export(output="ndjson", status="todo").splitlines()
+        self.assertEqual([json.loads(line)["minutes"] for line in lines], [10, 30])
+
+        lines = self.export(output="ndjson", task=self.done.id).splitlines()
+        self.assertEqual([json.loads(line)["minutes"] for line in lines], [20])
+
+    def test_export_invalid_range(self):
+        """
+        Ensure an inverted date range is rejected
+        """
+        response = self.client.get(
+            self.export_url,
+            {"start": "2022-01-03", "end": "2022-01-01"},
+            HTTP_AUTHORIZATION=f"Token {self.user1_token}",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,126 @@
+import json
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+from project import factories, models
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+
+class EntryImportTest(APITestCase):
+    def setUp(self):
+        """
+        We want tasks of two users so ownership is checked on import
+        """
+        self.test_user1 = User.objects.create_user(
+            "testuser1", "test1@example.com", "test1password"
+        )
+        self.user1_token = Token.objects.get(user=self.test_user1).key
+        self.test_user2 = User.objects.create_user(
+            "testuser2", "test2@example.com", "test2password"
+        )
+
+        self.project = factories.ProjectFactory(user=self.test_user1)
+        self.task = models.Task.objects.create(
+            project=self.project, title="Task", user=self.test_user1
+        )
+        other_project = factories.ProjectFactory(user=self.test_user2)
+        self.other_task = models.Task.objects.create(
+            project=other_project, title="Task", user=self.test_user2
+        )
+
+        # URLs
+        self.import_url = reverse("entries-import")
+
+    def rows(self):
+        return [
+            {"task": self.task.id, "minutes": 30, "created_at": "2022-01-20T10:00Z"},
+            {"project": self.project.id, "minutes": -15, "created_at": "2022-01-20"},
+            {"task": self.other_task.id, "minutes": 5, "created_at": "2022-01-21"},
+            {"task": self.task.id, "minutes": 45, "created_at": "2022-01-21T09:00Z"},
+        ]
+
+    def test_import_json(self):
+        """
+        Ensure valid rows are created across batches and invalid rows reported
+        """
+        response = self.client.post(
+            f"{self.import_url}?batch_size=2",
+            data=self.rows(),
+            format="json",
+            HTTP_AUTHORIZATION=f"Token {self.user1_token}",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual([error["row"] for error in response.data["errors"]], [1, 2])
+        self.assertIn("task", response.data["errors"][1]["errors"])
+
+        entries = models.Entry.objects.filter(created_by=self.test_user1)
+        self.assertEqual(entries.count(), 2)
+        self.assertTrue(all(entry.project == self.project for entry in entries))
+        self.assertEqual(self.project.registered_time(), 75)
+        self.assertEqual(
+            sum(self.project.rollups.values_list("minutes", flat=True)), 75
+        )
+
+    def test_import_ndjson(self):
+        """
+        Ensure NDJSON bodies are imported and bad lines reported per row
+        """
+        body = "\n".join(json.dumps(row) for row in self.rows()) + "\nnot json\n"
+        response = self.client.post(
+            self.import_url,
+            data=body,
+            content_type="application/x-ndjson",
+            HTTP_AUTHORIZATION=f"Token {self.user1_token}",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual([error["row"] for error in response.data["errors"]], [1, 2, 4])
+
+    def test_import_requires_a_list(self):
+        """
+        Ensure bodies other than a list of rows are rejected
+        """
+        for body in ["5", "null", '"abc"', '{"minutes": 5}']:
+            response = self.client.post(
+                self.import_url,
+                data=body,
+                content_type="application/json",
+                HTTP_AUTHORIZATION=f"Token {self.user1_token}",
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(models.Entry.objects.filter(created_by=self.test_user1))
+
+    def test_import_batch_size_limit(self):
+        """
+        Ensure the batch size is bounded
+        """
+        response = self.client.post(
+            f"{self.import_url}?batch_size=0",
+            data=self.rows(),
+            format="json",
+            HTTP_AUTHORIZATION=f"Token {self.user1_token}",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_import_entries_command(self):
+        """
+        Ensure the management command streams an NDJSON file
+        """
+        with tempfile.NamedTemporaryFile("w", suffix=".ndjson") as source:
+            source.write("\n".join(json.dumps(row) for row in self.rows()))
+            source.flush()
+            call_command(
+                "import_entries",
+                source.name,
+                "--user",
+                str(self.test_user1.id),
+                stdout=StringIO(),
+                stderr=StringIO(),
+            )
+        self.assertEqual(models.Entry.objects.count(), 2)
@@ -0,0 +1,176 @@
+import csv
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from project import factories, jobs, models
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+
+class JobTest(APITestCase):
+    def setUp(self):
+        """
+        We want a user with entries to report on and export, and a
+        throwaway results directory
+        """
+        results_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, results_dir)
+        settings_override = override_settings(JOB_RESULTS_DIR=results_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.test_user = User.objects.create_user(
+            "testuser", "test@example.com", "testpassword"
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Token {Token.objects.get(user=self.test_user).key}"
+        )
+        self.task = factories.TaskFactory(user=self.test_user)
+        for day in range(1, 4):
+            models.Entry.objects.create(
+                project=self.task.project,
+                task=self.task,
+                minutes=day * 10,
+                created_by=self.test_user,
+                created_at=datetime(2022, 1, day, 12, tzinfo=timezone.utc),
+            )
+
+    def create_job(self, kind, params):
+        response = self.client.post(
+            reverse("jobs"), {"kind": kind, "params": params}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data["id"]
+
+    def test_report_job(self):
+        """
+        Ensure a queued report runs and its result matches the endpoint
+        """
+        params = {"start": "2022-01-01", "end": "2022-01-31", "bucket": "month"}
+        job_id = self.create_job("report", params)
+        result_url = reverse("job-result", args=[job_id])
+
+        response = self.client.get(result_url)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+        self.assertEqual(jobs.work(burst=True), 1)
+        response = self.client.get(reverse("job", args=[job_id]))
+        self.assertEqual(response.data["status"], models.Job.DONE)
+
+        response = self.client.get(result_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        expected = self.client.get(reverse("reports"), params)
+        self.assertEqual(b"".join(response.streaming_content), expected.content)
+
+    def test_export_job_ranges(self):
+        """
+        Ensure export results can be downloaded in byte ranges
+        """
+        job_id = self.create_job("export", {"output": "csv"})
+        call_command("run_workers", processes=1, burst=True, stdout=StringIO())
+        result_url = reverse("job-result", args=[job_id])
+
+        content = b"".join(self.client.get(result_url).streaming_content)
+        rows = list(csv.DictReader(content.decode().splitlines()))
+        self.assertEqual([row["minutes"] for row in rows], ["10", "20", "30"])
+
+        response = self.client.get(result_url, HTTP_RANGE="bytes=5-14")
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(response["Content-Range"], f"bytes 5-14/{len(content)}")
+        self.assertEqual(b"".join(response.streaming_content), content[5:15])
+
+        response = self.client.get(result_url, HTTP_RANGE="bytes=-10")
+        self.assertEqual(b"".join(response.streaming_content), content[-10:])
+
+        response = self.client.get(result_url, HTTP_RANGE=f"bytes={len(content)}-")
+        self.assertEqual(
+            response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+        self.assertEqual(response["Content-Range"], f"bytes */{len(content)}")
+
+        path = jobs.result_path(models.Job.objects.get(id=job_id))
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(reverse("job", args=[job_id]))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(path.exists())
+
+    def test_invalid_params_and_ownership(self):
+        """
+        Ensure bad parameters are rejected and other users' jobs hidden
+        """
+        response = self.client.post(
+            reverse("jobs"),
+            {"kind": "report", "params": {"start": "2022-01-31"}},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("end", response.data["params"])
+
+        other = User.objects.create_user("other", "other@example.com", "password")
+        job = models.Job.objects.create(user=other, kind="export")
+        response = self.client.get(reverse("job-result", args=[job.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(reverse("jobs"))
+        self.assertEqual(response.data["results"], [])
+
+    def test_claim_and_failures(self):
+        """
+        Ensure a job is claimed once, failures are recorded and lost jobs
+        queued again
+        """
+        job = models.Job.objects.create(user=self.test_user, kind="report")
+        claimed = jobs.claim()
+        self.assertEqual(claimed.id, job.id)
+        self.assertIsNone(jobs.claim())
+
+        # the parameters were never validated, the worker reports why
+        with self.assertLogs("project.jobs", "ERROR"):
+            self.assertFalse(jobs.run(claimed))
+        job.refresh_from_db()
+        self.assertEqual(job.status, models.Job.FAILED)
+        self.assertIn("start", job.error)
+
+        stale = models.Job.objects.create(
+            user=self.test_user,
+            kind="export",
+            status=models.Job.RUNNING,
+            started_at=datetime.now(timezone.utc) - timedelta(days=1),
+        )
+        self.assertEqual(jobs.requeue_stale(), 1)
+        self.assertEqual(jobs.claim().id, stale.id)
+
+    def test_requeued_run_loses_its_claim(self):
+        """
+        Ensure a worker whose job was requeued and claimed again neither
+        records its result nor leaves files behind
+        """
+        self.create_job("export", {"output": "csv"})
+        first = jobs.claim()
+        models.Job.objects.filter(id=first.id).update(
+            started_at=datetime.now(timezone.utc) - timedelta(days=1)
+        )
+        first.refresh_from_db()
+        self.assertEqual(jobs.requeue_stale(), 1)
+        second = jobs.claim()
+
+        self.assertFalse(jobs.run(first))
+        second.refresh_from_db()
+        self.assertEqual(second.status, models.Job.RUNNING)
+        results_dir = Path(settings.JOB_RESULTS_DIR)
+        self.assertEqual(list(results_dir.iterdir()), [])
+
+        self.assertTrue(jobs.run(second))
+        second.refresh_from_db()
+        self.assertEqual(second.status, models.Job.DONE)
+        self.assertEqual([path.name for path in results_dir.iterdir()], [second.result])
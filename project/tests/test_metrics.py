@@ -0,0 +1,57 @@
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from project import factories
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from timetracking.metrics import registry
+
+
+@override_settings(METRICS_ENABLED=True)
+class MetricsTest(APITestCase):
+    def setUp(self):
+        self.test_user = User.objects.create_user(
+            "testuser", "test@example.com", "testpassword"
+        )
+        self.header = f"Token {Token.objects.get(user=self.test_user).key}"
+        factories.ProjectFactory.create_batch(3, user=self.test_user)
+        registry.reset()
+
+    def test_server_timing_header(self):
+        """
+        Ensure responses report app, database and render timings
+        """
+        response = self.client.get(reverse("projects"), HTTP_AUTHORIZATION=self.header)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        timing = response["Server-Timing"]
+        self.assertIn("app;dur=", timing)
+        self.assertIn('desc="3 queries"', timing)
+        self.assertIn("render;dur=", timing)
+
+    def test_metrics_endpoint(self):
+        """
+        Ensure requests show up in the Prometheus histograms
+        """
+        for _ in range(2):
+            self.client.get(reverse("projects"), HTTP_AUTHORIZATION=self.header)
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = response.content.decode()
+        self.assertIn(
+            'timetracking_request_seconds_count{view="projects/",method="GET"} 2',
+            body,
+        )
+        self.assertIn(
+            'timetracking_db_queries_bucket{view="projects/",method="GET",le="+Inf"} 2',
+            body,
+        )
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled(self):
+        """
+        Ensure nothing is recorded or exposed unless enabled
+        """
+        response = self.client.get(reverse("projects"), HTTP_AUTHORIZATION=self.header)
+        self.assertNotIn("Server-Timing", response)
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 404)
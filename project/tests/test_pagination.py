@@ -0,0 +1,116 @@
+import json
+from base64 import urlsafe_b64encode
+from datetime import datetime, timezone
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from project import factories, models
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+from timetracking.pagination import KeysetPagination
+
+
+class PaginationTest(APITestCase):
+    def setUp(self):
+        """
+        We want tasks sharing creation times so the id tiebreaker matters
+        """
+        self.test_user = User.objects.create_user(
+            "testuser", "test@example.com", "testpassword"
+        )
+        self.header = f"Token {Token.objects.get(user=self.test_user).key}"
+        project = factories.ProjectFactory(user=self.test_user)
+        for _ in range(7):
+            models.Task.objects.create(
+                project=project, title="Task", user=self.test_user
+            )
+        models.Task.objects.filter(id__lte=project.tasks.order_by("id")[3].id).update(
+            created_at=datetime(2022, 1, 20, tzinfo=timezone.utc)
+        )
+        factories.ProjectFactory.create_batch(5, user=self.test_user)
+
+        # URLs
+        self.projects_url = reverse("projects")
+        self.tasks_url = reverse("tasks")
+
+    def walk(self, url):
+        pages = []
+        while url:
+            response = self.client.get(url, HTTP_AUTHORIZATION=self.header)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append(response.data)
+            url = response.data["next"]
+        return pages
+
+    def test_walk_tasks(self):
+        """
+        Ensure following next links returns every task once, in order
+        """
+        pages = self.walk(f"{self.tasks_url}?page_size=2")
+        self.assertEqual([len(page["results"]) for page in pages], [2, 2, 2, 1])
+        ids = [task["id"] for page in pages for task in page["results"]]
+        expected = list(
+            models.Task.objects.order_by("-created_at", "-id").values_list(
+                "id", flat=True
+            )
+        )
+        self.assertEqual(ids, expected)
+
+        response = self.client.get(pages[2]["previous"], HTTP_AUTHORIZATION=self.header)
+        self.assertEqual(response.data["results"], pages[1]["results"])
+        self.assertEqual(response.data["next"], pages[1]["next"])
+
+    def test_walk_projects(self):
+        """
+        Ensure projects are paged by title
+        """
+        pages = self.walk(f"{self.projects_url}?page_size=4")
+        titles = [project["title"] for page in pages for project in page["results"]]
+        self.assertEqual(titles, sorted(titles))
+        self.assertEqual(len(titles), 6)
+        self.assertIsNone(pages[0]["previous"])
+
+    def test_page_size_cap(self):
+        """
+        Ensure the requested page size is capped server side
+        """
+        paginator = KeysetPagination()
+        request = Request(APIRequestFactory().get("/", {"page_size": 100000}))
+        self.assertEqual(paginator.get_page_size(request), paginator.max_page_size)
+
+        request = Request(APIRequestFactory().get("/"))
+        self.assertEqual(paginator.get_page_size(request), paginator.page_size)
+
+    def test_invalid_cursor(self):
+        """
+        Ensure a tampered cursor is a 404
+        """
+        response = self.client.get(
+            f"{self.tasks_url}?cursor=nonsense", HTTP_AUTHORIZATION=self.header
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_values_of_the_wrong_type(self):
+        """
+        Ensure cursor values that don't fit the ordering fields are a 404
+        """
+        invalid = [[{"a": 1}, 1], [None, 1], ["2022-01-01", "x"]]
+        urls = {
+            self.tasks_url: [["not-a-date", 1], *invalid],
+            reverse("entries"): [["not-a-date", 1], *invalid],
+            # ordered by title, any string is a valid first value
+            self.projects_url: invalid,
+        }
+        for url, values in urls.items():
+            for value in values:
+                cursor = urlsafe_b64encode(
+                    json.dumps({"v": value, "r": 0}).encode()
+                ).decode()
+                response = self.client.get(
+                    url, {"cursor": cursor}, HTTP_AUTHORIZATION=self.header
+                )
+                self.assertEqual(
+                    response.status_code, status.HTTP_404_NOT_FOUND, (url, value)
+                )
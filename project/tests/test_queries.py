@@ -0,0 +1,213 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from project import factories, models
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+
+class QueryCountTest(APITestCase):
+    """
+    Pin the number of queries each endpoint in ``project/urls.py`` makes.
+    Every count includes the token lookup, the cache is cleared first.
+    Project and task reads also look up the user's version for their
+    ETag, and writes bump it.
+    """
+
+    def setUp(self):
+        self.test_user = User.objects.create_user(
+            "testuser", "test@example.com", "testpassword"
+        )
+        self.header = f"Token {Token.objects.get(user=self.test_user).key}"
+        self.projects = factories.ProjectFactory.create_batch(3, user=self.test_user)
+        self.tasks = [
+            models.Task.objects.create(
+                project=project, title="Task", user=self.test_user
+            )
+            for project in self.projects
+            for _ in range(3)
+        ]
+        for task in self.tasks:
+            models.Entry.objects.create(
+                project=task.project,
+                task=task,
+                minutes=10,
+                created_by=self.test_user,
+                created_at=timezone.now(),
+            )
+        self.project = self.projects[0]
+        self.task = self.tasks[0]
+        cache.clear()
+
+    def assertQueries(self, count, method, url, expected_status, **kwargs):
+        with self.assertNumQueries(count):
+            response = getattr(self.client, method)(
+                url, HTTP_AUTHORIZATION=self.header, **kwargs
+            )
+            if response.streaming:
+                b"".join(response.streaming_content)
+        self.assertEqual(response.status_code, expected_status)
+
+    def test_list_projects(self):
+        self.assertQueries(3, "get", reverse("projects"), status.HTTP_200_OK)
+
+    def test_create_project(self):
+        self.assertQueries(
+            3,
+            "post",
+            reverse("projects"),
+            status.HTTP_201_CREATED,
+            data={"title": "New"},
+        )
+
+    def test_retrieve_project(self):
+        self.assertQueries(
+            3, "get", f"/projects/{self.project.id}/", status.HTTP_200_OK
+        )
+
+    def test_update_project(self):
+        self.assertQueries(
+            4,
+            "put",
+            f"/projects/{self.project.id}/",
+            status.HTTP_200_OK,
+            data={"title": "Renamed"},
+        )
+
+    def test_retrieve_other_users_project(self):
+        other = User.objects.create_user("other", "other@example.com", "otherpassword")
+        project = factories.ProjectFactory(user=other)
+        self.assertQueries(
+            3, "get", f"/projects/{project.id}/", status.HTTP_404_NOT_FOUND
+        )
+
+    def test_delete_project(self):
+        # more entries, some without a task, don't add queries
+        models.Entry.objects.bulk_create(
+            models.Entry(
+                project=self.project,
+                minutes=5,
+                created_by=self.test_user,
+                created_at=timezone.now(),
+            )
+            for _ in range(50)
+        )
+        self.assertQueries(
+            17,
+            "delete",
+            f"/projects/{self.project.id}/",
+            status.HTTP_204_NO_CONTENT,
+        )
+        self.assertFalse(models.Entry.objects.filter(project=self.project).exists())
+        self.assertEqual(models.Tombstone.objects.count(), 1 + 3 + 53)
+
+    def test_list_tasks(self):
+        self.assertQueries(3, "get", reverse("tasks"), status.HTTP_200_OK)
+
+    def test_create_task(self):
+        self.assertQueries(
+            4,
+            "post",
+            reverse("tasks"),
+            status.HTTP_201_CREATED,
+            data={"title": "New", "project": self.project.id},
+        )
+
+    def test_retrieve_task(self):
+        self.assertQueries(
+            3, "get", f"/projects/tasks/{self.task.id}/", status.HTTP_200_OK
+        )
+
+    def test_update_task(self):
+        self.assertQueries(
+            4,
+            "patch",
+            f"/projects/tasks/{self.task.id}/",
+            status.HTTP_200_OK,
+            data={"status": "done"},
+        )
+
+    def test_bulk_task_status(self):
+        self.assertQueries(
+            5,
+            "post",
+            reverse("tasks-bulk"),
+            status.HTTP_200_OK,
+            data={"action": "status", "status": "done", "filter": {"status": "todo"}},
+            format="json",
+        )
+
+    def test_bulk_task_delete(self):
+        self.assertQueries(
+            11,
+            "post",
+            reverse("tasks-bulk"),
+            status.HTTP_200_OK,
+            data={"action": "delete", "filter": {"project": self.project.id}},
+            format="json",
+        )
+
+    def test_start_tracking(self):
+        self.assertQueries(
+            6,
+            "post",
+            f"/projects/tasks/{self.task.id}/start/",
+            status.HTTP_201_CREATED,
+        )
+
+    def test_end_tracking(self):
+        models.Entry.objects.create(
+            project=self.project,
+            task=self.task,
+            is_tracked=True,
+            created_by=self.test_user,
+            created_at=timezone.now(),
+        )
+        self.assertQueries(
+            7,
+            "post",
+            f"/projects/tasks/{self.task.id}/end/",
+            status.HTTP_200_OK,
+        )
+
+    def test_list_entries(self):
+        self.assertQueries(2, "get", reverse("entries"), status.HTTP_200_OK)
+
+    def test_export_entries(self):
+        self.assertQueries(3, "get", reverse("entries-export"), status.HTTP_200_OK)
+
+    def test_import_entries(self):
+        rows = [
+            {"task": task.id, "minutes": 5, "created_at": "2022-01-20T10:00Z"}
+            for task in self.tasks
+        ]
+        self.assertQueries(
+            10,
+            "post",
+            reverse("entries-import"),
+            status.HTTP_200_OK,
+            data=json.dumps(rows),
+            content_type="application/json",
+        )
+
+    def test_report(self):
+        self.assertQueries(
+            2,
+            "get",
+            reverse("reports"),
+            status.HTTP_200_OK,
+            data={"start": "2022-01-01", "end": "2022-12-31"},
+        )
+
+    def test_current_timer(self):
+        # a cold cache reads the version, then the running entry
+        self.assertQueries(3, "get", reverse("timer"), status.HTTP_200_OK)
+        # later polls are answered from the cache
+        self.assertQueries(0, "get", reverse("timer"), status.HTTP_200_OK)
+
+    def test_sync(self):
+        self.assertQueries(5, "get", reverse("sync"), status.HTTP_200_OK)
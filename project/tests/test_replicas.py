@@ -0,0 +1,102 @@
+import asyncio
+import shutil
+import tempfile
+from pathlib import Path
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.db import connections
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, override_settings
+from django.urls import reverse
+from project import models
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITransactionTestCase
+from timetracking import routers
+
+
+@override_settings(REPLICA_DATABASE="replica", REPLICA_STICKY_SECONDS=60)
+class ReplicaTest(APITransactionTestCase):
+    def setUp(self):
+        """
+        We want a second SQLite file standing in for a replica that
+        doesn't receive the primary's writes
+        """
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        connections.settings["replica"] = {
+            **connections["default"].settings_dict,
+            "NAME": Path(directory) / "replica.sqlite3",
+        }
+        self.addCleanup(self.remove_replica)
+        call_command("migrate", database="replica", verbosity=0)
+        cache.clear()
+
+        self.test_user = User.objects.create_user(
+            "testuser", "test@example.com", "testpassword"
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Token {Token.objects.get(user=self.test_user).key}"
+        )
+        # bulk_create skips the signal that would write a token
+        [replica_user] = User.objects.using("replica").bulk_create(
+            [User(id=self.test_user.id, username="testuser")]
+        )
+        models.Project.objects.using("replica").create(
+            title="On the replica", user=replica_user
+        )
+
+    def remove_replica(self):
+        connections["replica"].close()
+        del connections["replica"]
+        del connections.settings["replica"]
+
+    def titles(self):
+        response = self.client.get(reverse("projects"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [project["title"] for project in response.data["results"]]
+
+    def test_reads_go_to_replica(self):
+        """
+        Ensure lists read from the replica while detail writes don't
+        """
+        self.assertEqual(self.titles(), ["On the replica"])
+        project = models.Project.objects.using("replica").get()
+        response = self.client.get(f"/projects/{project.id}/")
+        self.assertEqual(response.data["title"], "On the replica")
+        self.assertFalse(models.Project.objects.exists())
+
+    def test_reads_stick_to_primary_after_write(self):
+        """
+        Ensure a user reads their own writes right after making them
+        """
+        response = self.client.post(reverse("projects"), {"title": "New"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.titles(), ["New"])
+
+        cache.clear()
+        self.assertEqual(self.titles(), ["On the replica"])
+
+    def test_pin_primary_middleware(self):
+        """
+        Ensure the middleware runs natively under ASGI and is left out
+        without a replica
+        """
+
+        async def get_response(request):
+            return HttpResponse()
+
+        middleware = routers.PinPrimaryMiddleware(get_response)
+        self.assertTrue(asyncio.iscoroutinefunction(middleware))
+        request = AsyncRequestFactory().post("/")
+        request.user = self.test_user
+        async_to_sync(middleware)(request)
+        self.assertTrue(routers.pinned(self.test_user))
+
+        with self.settings(REPLICA_DATABASE=None):
+            with self.assertRaises(MiddlewareNotUsed):
+                routers.PinPrimaryMiddleware(get_response)
@@ -0,0 +1,118 @@
+from datetime import date, datetime, timezone
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from project import factories, models
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+
+class ReportTest(APITestCase):
+    def setUp(self):
+        """
+        We want entries over two weeks on two projects
+        """
+        self.test_user = User.objects.create_user(
+            "testuser", "test@example.com", "testpassword"
+        )
+        self.header = f"Token {Token.objects.get(user=self.test_user).key}"
+        self.project1, self.project2 = factories.ProjectFactory.create_batch(
+            2, user=self.test_user
+        )
+        self.task = models.Task.objects.create(
+            project=self.project1, title="Task", user=self.test_user
+        )
+        for day, project, task, minutes in [
+            (3, self.project1, self.task, 10),
+            (4, self.project1, None, 20),
+            (4, self.project2, None, 30),
+            (10, self.project1, self.task, 40),
+        ]:
+            models.Entry.objects.create(
+                project=project,
+                task=task,
+                minutes=minutes,
+                created_by=self.test_user,
+                created_at=datetime(2022, 1, day, 23, 30, tzinfo=timezone.utc),
+            )
+
+        # URLs
+        self.reports_url = reverse("reports")
+
+    def report(self, **params):
+        params.setdefault("start", "2022-01-01")
+        params.setdefault("end", "2022-01-31")
+        response = self.client.get(
+            self.reports_url, params, HTTP_AUTHORIZATION=self.header
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_report_by_day(self):
+        """
+        Ensure daily buckets per project in the server time zone
+        """
+        data = self.report()
+        self.assertEqual(data["total"], 100)
+        self.assertEqual(
+            [
+                (row["period"], row["project"], row["minutes"])
+                for row in data["results"]
+            ],
+            [
+                (date(2022, 1, 3), self.project1.id, 10),
+                (date(2022, 1, 4), self.project1.id, 20),
+                (date(2022, 1, 4), self.project2.id, 30),
+                (date(2022, 1, 10), self.project1.id, 40),
+            ],
+        )
+
+    def test_report_by_week_and_task(self):
+        """
+        Ensure weekly buckets start on Monday and can be split per task
+        """
+        data = self.report(bucket="week", group="task")
+        self.assertCountEqual(
+            [(row["period"], row["task"], row["minutes"]) for row in data["results"]],
+            [
+                (date(2022, 1, 3), self.task.id, 10),
+                (date(2022, 1, 3), None, 20),
+                (date(2022, 1, 3), None, 30),
+                (date(2022, 1, 10), self.task.id, 40),
+            ],
+        )
+
+    def test_report_in_other_time_zone(self):
+        """
+        Ensure a request time zone moves entries across day boundaries
+        """
+        data = self.report(tz="Asia/Tokyo", bucket="day", end="2022-01-10")
+        self.assertEqual(data["timezone"], "Asia/Tokyo")
+        self.assertEqual(
+            [(row["period"], row["minutes"]) for row in data["results"]],
+            [
+                (date(2022, 1, 4), 10),
+                (date(2022, 1, 5), 20),
+                (date(2022, 1, 5), 30),
+            ],
+        )
+
+        data = self.report(tz="UTC", bucket="month")
+        self.assertCountEqual(
+            [(row["period"], row["minutes"]) for row in data["results"]],
+            [(date(2022, 1, 1), 70), (date(2022, 1, 1), 30)],
+        )
+
+    def test_report_invalid_params(self):
+        """
+        Ensure unknown time zones and inverted ranges are rejected
+        """
+        for params in [
+            {"start": "2022-01-01", "end": "2022-01-31", "tz": "Mars/Base"},
+            {"start": "2022-02-01", "end": "2022-01-31"},
+        ]:
+            response = self.client.get(
+                self.reports_url, params, HTTP_AUTHORIZATION=self.header
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
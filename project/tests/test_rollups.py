@@ -0,0 +1,150 @@
+from datetime import datetime, timedelta, timezone
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db.models import QuerySet
+from project import factories, models, rollups
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+
+class RollupTest(APITestCase):
+    def setUp(self):
+        """
+        We want a project with a task to track entries against
+        """
+        self.test_user = User.objects.create_user(
+            "testuser", "test@example.com", "testpassword"
+        )
+        self.user_token = Token.objects.get(user=self.test_user).key
+        self.project = factories.ProjectFactory(user=self.test_user)
+        self.task = models.Task.objects.create(
+            project=self.project, title="Task", user=self.test_user
+        )
+        self.day = datetime(2022, 1, 20, 12, tzinfo=timezone.utc)
+
+    def create_entry(self, minutes, created_at=None, **kwargs):
+        return models.Entry.objects.create(
+            project=self.project,
+            task=self.task,
+            minutes=minutes,
+            created_by=self.test_user,
+            created_at=created_at or self.day,
+            **kwargs,
+        )
+
+    def rollups(self):
+        return list(
+            models.DailyRollup.objects.order_by("day").values_list(
+                "day", "minutes", "entries"
+            )
+        )
+
+    def test_entries_update_rollups(self):
+        """
+        Ensure creating, editing, moving and deleting entries keep the
+        buckets current
+        """
+        first = self.create_entry(10)
+        self.create_entry(5)
+        self.assertEqual(self.rollups(), [(self.day.date(), 15, 2)])
+
+        first.minutes = 20
+        first.save()
+        self.assertEqual(self.rollups(), [(self.day.date(), 25, 2)])
+
+        first = models.Entry.objects.get(id=first.id)
+        first.created_at = self.day + timedelta(days=1)
+        first.save()
+        self.assertEqual(
+            self.rollups(),
+            [(self.day.date(), 5, 1), (self.day.date() + timedelta(days=1), 20, 1)],
+        )
+
+        first.delete()
+        self.assertEqual(self.rollups(), [(self.day.date(), 5, 1)])
+
+    def test_tracked_entry_counts_when_closed(self):
+        """
+        Ensure running timers only count once they are stopped
+        """
+        self.client.post(
+            f"/projects/tasks/{self.task.id}/start/",
+            HTTP_AUTHORIZATION=f"Token {self.user_token}",
+        )
+        self.assertEqual(self.rollups(), [])
+
+        self.client.post(
+            f"/projects/tasks/{self.task.id}/end/",
+            HTTP_AUTHORIZATION=f"Token {self.user_token}",
+        )
+        self.assertEqual(models.DailyRollup.objects.get().minutes, 1)
+
+    def test_rebuild_rollups(self):
+        """
+        Ensure the management command repairs drifted buckets
+        """
+        self.create_entry(10)
+        self.create_entry(7, created_at=self.day - timedelta(days=3))
+        expected = self.rollups()
+
+        models.DailyRollup.objects.update(minutes=0)
+        call_command("rebuild_rollups", "--chunk-size", "1", stdout=StringIO())
+        self.assertEqual(self.rollups(), expected)
+
+    def test_bulk_created_entries(self):
+        """
+        Ensure bulk inserted entries merge into existing buckets
+        """
+        self.create_entry(10)
+        entries = [
+            models.Entry(
+                project=self.project,
+                task=self.task,
+                minutes=minutes,
+                created_by=self.test_user,
+                created_at=created_at,
+            )
+            for minutes, created_at in [
+                (5, self.day),
+                (6, self.day + timedelta(days=1)),
+            ]
+        ]
+        models.Entry.objects.bulk_create(entries)
+        rollups.entries_created(entries)
+        self.assertEqual(
+            self.rollups(),
+            [(self.day.date(), 15, 2), (self.day.date() + timedelta(days=1), 6, 1)],
+        )
+
+    def test_concurrent_buckets_without_task_or_project(self):
+        """
+        Ensure a bucket without a task or project created concurrently is
+        added to rather than duplicated
+        """
+        update = QuerySet.update
+        for project in [self.project, None]:
+            bucket = {"user": self.test_user, "project": project, "task": None}
+
+            def created_meanwhile(queryset, **kwargs):
+                # another request creates the bucket after this one's update
+                if queryset.model is models.DailyRollup and not queryset.exists():
+                    models.DailyRollup.objects.create(
+                        day=self.day.date(), minutes=5, entries=1, **bucket
+                    )
+                    return 0
+                return update(queryset, **kwargs)
+
+            key = (self.test_user.id, project and project.id, None, self.day.date())
+            with mock.patch.object(QuerySet, "update", created_meanwhile):
+                rollups.apply(key, 10, 1)
+            self.assertEqual(
+                list(
+                    models.DailyRollup.objects.filter(**bucket).values_list(
+                        "minutes", "entries"
+                    )
+                ),
+                [(15, 2)],
+            )
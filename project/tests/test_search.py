@@ -0,0 +1,136 @@
+from importlib import import_module
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from project import bulk, factories, models, search
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+
+class SearchTest(APITestCase):
+    def setUp(self):
+        """
+        We want two users with projects and tasks sharing title words
+        """
+        self.test_user = User.objects.create_user(
+            "testuser", "test@example.com", "testpassword"
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Token {Token.objects.get(user=self.test_user).key}"
+        )
+        self.project = factories.ProjectFactory(
+            user=self.test_user, title="Website redesign"
+        )
+        self.docs = self.create_task("Write docs")
+        self.tests = self.create_task("Write website tests")
+        self.menu = self.create_task("Café menu")
+
+        other = User.objects.create_user("other", "other@example.com", "password")
+        factories.TaskFactory(user=other, title="Write website")
+
+    def create_task(self, title):
+        return models.Task.objects.create(
+            project=self.project, title=title, user=self.test_user
+        )
+
+    def search(self, q, **params):
+        response = self.client.get(reverse("search"), {"q": q, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def found(self, q, **params):
+        return [
+            (result["kind"], result["id"])
+            for result in self.search(q, **params)["results"]
+        ]
+
+    def test_search(self):
+        """
+        Ensure every word is matched as a prefix, the best match comes
+        first and other users' titles are never returned
+        """
+        self.assertEqual(
+            set(self.found("wri")), {("task", self.docs.id), ("task", self.tests.id)}
+        )
+        self.assertEqual(self.found("WEB wri"), [("task", self.tests.id)])
+        self.assertEqual(
+            self.found("web"),
+            [("project", self.project.id), ("task", self.tests.id)],
+        )
+        self.assertEqual(self.found("web", kind="task"), [("task", self.tests.id)])
+        self.assertEqual(self.found("cafe"), [("task", self.menu.id)])
+        self.assertEqual(self.found('" OR *'), [])
+        self.assertEqual(
+            self.search("redesign")["results"][0]["title"], self.project.title
+        )
+
+    def test_pagination(self):
+        """
+        Ensure results are split in pages linked to each other
+        """
+        first = self.search("w", page_size=2)
+        self.assertEqual(len(first["results"]), 2)
+        self.assertIsNone(first["previous"])
+
+        second = self.client.get(first["next"]).json()
+        self.assertEqual(len(second["results"]), 1)
+        self.assertIsNone(second["next"])
+        self.assertEqual(self.client.get(second["previous"]).json(), first)
+
+        response = self.client.get(reverse("search"), {"q": "w", "page": 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(reverse("search"))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_index_follows_writes(self):
+        """
+        Ensure renames and deletions, bulk and cascading ones included,
+        reach the index
+        """
+        self.docs.title = "Review docs"
+        self.docs.save()
+        self.assertEqual(self.found("wri"), [("task", self.tests.id)])
+        self.assertEqual(self.found("rev"), [("task", self.docs.id)])
+
+        self.docs.delete()
+        self.assertEqual(self.found("rev"), [])
+
+        bulk.delete(self.test_user, models.Task.objects.filter(id=self.tests.id))
+        self.assertEqual(self.found("wri"), [])
+
+        self.project.delete()
+        self.assertEqual(self.found("web"), [])
+        self.assertEqual(self.found("cafe"), [])
+
+    def test_rebuild_search_index(self):
+        """
+        Ensure the index is refilled from the project and task tables
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {search.SQLiteIndex.table}")
+        self.assertEqual(self.found("wri"), [])
+
+        call_command("rebuild_search_index", stdout=StringIO())
+        self.assertEqual(len(self.found("wri")), 2)
+
+    def test_postgresql_queries_match_the_index(self):
+        """
+        Ensure PostgreSQL queries use the vector the migration indexed, with
+        the unaccenting configuration
+        """
+        migration = import_module("project.migrations.0010_title_search")
+        cursor = mock.Mock()
+        migration.create_postgresql(cursor)
+        ddl = " ".join(call.args[0] for call in cursor.execute.call_args_list)
+        self.assertIn("WITH unaccent, simple", ddl)
+
+        title_index = search.PostgreSQLIndex()
+        self.assertIn(f"USING gin ({title_index.vector})", ddl)
+        sql, _ = title_index.query(1, ["cafe"], search.KINDS, 20, 0)
+        self.assertIn(title_index.vector, sql)
+        self.assertIn("to_tsquery('title_search', %s)", sql)
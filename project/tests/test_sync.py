@@ -0,0 +1,184 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from project import factories, models, sync
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+
+class SyncTest(APITestCase):
+    def setUp(self):
+        """
+        We want a user with a project, a task and an entry already on
+        their device
+        """
+        self.test_user = User.objects.create_user(
+            "testuser", "test@example.com", "testpassword"
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Token {Token.objects.get(user=self.test_user).key}"
+        )
+        self.task = factories.TaskFactory(user=self.test_user)
+        self.entry = self.create_entry(self.task)
+
+    def create_entry(self, task):
+        return models.Entry.objects.create(
+            project=task.project,
+            task=task,
+            minutes=10,
+            created_by=self.test_user,
+            created_at=timezone.now(),
+        )
+
+    def sync(self, cursor=None):
+        params = {"cursor": cursor} if cursor else {}
+        response = self.client.get(reverse("sync"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def ids(self, data):
+        return {
+            name: [row["id"] for row in data[name]]
+            for name in ["projects", "tasks", "entries"]
+        }
+
+    def test_full_sync(self):
+        """
+        Ensure a sync without cursor returns every row and no deletions
+        """
+        data = self.sync()
+        self.assertEqual(
+            self.ids(data),
+            {
+                "projects": [self.task.project_id],
+                "tasks": [self.task.id],
+                "entries": [self.entry.id],
+            },
+        )
+        self.assertEqual(data["deleted"], {"project": [], "task": [], "entry": []})
+        self.assertEqual(self.sync(data["cursor"])["entries"], [])
+
+    def test_changes_since_cursor(self):
+        """
+        Ensure only rows saved after the cursor come back, and deletions,
+        cascades included, as tombstones
+        """
+        cursor = self.sync()["cursor"]
+        other_task = factories.TaskFactory(user=self.test_user)
+        other_entry = self.create_entry(other_task)
+        self.task.status = "done"
+        self.task.save(update_fields=["status"])
+        self.task.project.delete()
+
+        data = self.sync(cursor)
+        self.assertEqual(
+            self.ids(data),
+            {
+                "projects": [other_task.project_id],
+                "tasks": [other_task.id],
+                "entries": [other_entry.id],
+            },
+        )
+        self.assertEqual(
+            data["deleted"],
+            {
+                "project": [self.task.project_id],
+                "task": [self.task.id],
+                "entry": [self.entry.id],
+            },
+        )
+
+    def test_other_users_and_imports(self):
+        """
+        Ensure other users' writes stay out and imported entries come in
+        """
+        cursor = self.sync()["cursor"]
+        other = User.objects.create_user("other", "other@example.com", "password")
+        factories.TaskFactory(user=other).delete()
+        response = self.client.post(
+            reverse("entries-import"),
+            [{"task": self.task.id, "minutes": 5, "created_at": "2022-01-20T10:00Z"}],
+            format="json",
+        )
+        self.assertEqual(response.data["created"], 1)
+
+        data = self.sync(cursor)
+        self.assertEqual(
+            self.ids(data)["entries"], [models.Entry.objects.latest("id").id]
+        )
+        self.assertEqual(self.ids(data)["projects"], [])
+        self.assertEqual(data["deleted"], {"project": [], "task": [], "entry": []})
+
+    @override_settings(SYNC_PAGE_SIZE=2)
+    def test_paged_sync(self):
+        """
+        Ensure a large sync comes in pages holding every row once, rows
+        written between pages included
+        """
+        for _ in range(4):
+            self.create_entry(self.task)
+        synced, cursor, pages = [], None, 0
+        while True:
+            data = self.sync(cursor)
+            synced += self.ids(data)["entries"]
+            cursor = data["cursor"]
+            pages += 1
+            if pages == 1:
+                late = self.create_entry(self.task)
+            if not data["more"]:
+                break
+        self.assertEqual(pages, 3)
+        self.assertEqual(
+            sorted(synced), sorted(models.Entry.objects.values_list("id", flat=True))
+        )
+        self.assertIn(late.id, synced)
+        self.assertEqual(self.sync(cursor)["entries"], [])
+
+    def test_paged_deletions(self):
+        """
+        Ensure deletions are paged like rows
+        """
+        entries = [self.create_entry(self.task) for _ in range(2)]
+        cursor = self.sync()["cursor"]
+        ids = [entry.id for entry in [self.entry, *entries]]
+        for entry in [self.entry, *entries]:
+            entry.delete()
+
+        first = sync.changes(self.test_user, cursor, page_size=2)
+        self.assertTrue(first["more"])
+        second = sync.changes(self.test_user, first["cursor"], page_size=2)
+        self.assertFalse(second["more"])
+        self.assertEqual(first["deleted"]["entry"] + second["deleted"]["entry"], ids)
+
+    def test_bad_and_expired_cursors(self):
+        """
+        Ensure a garbled cursor is rejected and an expired one sent back to
+        a full sync
+        """
+        response = self.client.get(reverse("sync"), {"cursor": "garbled"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        old = sync.encode_cursor(0, timezone.now() - timedelta(days=91))
+        with override_settings(SYNC_TOMBSTONE_DAYS=90):
+            response = self.client.get(reverse("sync"), {"cursor": old})
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+    def test_purge_tombstones(self):
+        """
+        Ensure tombstones past the retention period are purged
+        """
+        self.entry.delete()
+        models.Tombstone.objects.update(deleted_at=timezone.now() - timedelta(days=100))
+        self.task.delete()
+        out = StringIO()
+        call_command("purge_tombstones", days=90, stdout=out)
+        self.assertIn("Deleted 1 tombstones.", out.getvalue())
+        self.assertEqual(
+            list(models.Tombstone.objects.values_list("kind", flat=True)), ["task"]
+        )
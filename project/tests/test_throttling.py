@@ -0,0 +1,131 @@
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from project import factories
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory, APITestCase
+from timetracking.throttling import TokenBucketThrottle
+
+
+def rates(**rates):
+    return override_settings(
+        REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": rates}
+    )
+
+
+class ThrottlingTest(APITestCase):
+    def setUp(self):
+        """
+        We want a user with a task to click the timer of
+        """
+        cache.clear()
+        self.test_user = User.objects.create_user(
+            "testuser", "test@example.com", "testpassword"
+        )
+        self.header = f"Token {Token.objects.get(user=self.test_user).key}"
+        self.task = factories.TaskFactory(user=self.test_user)
+
+    def test_token_bucket(self):
+        """
+        Ensure a full bucket allows a burst and then refills evenly
+        """
+        request = APIRequestFactory().get("/")
+        request.user = self.test_user
+        throttle = TokenBucketThrottle("timer")
+        with rates(timer="3/min"), mock.patch.object(throttle, "timer") as timer:
+            timer.return_value = 1000
+            self.assertEqual(
+                [throttle.allow_request(request, None) for _ in range(4)],
+                [True, True, True, False],
+            )
+            self.assertEqual(throttle.wait(), 20)
+
+            timer.return_value = 1010
+            self.assertFalse(throttle.allow_request(request, None))
+            self.assertEqual(throttle.wait(), 10)
+            timer.return_value = 1020
+            self.assertTrue(throttle.allow_request(request, None))
+
+            other = TokenBucketThrottle("list")
+            self.assertTrue(other.allow_request(request, None))
+
+    @rates(timer="2/min")
+    def test_timer_throttled(self):
+        """
+        Ensure timer clicks past the budget are rejected with Retry-After
+        and without queries
+        """
+        url = f"/projects/tasks/{self.task.id}/"
+        for action in ["start", "end"]:
+            response = self.client.post(
+                url + f"{action}/", HTTP_AUTHORIZATION=self.header
+            )
+            self.assertLess(response.status_code, 400)
+
+        with self.assertNumQueries(0):
+            response = self.client.post(url + "start/", HTTP_AUTHORIZATION=self.header)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "30")
+
+        other = User.objects.create_user("other", "other@example.com", "password")
+        response = self.client.post(
+            f"/projects/tasks/{factories.TaskFactory(user=other).id}/start/",
+            HTTP_AUTHORIZATION=f"Token {Token.objects.get(user=other).key}",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    @rates(login="1/min", register="1/hour")
+    def test_login_and_register_throttled(self):
+        """
+        Ensure anonymous budgets apply per client address
+        """
+        credentials = {"username": "testuser", "password": "testpassword"}
+        response = self.client.post("/api-token-auth/", credentials)
+        self.assertEqual(response.data["token"], self.header.split()[1])
+        response = self.client.post("/api-token-auth/", credentials)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        response = self.client.post(
+            "/api-token-auth/", credentials, REMOTE_ADDR="10.0.0.2"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        user = {"username": "new", "email": "new@example.com", "password": "password"}
+        response = self.client.post("/users/register/", user)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.post("/users/register/", {**user, "username": "new2"})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", response)
+
+    @rates(login="1/min")
+    def test_forwarded_for_is_not_trusted(self):
+        """
+        Ensure clients can't get a fresh login budget by sending their own
+        X-Forwarded-For without a proxy in front
+        """
+        credentials = {"username": "testuser", "password": "wrongpassword"}
+        statuses = [
+            self.client.post(
+                "/api-token-auth/", credentials, HTTP_X_FORWARDED_FOR=f"10.0.0.{i}"
+            ).status_code
+            for i in range(5)
+        ]
+        self.assertEqual(
+            statuses,
+            [status.HTTP_400_BAD_REQUEST] + [status.HTTP_429_TOO_MANY_REQUESTS] * 4,
+        )
+
+        with self.settings(
+            REST_FRAMEWORK={
+                **settings.REST_FRAMEWORK,
+                "DEFAULT_THROTTLE_RATES": {"login": "1/min"},
+                "NUM_PROXIES": 1,
+            }
+        ):
+            response = self.client.post(
+                "/api-token-auth/", credentials, HTTP_X_FORWARDED_FOR="10.0.1.1"
+            )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
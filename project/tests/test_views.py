@@ -1,9 +1,30 @@
+import threading
+import time
+
 from django.contrib.auth.models import User
+from django.db import IntegrityError, OperationalError, connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from project import factories, models
+from django.utils import timezone
+from project import factories, models, serializers, timers
 from rest_framework import status
 from rest_framework.authtoken.models import Token
-from rest_framework.test import APITestCase
+from rest_framework.test import APIClient, APITestCase, APITransactionTestCase
+
+
+def timer_queries(queries):
+    """
+    Return the statements of a timer click that are not authentication,
+    savepoints, rollup or version maintenance.
+    """
+    return [
+        query["sql"]
+        for query in queries.captured_queries
+        if "authtoken_token" not in query["sql"]
+        and "project_dailyrollup" not in query["sql"]
+        and "project_userversion" not in query["sql"]
+        and "SAVEPOINT" not in query["sql"]
+    ]
 
 
 class ProjectTest(APITestCase):
@@ -37,10 +58,10 @@ class ProjectTest(APITestCase):
         self.assertEqual(models.Project.objects.count(), 10)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(
-            len(response.data),
+            len(response.data["results"]),
             models.Project.objects.filter(user=self.test_user1).count(),
         )
-        for project in response.data:
+        for project in response.data["results"]:
             self.assertEqual(project["user"], self.test_user1.id)
 
     def test_project_create(self):
@@ -65,7 +86,7 @@ class ProjectTest(APITestCase):
             data=data,
             HTTP_AUTHORIZATION=f"Token {self.user1_token}",
         )
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
         # Check project update
         user1_project = self.test_user1.projects.latest("id")
@@ -76,3 +97,259 @@ class ProjectTest(APITestCase):
             HTTP_AUTHORIZATION=f"Token {self.user1_token}",
         )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class RegisteredTimeTest(APITestCase):
+    def setUp(self):
+        """
+        We want projects with tasks and closed entries to aggregate over
+        """
+        self.test_user = User.objects.create_user(
+            "testuser", "test@example.com", "testpassword"
+        )
+        self.user_token = Token.objects.get(user=self.test_user).key
+
+        self.projects = factories.ProjectFactory.create_batch(3, user=self.test_user)
+        for project in self.projects:
+            for minutes in (5, 10):
+                task = models.Task.objects.create(
+                    project=project, title="Task", user=self.test_user
+                )
+                models.Entry.objects.create(
+                    project=project,
+                    task=task,
+                    minutes=minutes,
+                    created_by=self.test_user,
+                    created_at=timezone.now(),
+                )
+        models.Task.objects.filter(project=self.projects[0]).update(status="done")
+
+        # URLs
+        self.projects_url = reverse("projects")
+        self.tasks_url = reverse("tasks")
+
+    def test_registered_time(self):
+        """
+        Ensure the aggregated and annotated totals agree
+        """
+        project = self.projects[1]
+        self.assertEqual(project.registered_time(), 15)
+        self.assertEqual(project.num_tasks_todo(), 2)
+
+        annotated = (
+            models.Project.objects.with_registered_time()
+            .with_todo_count()
+            .get(id=self.projects[0].id)
+        )
+        self.assertEqual(annotated.registered_time(), 15)
+        self.assertEqual(annotated.num_tasks_todo(), 0)
+
+        task = models.Task.objects.with_registered_time().latest("id")
+        self.assertEqual(task.registered_time(), 10)
+
+    def test_list_projects_totals_in_one_query(self):
+        """
+        Ensure the list endpoint doesn't query once per project
+        """
+        header = f"Token {self.user_token}"
+        # token and version lookups, then the annotated list query
+        with self.assertNumQueries(3):
+            response = self.client.get(self.projects_url, HTTP_AUTHORIZATION=header)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [p["registered_time"] for p in response.data["results"]], [15] * 3
+        )
+        self.assertEqual(
+            sorted(p["num_tasks_todo"] for p in response.data["results"]), [0, 2, 2]
+        )
+
+        # the token is cached now, the version and list queries are left
+        with self.assertNumQueries(2):
+            response = self.client.get(self.tasks_url, HTTP_AUTHORIZATION=header)
+        self.assertEqual(
+            sorted(t["registered_time"] for t in response.data["results"]),
+            [5, 5, 5, 10, 10, 10],
+        )
+
+    def test_lists_match_model_serializers(self):
+        """
+        Ensure the lists built from values() rows match the model serializers
+        """
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.user_token}")
+        lists = [
+            (
+                self.projects_url,
+                serializers.ProjectSerializer,
+                models.Project.objects.with_registered_time().with_todo_count(),
+            ),
+            (
+                self.tasks_url,
+                serializers.TaskSerializer,
+                models.Task.objects.with_registered_time(),
+            ),
+            (reverse("entries"), serializers.EntrySerializer, models.Entry.objects),
+        ]
+        for url, serializer_class, queryset in lists:
+            response = self.client.get(url)
+            expected = serializer_class(
+                queryset.order_by(*queryset.model._meta.ordering, "id"), many=True
+            )
+            self.assertEqual(response.data["results"], expected.data)
+
+
+class EntryTest(APITestCase):
+    def setUp(self):
+        """
+        We want a task to start and stop timers on
+        """
+        self.test_user = User.objects.create_user(
+            "testuser", "test@example.com", "testpassword"
+        )
+        self.user_token = Token.objects.get(user=self.test_user).key
+        self.project = factories.ProjectFactory(user=self.test_user)
+        self.task = models.Task.objects.create(
+            project=self.project, title="Task", user=self.test_user
+        )
+
+    def test_one_tracked_entry_per_user(self):
+        """
+        Ensure the database rejects a second running timer for a user
+        """
+        models.Entry.objects.create(
+            task=self.task,
+            is_tracked=True,
+            created_by=self.test_user,
+            created_at=timezone.now(),
+        )
+        with self.assertRaises(IntegrityError):
+            models.Entry.objects.create(
+                task=self.task,
+                is_tracked=True,
+                created_by=self.test_user,
+                created_at=timezone.now(),
+            )
+
+    def test_start_and_end_tracking(self):
+        """
+        Ensure a click is a lookup and a write besides authentication and
+        the rollup bookkeeping
+        """
+        header = f"Token {self.user_token}"
+        start_url = f"/projects/tasks/{self.task.id}/start/"
+        end_url = f"/projects/tasks/{self.task.id}/end/"
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(start_url, HTTP_AUTHORIZATION=header)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(timer_queries(queries)), 2)
+
+        response = self.client.post(start_url, HTTP_AUTHORIZATION=header)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(end_url, HTTP_AUTHORIZATION=header)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["task"]["minutes"], 1)
+        self.assertEqual(len(timer_queries(queries)), 2)
+
+        response = self.client.post(end_url, HTTP_AUTHORIZATION=header)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cached_timer_follows_writes(self):
+        """
+        Ensure starting, stopping and deleting a running timer update the
+        cached timer state
+        """
+        header = f"Token {self.user_token}"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                f"/projects/tasks/{self.task.id}/start/", HTTP_AUTHORIZATION=header
+            )
+        self.assertEqual(timers.state(self.test_user)["task"]["task"], self.task.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                f"/projects/tasks/{self.task.id}/end/", HTTP_AUTHORIZATION=header
+            )
+        self.assertIsNone(timers.state(self.test_user)["task"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            timers.start(self.test_user, self.task.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.delete()
+        self.assertIsNone(timers.state(self.test_user)["task"])
+
+    def test_start_unknown_task(self):
+        """
+        Ensure starting another user's or a missing task is a 404
+        """
+        response = self.client.post(
+            f"/projects/tasks/{self.task.id + 1}/start/",
+            HTTP_AUTHORIZATION=f"Token {self.user_token}",
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ConcurrentEntryTest(APITransactionTestCase):
+    def setUp(self):
+        """
+        We want a task that several clients start at the same time
+        """
+        self.test_user = User.objects.create_user(
+            "testuser", "test@example.com", "testpassword"
+        )
+        self.user_token = Token.objects.get(user=self.test_user).key
+        self.project = factories.ProjectFactory(user=self.test_user)
+        self.task = models.Task.objects.create(
+            project=self.project, title="Task", user=self.test_user
+        )
+
+    def test_parallel_start(self):
+        """
+        Ensure parallel starts leave exactly one running entry
+        """
+        clients = 8
+        barrier = threading.Barrier(clients)
+        responses, gave_up = [], []
+
+        def start():
+            client = APIClient()
+            barrier.wait()
+            try:
+                for _ in range(50):
+                    try:
+                        response = client.post(
+                            f"/projects/tasks/{self.task.id}/start/",
+                            HTTP_AUTHORIZATION=f"Token {self.user_token}",
+                        )
+                    except OperationalError:
+                        # the shared in-memory test database reports lock
+                        # contention instead of waiting; retry like a client
+                        time.sleep(0.02)
+                        continue
+                    responses.append(response.status_code)
+                    break
+                else:
+                    gave_up.append(threading.current_thread().name)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=start) for _ in range(clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(gave_up, [], "the database stayed locked")
+        self.assertEqual(
+            models.Entry.objects.filter(
+                created_by=self.test_user, is_tracked=True
+            ).count(),
+            1,
+        )
+        # a retried start may find its own earlier insert, so only check that
+        # every client got an answer and none of them saw an error
+        self.assertEqual(len(responses), clients)
+        self.assertLessEqual(
+            set(responses), {status.HTTP_200_OK, status.HTTP_201_CREATED}
+        )
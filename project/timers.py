@@ -0,0 +1,111 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from project import models, serializers, versions
+
+
+def timer_cache_key(user_id):
+    return f"running-timer:{user_id}"
+
+
+def timer_state(entry, version):
+    return {
+        "task": dict(serializers.EntrySerializer(entry).data) if entry else None,
+        "version": version,
+    }
+
+
+def publish(user_id, entry):
+    """
+    Store the user's running entry, or None, as their timer state, unless
+    a state of a later write is already stored. ``entry`` was just saved,
+    its version is the user's version of that write, so publishes that
+    land out of order can't go back to an older state.
+    """
+    key = timer_cache_key(user_id)
+    cached = cache.get(key)
+    if cached is not None and cached["version"] >= entry.version:
+        return cached
+    state = timer_state(entry if entry.is_tracked else None, entry.version)
+    cache.set(key, state, settings.TIMER_CACHE_TIMEOUT)
+    return state
+
+
+def forget(user_id):
+    cache.delete(timer_cache_key(user_id))
+
+
+def start(user, task_id):
+    """
+    Start tracking the user's task. Returns the new running entry, or None
+    when the user already has one running; the one-running-timer
+    constraint decides between concurrent starts, so this is a task
+    lookup and a single insert. Raises ``Task.DoesNotExist`` for tasks the
+    user doesn't own.
+    """
+    project_id = user.tasks.values_list("project_id", flat=True).get(id=task_id)
+    try:
+        with transaction.atomic():
+            entry = models.Entry.objects.create(
+                project_id=project_id,
+                task_id=task_id,
+                is_tracked=True,
+                created_by=user,
+                created_at=timezone.now(),
+            )
+    except IntegrityError:
+        # there is already a tracked task
+        return None
+    transaction.on_commit(lambda: publish(user.id, entry))
+    return entry
+
+
+def stop(user, task_id):
+    """
+    Stop the user's running entry on the task and record its minutes, at
+    least one. Returns None when nothing is running on it. The entry is
+    locked while it is closed so concurrent stops can't both record it.
+    """
+    with transaction.atomic():
+        try:
+            entry = models.Entry.objects.select_for_update().get(
+                task_id=task_id, is_tracked=True, created_by=user
+            )
+        except models.Entry.DoesNotExist:
+            return None
+
+        tracked_minutes = int((timezone.now() - entry.created_at).total_seconds() / 60)
+
+        if tracked_minutes < 1:
+            tracked_minutes = 1
+
+        entry.minutes = tracked_minutes
+        entry.is_tracked = False
+        entry.save(update_fields=["minutes", "is_tracked"])
+        transaction.on_commit(lambda: publish(user.id, entry))
+    return entry
+
+
+def state(user):
+    """
+    Return the user's timer state, ``{"task": <entry or None>, "version":
+    <int>}``, from the cache. Only a cold or expired cache entry reads the
+    database.
+
+    The version is the user's, read before the entry: a write committed in
+    between has a later version, so its publish still replaces what is
+    stored here. The cache is only filled, never overwritten, so a slow
+    read can't hide a state published meanwhile.
+    """
+    key = timer_cache_key(user.id)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    version = versions.latest(user.id)
+    entry = models.Entry.objects.filter(created_by=user, is_tracked=True).first()
+    state = timer_state(entry, version)
+    if cache.add(key, state, settings.TIMER_CACHE_TIMEOUT):
+        return state
+    return cache.get(key, state)
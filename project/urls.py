@@ -1,12 +1,26 @@
 from django.urls import path
 
-from project import views
+from project import async_views, views
 
 urlpatterns = [
     path("", views.ProjectListCreateAPIView.as_view(), name="projects"),
     path("<int:pk>/", views.ProjectRetrieveUpdateDestroyAPIView.as_view()),
     path("tasks/", views.TaskListCreateAPIView.as_view(), name="tasks"),
+    path("tasks/bulk/", views.TaskBulkAPIView.as_view(), name="tasks-bulk"),
     path("tasks/<int:pk>/", views.TaskRetrieveUpdateDestroyAPIView.as_view()),
     path("tasks/<int:pk>/start/", views.EntryStartAPIView.as_view()),
     path("tasks/<int:pk>/end/", views.EntryEndAPIView.as_view()),
+    path("reports/", views.ReportAPIView.as_view(), name="reports"),
+    path("timer/", async_views.current_entry, name="timer"),
+    path("timer/wait/", async_views.wait_entry, name="timer-wait"),
+    path("async/tasks/<int:pk>/start/", async_views.entry_start),
+    path("async/tasks/<int:pk>/end/", async_views.entry_end),
+    path("entries/", views.EntryListAPIView.as_view(), name="entries"),
+    path("entries/export/", views.EntryExportAPIView.as_view(), name="entries-export"),
+    path("entries/import/", views.EntryImportAPIView.as_view(), name="entries-import"),
+    path("sync/", views.SyncAPIView.as_view(), name="sync"),
+    path("search/", views.SearchAPIView.as_view(), name="search"),
+    path("jobs/", views.JobListCreateAPIView.as_view(), name="jobs"),
+    path("jobs/<int:pk>/", views.JobRetrieveDestroyAPIView.as_view(), name="job"),
+    path("jobs/<int:pk>/result/", views.JobResultAPIView.as_view(), name="job-result"),
 ]
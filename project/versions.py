@@ -0,0 +1,51 @@
+from django.views.decorators.http import condition
+
+from project import models
+
+
+def bump(user_id):
+    """
+    Advance the user's version after a write to their data and return it.
+    Users get their version row when they are created. Projects, tasks and
+    entries bump it themselves when saved.
+    """
+    return models.UserVersion.objects.bump(user_id)
+
+
+def latest(user_id):
+    """
+    Return the user's committed version, 0 without a version row.
+    """
+    return (
+        models.UserVersion.objects.filter(user_id=user_id)
+        .values_list("version", flat=True)
+        .first()
+    ) or 0
+
+
+def current(request):
+    """
+    Return the requesting user's version, looked up once per request, or
+    None when the user has no version row.
+    """
+    if not hasattr(request, "_user_version"):
+        request._user_version = (
+            models.UserVersion.objects.filter(user=request.user)
+            .values_list("version", flat=True)
+            .first()
+        )
+    return request._user_version
+
+
+def etag(request, *args, **kwargs):
+    version = current(request)
+    if version is None:
+        return None
+    # the user id keeps shared caches from matching another user's copy
+    return f"{request.user.id}-{version}"
+
+
+# answers GET/HEAD with 304 Not Modified before the view runs its queries.
+# No Last-Modified: If-Modified-Since has one second resolution and would
+# hide a second write within the same second.
+conditional = condition(etag_func=etag)
@@ -1,15 +1,58 @@
-from datetime import datetime, timezone
-
-from rest_framework import authentication, generics, permissions, status
+from collections.abc import Iterator
+
+from django.conf import settings
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
+from rest_framework import generics, permissions, status
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.views import APIView
 from timetracking import permissions as custom_permissions
+from timetracking import ranges
+from timetracking.routers import ReplicaReadsMixin
+
+from project import (
+    bulk,
+    exports,
+    imports,
+    jobs,
+    models,
+    parsers,
+    reports,
+    search,
+    serializers,
+    sync,
+    timers,
+    versions,
+)
+
+
+class ValuesListMixin:
+    """
+    List through ``values_serializer_class`` from ``values()`` rows instead
+    of model instances, with the output of ``serializer_class``.
+    """
 
-from project import models, serializers
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.values_serializer_class
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            *serializer_class.values()
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer_class(page).data)
+        return Response(serializer_class(queryset).data)
 
 
 # Project APIs
-class ProjectListCreateAPIView(generics.ListCreateAPIView):
+@method_decorator(versions.conditional, name="get")
+class ProjectListCreateAPIView(
+    ReplicaReadsMixin, ValuesListMixin, generics.ListCreateAPIView
+):
     """
     API to list all the projects for the authenticated user and create
     new project for the authenticated user
@@ -17,39 +60,67 @@ class ProjectListCreateAPIView(generics.ListCreateAPIView):
     * Requires token authentication.
     """
 
-    authentication_classes = [authentication.TokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = "list"
     serializer_class = serializers.ProjectSerializer
+    values_serializer_class = serializers.ProjectValuesSerializer
 
     def get_queryset(self):
         """
         This view should return a list of all the projects
         for the currently authenticated user.
         """
-        return models.Project.objects.filter(user=self.request.user)
+        return (
+            models.Project.objects.filter(user=self.request.user)
+            .with_registered_time()
+            .with_todo_count()
+        )
 
     def perform_create(self, serializer):
         """
         This will pre-define the authenticated user in serializer data
         """
-        serializer.save(user=self.request.user)
+        project = serializer.save(user=self.request.user)
+        # a new project has no entries or tasks to aggregate yet
+        project.total_minutes = project.todo_count = 0
 
 
-class ProjectRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
+@method_decorator(versions.conditional, name="get")
+class ProjectRetrieveUpdateDestroyAPIView(
+    ReplicaReadsMixin, generics.RetrieveUpdateDestroyAPIView
+):
     """
     API for retrive, update or destroy a certain project
     """
 
-    authentication_classes = [authentication.TokenAuthentication]
     permission_classes = [permissions.IsAuthenticated, custom_permissions.IsAuthorized]
     serializer_class = serializers.ProjectSerializer
-    queryset = models.Project.objects.all()
+
+    def get_queryset(self):
+        """
+        Only the user's own projects can be looked up, so ownership is
+        checked by the same query.
+        """
+        return (
+            models.Project.objects.filter(user=self.request.user)
+            .with_registered_time()
+            .with_todo_count()
+        )
 
     def perform_update(self, serializer):
         serializer.save(user=self.request.user)
 
+    def perform_destroy(self, instance):
+        # one statement per table, not a signal per cascaded row
+        bulk.delete_projects(
+            self.request.user, models.Project.objects.filter(id=instance.id)
+        )
 
-class TaskListCreateAPIView(generics.ListCreateAPIView):
+
+@method_decorator(versions.conditional, name="get")
+class TaskListCreateAPIView(
+    ReplicaReadsMixin, ValuesListMixin, generics.ListCreateAPIView
+):
     """
     API to list all the tasks for the authenticated user and create
     new task for the authenticated user
@@ -57,63 +128,117 @@ class TaskListCreateAPIView(generics.ListCreateAPIView):
     * Requires token authentication.
     """
 
-    authentication_classes = [authentication.TokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = "list"
     serializer_class = serializers.TaskSerializer
+    values_serializer_class = serializers.TaskValuesSerializer
 
     def get_queryset(self):
         """
         This view should return a list of all the projects
         for the currently authenticated user.
         """
-        return models.Task.objects.filter(user=self.request.user)
+        return models.Task.objects.filter(user=self.request.user).with_registered_time()
 
     def perform_create(self, serializer):
         """
         This will pre-define the authenticated user in serializer data
         """
-        serializer.save(user=self.request.user)
+        task = serializer.save(user=self.request.user)
+        # a new task has no entries to aggregate yet
+        task.total_minutes = 0
 
 
-class TaskRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
+@method_decorator(versions.conditional, name="get")
+class TaskRetrieveUpdateDestroyAPIView(
+    ReplicaReadsMixin, generics.RetrieveUpdateDestroyAPIView
+):
     """
     API for retrive, update or destroy a certain project
     """
 
-    authentication_classes = [authentication.TokenAuthentication]
     permission_classes = [permissions.IsAuthenticated, custom_permissions.IsAuthorized]
     serializer_class = serializers.TaskSerializer
-    queryset = models.Task.objects.all()
+
+    def get_queryset(self):
+        """
+        Only the user's own tasks can be looked up, so ownership is
+        checked by the same query.
+        """
+        return models.Task.objects.filter(user=self.request.user).with_registered_time()
 
     def perform_update(self, serializer):
         serializer.save(user=self.request.user)
 
+    def perform_destroy(self, instance):
+        # one statement per table, not a signal per cascaded row
+        bulk.delete(self.request.user, models.Task.objects.filter(id=instance.id))
+
+
+class TaskBulkAPIView(APIView):
+    """
+    API to change the status of, move or delete many of the authenticated
+    user's tasks at once, each as a single statement per table
+
+    * Requires token authentication.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = serializers.TaskBulkSerializer(
+            data=request.data, context={"user": request.user}
+        )
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        queryset = bulk.tasks(
+            request.user, ids=data.get("ids"), **data.get("filter", {})
+        )
+
+        if data["action"] == "status":
+            result = bulk.set_status(request.user, queryset, data["status"])
+        elif data["action"] == "move":
+            result = bulk.move(request.user, queryset, data["project"])
+        else:
+            result = bulk.delete(request.user, queryset)
+        return Response(result, status=status.HTTP_200_OK)
+
+
+class EntryListAPIView(ReplicaReadsMixin, ValuesListMixin, generics.ListAPIView):
+    """
+    API to list the entries of the authenticated user, newest first
+
+    * Requires token authentication.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = "list"
+    serializer_class = serializers.EntrySerializer
+    values_serializer_class = serializers.EntryValuesSerializer
+
+    def get_queryset(self):
+        return models.Entry.objects.filter(created_by=self.request.user)
+
 
 class EntryStartAPIView(APIView):
-    authentication_classes = [authentication.TokenAuthentication]
     permission_classes = [permissions.IsAuthenticated, custom_permissions.IsAuthorized]
+    throttle_scope = "timer"
     serializer_class = serializers.EntrySerializer
 
     def post(self, request, pk):
         """
         API to start track a task.
         """
-        user = request.user
-        task = user.tasks.get(id=pk)
+        try:
+            entry = timers.start(request.user, pk)
+        except models.Task.DoesNotExist:
+            raise Http404
 
-        # check if there is any tracked task
-        if user.entries.filter(is_tracked=True):
+        if entry is None:
             return Response(
                 {"message": "You already have a tracked task in progress."},
                 status=status.HTTP_200_OK,
             )
-        entry = models.Entry.objects.create(
-            project=task.project,
-            task=task,
-            is_tracked=True,
-            created_by=user,
-            created_at=datetime.now(),
-        )
         serializer = self.serializer_class(entry)
         return Response(
             {"status": "Start Tracking", "task": serializer.data},
@@ -122,41 +247,240 @@ class EntryStartAPIView(APIView):
 
 
 class EntryEndAPIView(APIView):
-    authentication_classes = [authentication.TokenAuthentication]
     permission_classes = [permissions.IsAuthenticated, custom_permissions.IsAuthorized]
+    throttle_scope = "timer"
     serializer_class = serializers.EntrySerializer
 
     def post(self, request, pk):
         """
         API to end tracking a task
         """
-        user = request.user
-        task = user.tasks.get(id=pk)
-        try:
-            entry = models.Entry.objects.get(
-                project=task.project,
-                task=task,
-                is_tracked=True,
-                created_by=request.user,
-            )
-        except models.Entry.DoesNotExist:
+        entry = timers.stop(request.user, pk)
+        if entry is None:
             return Response(
                 {"message": "There is no tracked task with the provided data"},
                 status=status.HTTP_404_NOT_FOUND,
             )
+        serializer = self.serializer_class(entry)
+        return Response(
+            {"status": "Stop Tracking", "task": serializer.data},
+            status=status.HTTP_200_OK,
+        )
+
+
+class EntryImportAPIView(APIView):
+    """
+    API to import closed entries in bulk, as a JSON array or as
+    newline-delimited JSON. Rows are inserted in batches of ``batch_size``
+    and invalid rows are reported by position without aborting the rest.
+
+    * Requires token authentication.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [JSONParser, parsers.NDJSONParser]
+
+    def post(self, request):
+        try:
+            batch_size = int(
+                request.query_params.get("batch_size", settings.ENTRY_IMPORT_BATCH_SIZE)
+            )
+        except ValueError:
+            batch_size = 0
+        if not 0 < batch_size <= settings.ENTRY_IMPORT_MAX_BATCH_SIZE:
+            return Response(
+                {
+                    "message": "batch_size must be between 1 and "
+                    f"{settings.ENTRY_IMPORT_MAX_BATCH_SIZE}."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        rows = request.data
+        # JSON arrays, or the lazy rows of an NDJSON body
+        if not isinstance(rows, (list, Iterator)):
+            return Response(
+                {"message": "Expected a list of entries."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        result = imports.import_entries(request.user, rows, batch_size)
+        return Response(result, status=status.HTTP_200_OK)
+
+
+class EntryExportAPIView(APIView):
+    """
+    API to stream the authenticated user's entries as CSV or NDJSON,
+    filtered by date range, project, task and task status. Rows are
+    fetched in chunks so memory stays flat however large the range is.
+
+    * Requires token authentication.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        filters = serializers.EntryExportFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        params = dict(filters.validated_data)
+        output = params.pop("output")
 
-        tracked_minutes = int(
-            (datetime.now(timezone.utc) - entry.created_at).total_seconds() / 60
+        querysets = exports.entries(request.user, **params)
+        response = StreamingHttpResponse(
+            exports.lines(querysets, output),
+            content_type=exports.CONTENT_TYPES[output],
         )
+        response["Content-Disposition"] = f'attachment; filename="entries.{output}"'
+        return response
 
-        if tracked_minutes < 1:
-            tracked_minutes = 1
 
-        entry.minutes = tracked_minutes
-        entry.is_tracked = False
-        entry.save()
-        serializer = self.serializer_class(entry)
+class ReportAPIView(ReplicaReadsMixin, APIView):
+    """
+    API to summarize the authenticated user's tracked minutes per day,
+    week or month and per project or task over a date range
+
+    * Requires token authentication.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        filters = serializers.ReportFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
         return Response(
-            {"status": "Stop Tracking", "task": serializer.data},
+            reports.summary(request.user, **filters.validated_data),
             status=status.HTTP_200_OK,
         )
+
+
+# Job APIs
+class JobListCreateAPIView(generics.ListCreateAPIView):
+    """
+    API to list the authenticated user's background jobs and queue a
+    report or export to be generated by ``run_workers``
+
+    * Requires token authentication.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = serializers.JobSerializer
+
+    def get_queryset(self):
+        return models.Job.objects.filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+
+class JobRetrieveDestroyAPIView(generics.RetrieveDestroyAPIView):
+    """
+    API to poll the status of a job or delete it along with its result
+
+    * Requires token authentication.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = serializers.JobSerializer
+
+    def get_queryset(self):
+        return models.Job.objects.filter(user=self.request.user)
+
+
+class JobResultAPIView(APIView):
+    """
+    API to download the result file of a finished job, supporting byte
+    range requests to resume large downloads
+
+    * Requires token authentication.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        job = get_object_or_404(models.Job, pk=pk, user=request.user)
+        if job.status != models.Job.DONE:
+            return Response(
+                {"message": f"The job is {job.status}."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        path = jobs.result_path(job)
+        if not path.is_file():
+            return Response(
+                {"message": "The result file is gone."},
+                status=status.HTTP_410_GONE,
+            )
+        return ranges.file_response(
+            request, path, jobs.content_type(job), f"{job.kind}-{job.id}{path.suffix}"
+        )
+
+
+# Sync APIs
+class SyncAPIView(ReplicaReadsMixin, APIView):
+    """
+    API for offline clients to fetch the projects, tasks and entries
+    changed since the ``cursor`` of their previous sync, deletions
+    included. Without a cursor everything is returned.
+
+    * Requires token authentication.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = "list"
+
+    def get(self, request):
+        try:
+            return Response(
+                sync.changes(request.user, request.query_params.get("cursor"))
+            )
+        except sync.InvalidCursor:
+            return Response(
+                {"message": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        except sync.CursorExpired:
+            return Response(
+                {"message": "The cursor expired, sync again without it."},
+                status=status.HTTP_410_GONE,
+            )
+
+
+# Search APIs
+class SearchAPIView(ReplicaReadsMixin, APIView):
+    """
+    API to search the authenticated user's project and task titles by
+    word prefixes through the title search index, best match first and
+    ``page_size`` results per page.
+
+    * Requires token authentication.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = "list"
+
+    def get(self, request):
+        params = serializers.SearchFilterSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        page = params.validated_data["page"]
+        page_size = params.validated_data["page_size"]
+        kind = params.validated_data.get("kind")
+
+        # one row past the page tells whether there is a next one
+        results = search.search(
+            request.user,
+            params.validated_data["q"],
+            kinds=[kind] if kind else None,
+            limit=page_size + 1,
+            offset=(page - 1) * page_size,
+        )
+        url = request.build_absolute_uri()
+        return Response(
+            {
+                "next": (
+                    replace_query_param(url, "page", page + 1)
+                    if len(results) > page_size
+                    else None
+                ),
+                "previous": (
+                    replace_query_param(url, "page", page - 1) if page > 1 else None
+                ),
+                "results": results[:page_size],
+            }
+        )
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+
+
+def token_cache_key(key):
+    return f"auth-token:{key}"
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that keeps resolved tokens in the cache for
+    ``AUTH_TOKEN_CACHE_TIMEOUT`` seconds, so repeated calls skip the
+    token and user lookup. The signals in ``useraccount.signals`` drop
+    entries when a token is deleted or its user changes.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        user, token = super().authenticate_credentials(key)
+        cache.set(cache_key, (user, token), settings.AUTH_TOKEN_CACHE_TIMEOUT)
+        return user, token
+
+
+def authenticate_request(request):
+    """
+    Resolve the ``Authorization: Token <key>`` header of a plain Django
+    request, for views outside DRF. Returns the user or None.
+    """
+    auth = get_authorization_header(request).split()
+    if len(auth) != 2 or auth[0].lower() != b"token":
+        return None
+    try:
+        user, _ = CachedTokenAuthentication().authenticate_credentials(auth[1].decode())
+    except (exceptions.AuthenticationFailed, UnicodeError):
+        return None
+    return user
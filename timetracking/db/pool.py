@@ -0,0 +1,48 @@
+import queue
+import threading
+
+
+class Pool:
+    """
+    Idle connections of a process and a cap of ``size`` connections in use
+    at once. ``reset`` readies a returned connection for the next thread
+    and tells whether it can be reused, ``error`` is raised when no
+    connection frees up within ``timeout`` seconds.
+    """
+
+    def __init__(self, size, timeout, reset, error=OSError):
+        self.idle = queue.LifoQueue(maxsize=size)
+        self.slots = threading.BoundedSemaphore(size)
+        self.timeout = timeout
+        self.reset = reset
+        self.error = error
+        self.isolation_level = None
+
+    def acquire(self):
+        """
+        Take a slot and return an idle connection, or None when a new one
+        must be opened for it.
+        """
+        if not self.slots.acquire(timeout=self.timeout):
+            raise self.error(
+                f"No database connection free after {self.timeout} seconds."
+            )
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            return None
+
+    def release(self, connection):
+        try:
+            if self.reset(connection):
+                self.idle.put_nowait(connection)
+            else:
+                connection.close()
+        except Exception:
+            connection.close()
+        finally:
+            self.slots.release()
+
+    def discard(self):
+        # give back the slot of an acquire() whose new connection failed
+        self.slots.release()
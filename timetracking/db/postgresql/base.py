@@ -0,0 +1,132 @@
+"""
+PostgreSQL backend with connection health checks and a per-process
+connection pool, neither of which Django 4.0 ships.
+
+``OPTIONS["health_checks"]`` pings a persistent connection before its
+first use in each request, so a connection the server dropped while
+``CONN_MAX_AGE`` kept it around is replaced instead of failing the
+request.
+
+``OPTIONS["pool_size"]`` caps the connections the threads of a process
+use at once. Closing a connection hands it back to the pool, so it
+requires ``CONN_MAX_AGE = 0``; ``OPTIONS["pool_timeout"]`` is how many
+seconds a thread waits for a free one.
+"""
+
+import os
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+from timetracking.db.pool import Pool
+
+CUSTOM_OPTIONS = ["health_checks", "pool_size", "pool_timeout"]
+
+
+def reset(connection):
+    """
+    Roll back what a returned connection left open, returns whether it can
+    be reused.
+    """
+    if connection.closed:
+        return False
+    status = connection.info.transaction_status
+    if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+        return False
+    if status != extensions.TRANSACTION_STATUS_IDLE:
+        connection.rollback()
+    return not connection.closed
+
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+def get_pool(alias, options):
+    # forked workers must not share the parent's sockets
+    key = (alias, os.getpid())
+    with pools_lock:
+        if key not in pools:
+            pools[key] = Pool(
+                options["pool_size"],
+                options.get("pool_timeout", 30),
+                reset,
+                base.Database.OperationalError,
+            )
+        return pools[key]
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        options = self.settings_dict["OPTIONS"]
+        self.health_check_enabled = options.get("health_checks", False)
+        self.health_check_done = False
+        self.pool = None
+        if options.get("pool_size"):
+            if self.settings_dict["CONN_MAX_AGE"] != 0:
+                raise ImproperlyConfigured(
+                    "A pooled database needs CONN_MAX_AGE = 0, connections "
+                    "go back to the pool when Django closes them."
+                )
+            self.pool = get_pool(self.alias, options)
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        for option in CUSTOM_OPTIONS:
+            conn_params.pop(option, None)
+        return conn_params
+
+    def get_new_connection(self, conn_params):
+        if self.pool is None:
+            return super().get_new_connection(conn_params)
+
+        connection = self.pool.acquire()
+        if connection is not None and self.health_check_enabled:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+            except base.Database.Error:
+                connection.close()
+                connection = None
+        if connection is None:
+            try:
+                connection = super().get_new_connection(conn_params)
+            except Exception:
+                self.pool.discard()
+                raise
+            self.pool.isolation_level = self.isolation_level
+        else:
+            self.isolation_level = self.pool.isolation_level
+        return connection
+
+    def connect(self):
+        super().connect()
+        # a fresh or just pinged connection needs no check
+        self.health_check_done = True
+
+    def _close(self):
+        if self.pool is None or self.connection is None:
+            return super()._close()
+        self.pool.release(self.connection)
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        # called when a request starts and ends, check again before reuse
+        self.health_check_done = False
+
+    def _cursor(self, name=None):
+        self.close_if_health_check_failed()
+        return super()._cursor(name)
+
+    def close_if_health_check_failed(self):
+        if (
+            self.connection is None
+            or not self.health_check_enabled
+            or self.health_check_done
+        ):
+            return
+        if not self.is_usable():
+            self.close()
+        self.health_check_done = True
@@ -0,0 +1,28 @@
+"""
+SQLite backend running ``OPTIONS["pragmas"]`` on every new connection and
+starting transactions with ``OPTIONS["transaction_mode"]``, e.g.
+``IMMEDIATE`` so writers queue on the busy timeout instead of failing with
+"database is locked" when a read lock can't be upgraded.
+"""
+
+from django.db.backends.sqlite3 import base
+
+CUSTOM_OPTIONS = ["pragmas", "transaction_mode"]
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        for option in CUSTOM_OPTIONS:
+            kwargs.pop(option, None)
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        for name, value in self.settings_dict["OPTIONS"].get("pragmas", {}).items():
+            connection.execute(f"PRAGMA {name} = {value}")
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict["OPTIONS"].get("transaction_mode")
+        self.cursor().execute(f"BEGIN {mode}" if mode else "BEGIN")
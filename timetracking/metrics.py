@@ -0,0 +1,164 @@
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import Http404, HttpResponse
+
+# Upper bounds in seconds, like the Prometheus client defaults.
+TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+
+class Registry:
+    """
+    In-process histograms per (view route, method) for request wall time,
+    database time, query count and DRF render time. Each worker process
+    keeps its own.
+    """
+
+    metrics = {
+        "request_seconds": ("Wall time of the request.", TIME_BUCKETS),
+        "db_seconds": ("Time spent in database queries.", TIME_BUCKETS),
+        "db_queries": ("Database queries per request.", QUERY_BUCKETS),
+        "render_seconds": ("Time spent rendering DRF responses.", TIME_BUCKETS),
+    }
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.histograms = {name: {} for name in self.metrics}
+
+    def observe(self, labels, **values):
+        with self.lock:
+            for name, value in values.items():
+                histograms = self.histograms[name]
+                if labels not in histograms:
+                    histograms[labels] = Histogram(self.metrics[name][1])
+                histograms[labels].observe(value)
+
+    def prometheus(self):
+        """
+        Render the histograms in the Prometheus text exposition format.
+        """
+        lines = []
+        with self.lock:
+            for name, (help_text, _) in self.metrics.items():
+                metric = f"timetracking_{name}"
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} histogram")
+                for (view, method), histogram in sorted(self.histograms[name].items()):
+                    labels = f'view="{view}",method="{method}"'
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(
+                            f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}'
+                        )
+                    lines.append(
+                        f'{metric}_bucket{{{labels},le="+Inf"}} {histogram.count}'
+                    )
+                    lines.append(f"{metric}_sum{{{labels}}} {histogram.sum}")
+                    lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+class QueryTimer:
+    """
+    Database execute wrapper counting queries and the time spent in them.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.queries += 1
+
+
+class MetricsMiddleware:
+    """
+    Records per-view wall time, query count, database time and DRF render
+    time into ``registry`` and reports them in a ``Server-Timing`` header.
+    Only installed when ``METRICS_ENABLED`` is set.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        request._render_seconds = 0
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        match = request.resolver_match
+        view = match.route if match else "unmatched"
+        registry.observe(
+            (view, request.method),
+            request_seconds=elapsed,
+            db_seconds=timer.seconds,
+            db_queries=timer.queries,
+            render_seconds=request._render_seconds,
+        )
+        response["Server-Timing"] = ", ".join(
+            [
+                f"app;dur={elapsed * 1000:.2f}",
+                f'db;dur={timer.seconds * 1000:.2f};desc="{timer.queries} queries"',
+                f"render;dur={request._render_seconds * 1000:.2f}",
+            ]
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after this hook
+        start = time.perf_counter()
+
+        def rendered(response):
+            request._render_seconds = time.perf_counter() - start
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+def metrics_view(request):
+    """
+    Expose the collected histograms to Prometheus.
+    """
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    return HttpResponse(registry.prometheus(), content_type="text/plain; version=0.0.4")
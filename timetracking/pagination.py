@@ -0,0 +1,150 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from functools import reduce
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(pagination.BasePagination):
+    """
+    Cursor pagination on the model's ``Meta.ordering`` with an ``id``
+    tiebreaker. The cursor holds the ordering values of the last row seen,
+    so every page is a single indexed range scan however deep it is.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = 100
+    max_page_size = 1000
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_ordering(self, queryset):
+        ordering = list(queryset.model._meta.ordering)
+        fields = [field.lstrip("-") for field in ordering]
+        if "id" not in fields and "pk" not in fields:
+            last = ordering[-1] if ordering else "id"
+            ordering.append("-id" if last.startswith("-") else "id")
+        return ordering
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            return list(cursor["v"]), bool(cursor["r"])
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, values, reverse):
+        # str() keeps the microseconds DjangoJSONEncoder would drop
+        cursor = json.dumps({"v": values, "r": int(reverse)}, default=str)
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            urlsafe_b64encode(cursor.encode()).decode(),
+        )
+
+    def clean_values(self, model, values):
+        """
+        Convert cursor values to the types of their ordering fields, a
+        cursor that doesn't fit them is a 404 like a malformed one.
+        """
+        cleaned = []
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip("-")
+            model_field = (
+                model._meta.pk if name == "pk" else model._meta.get_field(name)
+            )
+            # cursors only ever hold scalars
+            if value is None or isinstance(value, (dict, list)):
+                raise NotFound(self.invalid_cursor_message)
+            try:
+                cleaned.append(model_field.to_python(value))
+            except (ValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+        return cleaned
+
+    def after(self, ordering, values):
+        """
+        Build the filter for rows strictly after ``values`` in ``ordering``.
+        """
+        clauses = []
+        for position, field in enumerate(ordering):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            equal = {f.lstrip("-"): v for f, v in zip(ordering, values[:position])}
+            clauses.append(Q(**equal, **{f"{name}__{lookup}": values[position]}))
+        return reduce(lambda left, right: left | right, clauses)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        values, reverse = self.decode_cursor(request)
+        if values is not None:
+            if len(values) != len(self.ordering):
+                raise NotFound(self.invalid_cursor_message)
+            values = self.clean_values(queryset.model, values)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = [
+                field[1:] if field.startswith("-") else f"-{field}"
+                for field in ordering
+            ]
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self.after(ordering, values))
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.next_values = self.previous_values = None
+        if rows:
+            if has_more or reverse:
+                self.next_values = self.key(rows[-1])
+            if values is not None and (has_more or not reverse):
+                self.previous_values = self.key(rows[0])
+        return rows
+
+    def key(self, obj):
+        fields = [field.lstrip("-") for field in self.ordering]
+        if isinstance(obj, dict):
+            # a values() row
+            return [obj[field] for field in fields]
+        return [getattr(obj, field) for field in fields]
+
+    def get_next_link(self):
+        if self.next_values is None:
+            return None
+        return self.encode_cursor(self.next_values, reverse=False)
+
+    def get_previous_link(self):
+        if self.previous_values is None:
+            return None
+        return self.encode_cursor(self.previous_values, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
@@ -10,4 +10,5 @@ class IsAuthorized(permissions.BasePermission):
     message = "You are not authorized to perform this action"
 
     def has_object_permission(self, request, view, obj):
-        return obj.user == request.user
+        # compare ids so the owner row isn't fetched
+        return obj.user_id == request.user.id
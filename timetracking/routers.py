@@ -0,0 +1,114 @@
+import asyncio
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+# set while a view allowed to read from the replica handles a request
+replica_reads = ContextVar("replica_reads", default=False)
+
+
+def pin_cache_key(user_id):
+    return f"primary-pin:{user_id}"
+
+
+def pin_primary(user):
+    """
+    Send the user's reads to the primary for ``REPLICA_STICKY_SECONDS``,
+    long enough for the replica to catch up with what they just wrote.
+    """
+    cache.set(pin_cache_key(user.id), True, settings.REPLICA_STICKY_SECONDS)
+
+
+def pinned(user):
+    return cache.get(pin_cache_key(user.id), False)
+
+
+class ReplicaRouter:
+    """
+    Route reads to ``REPLICA_DATABASE`` while ``replica_reads`` is set and
+    no transaction is open on the primary, everything else to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (
+            settings.REPLICA_DATABASE
+            and replica_reads.get()
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return settings.REPLICA_DATABASE
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # even for instances that were read from the replica
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, settings.REPLICA_DATABASE}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+class ReplicaReadsMixin:
+    """
+    Serve the view's safe-method requests from the replica unless the
+    user wrote recently. Authentication and permission checks still read
+    from the primary.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and not pinned(request.user):
+            self.replica_reads_token = replica_reads.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, "replica_reads_token", None)
+        if token is not None:
+            replica_reads.reset(token)
+            self.replica_reads_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class PinPrimaryMiddleware:
+    """
+    Pin users to the primary after a successful unsafe request, so their
+    next reads see their own writes. Only installed with a
+    ``REPLICA_DATABASE``, and async capable so ASGI requests stay off
+    threads.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if settings.REPLICA_DATABASE is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # lets Django's handler see the instance as async
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS:
+            self.pin(request, response)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if request.method not in SAFE_METHODS:
+            # the user may still be a lazy lookup, the cache is sync
+            await sync_to_async(self.pin, thread_sensitive=True)(request, response)
+        return response
+
+    def pin(self, request, response):
+        user = getattr(request, "user", None)
+        if response.status_code < 400 and user is not None and user.is_authenticated:
+            pin_primary(user)
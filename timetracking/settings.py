@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -45,6 +46,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "timetracking.metrics.MetricsMiddleware",
+    "timetracking.routers.PinPrimaryMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -78,13 +81,108 @@ WSGI_APPLICATION = "timetracking.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.0/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
+# DB_ENGINE picks "sqlite" (the default) or "postgresql", the other DB_*
+# variables fill in the connection.
+
+DB_ENGINE = os.environ.get("DB_ENGINE", "sqlite")
+
+# WAL lets readers run next to the writer, NORMAL syncing is safe with WAL,
+# writers wait up to the busy timeout and take the write lock when their
+# transaction begins so it never has to be upgraded.
+SQLITE_TUNED_OPTIONS = {
+    "pragmas": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "mmap_size": 256 * 1024 * 1024,
+    },
+    "transaction_mode": "IMMEDIATE",
 }
 
+if DB_ENGINE == "postgresql":
+    # connections shared by a process, 0 keeps one per thread
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 0))
+    DATABASES = {
+        "default": {
+            "ENGINE": "timetracking.db.postgresql",
+            "NAME": os.environ.get("DB_NAME", "timetracking"),
+            "USER": os.environ.get("DB_USER", ""),
+            "PASSWORD": os.environ.get("DB_PASSWORD", ""),
+            "HOST": os.environ.get("DB_HOST", ""),
+            "PORT": os.environ.get("DB_PORT", ""),
+            # pooled connections return to the pool when Django closes them
+            "CONN_MAX_AGE": (
+                0 if DB_POOL_SIZE else int(os.environ.get("DB_CONN_MAX_AGE", 60))
+            ),
+            "OPTIONS": {
+                "health_checks": True,
+                "pool_size": DB_POOL_SIZE,
+                "pool_timeout": 30,
+            },
+        }
+    }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "timetracking.db.sqlite3",
+            "NAME": os.environ.get("DB_NAME", BASE_DIR / "db.sqlite3"),
+            "OPTIONS": (
+                SQLITE_TUNED_OPTIONS
+                if os.environ.get("DB_SQLITE_TUNED", "1") == "1"
+                else {}
+            ),
+        }
+    }
+
+
+# Read replica
+# DB_REPLICA_NAME (SQLite) or DB_REPLICA_HOST (PostgreSQL) adds a replica
+# of the default database. Safe-method requests to the list and report
+# views read from it, unless the user wrote in the last
+# REPLICA_STICKY_SECONDS.
+
+if os.environ.get("DB_REPLICA_NAME") or os.environ.get("DB_REPLICA_HOST"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": os.environ.get("DB_REPLICA_NAME", DATABASES["default"]["NAME"]),
+        "HOST": os.environ.get("DB_REPLICA_HOST", DATABASES["default"].get("HOST", "")),
+        "TEST": {"MIRROR": "default"},
+    }
+    REPLICA_DATABASE = "replica"
+else:
+    REPLICA_DATABASE = None
+
+DATABASE_ROUTERS = ["timetracking.routers.ReplicaRouter"]
+REPLICA_STICKY_SECONDS = 5
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.0/topics/cache/
+
+# Running timer states are served from the cache alone, so every worker
+# process must share it: set REDIS_URL when running more than one. The
+# local memory default is per process, and workers would serve each
+# other's stale timers until TIMER_CACHE_TIMEOUT. `check --deploy` warns.
+
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+            "TIMEOUT": 300,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "TIMEOUT": 300,
+        }
+    }
+
+# Seconds an authenticated token is served from the cache.
+AUTH_TOKEN_CACHE_TIMEOUT = 300
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
@@ -130,6 +228,75 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # Rest Framework settings
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework.authentication.TokenAuthentication",
-    )
+        "timetracking.authentication.CachedTokenAuthentication",
+    ),
+    "DEFAULT_PAGINATION_CLASS": "timetracking.pagination.KeysetPagination",
+    "DEFAULT_RENDERER_CLASSES": (
+        "timetracking.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    # budgets of the views' throttle_scope, per user or client address, kept
+    # in the default cache: without REDIS_URL every process has its own
+    "DEFAULT_THROTTLE_CLASSES": ("timetracking.throttling.TokenBucketThrottle",),
+    "DEFAULT_THROTTLE_RATES": {
+        "timer": "120/min",
+        "timer_wait": "60/min",
+        "list": "600/min",
+        "login": "20/min",
+        "register": "30/hour",
+    },
+    # proxies in front of the app; the client address is read from
+    # X-Forwarded-For only behind them, clients could send any otherwise
+    "NUM_PROXIES": int(os.environ.get("NUM_PROXIES", 0)),
 }
+
+# Bulk entry import
+# Rows validated and inserted per transaction, and the most a request may ask for.
+ENTRY_IMPORT_BATCH_SIZE = 1000
+ENTRY_IMPORT_MAX_BATCH_SIZE = 10000
+
+# Bulk user provisioning
+# Processes hashing passwords in the provision_users command (None for one
+# per CPU), and the most users a request may create. Requests hash in their
+# own process, about a quarter second per password.
+USER_PROVISION_PROCESSES = None
+USER_PROVISION_MAX_BATCH_SIZE = 100
+
+# Entry export
+# Rows fetched from the database per round trip while streaming.
+ENTRY_EXPORT_CHUNK_SIZE = 2000
+
+# Request metrics
+# Per-view latency, query and render histograms at /metrics/ plus
+# Server-Timing headers. Off by default, the middleware unloads itself.
+METRICS_ENABLED = False
+
+# Running timer
+# How long a user's cached timer state lives, and how long and how often
+# the long-poll endpoint checks it before answering unchanged.
+TIMER_CACHE_TIMEOUT = 3600
+TIMER_LONG_POLL_TIMEOUT = 30
+TIMER_POLL_INTERVAL = 0.5
+
+# Background jobs
+# Where report and export results are written, how many worker processes
+# run_workers starts, how often idle workers poll the queue and after how
+# many seconds a running job is assumed lost and queued again.
+JOB_RESULTS_DIR = BASE_DIR / "job_results"
+JOB_WORKER_PROCESSES = 2
+JOB_POLL_INTERVAL = 1
+JOB_STALE_AFTER = 6 * 60 * 60
+
+# Sync
+# Days deletions are remembered for sync clients, older cursors must
+# sync from scratch. Purged by the purge_tombstones command.
+SYNC_TOMBSTONE_DAYS = 90
+# Rows of each kind a sync call returns at most, clients call again while
+# the response says there is more.
+SYNC_PAGE_SIZE = 1000
+
+# Entry archive
+# Age in days after which archive_entries moves finished entries to the
+# archive table, and how many it moves per transaction.
+ENTRY_ARCHIVE_DAYS = 365
+ENTRY_ARCHIVE_BATCH_SIZE = 2000
@@ -0,0 +1,48 @@
+from rest_framework.settings import api_settings
+from rest_framework.throttling import ScopedRateThrottle
+
+
+class TokenBucketThrottle(ScopedRateThrottle):
+    """
+    Token bucket per scope and user, or client address for anonymous
+    requests. A bucket holds the scope's number of requests and refills
+    evenly over its period, so clients may burst up to the budget but not
+    sustain more. The bucket is a (tokens, timestamp) pair in the cache,
+    read and written once per request, so throttling never queries the
+    database; concurrent requests may race on the same bucket.
+
+    Views pick their budget in ``DEFAULT_THROTTLE_RATES`` with
+    ``throttle_scope``, a rate of None turns a scope off.
+    """
+
+    cache_format = "throttle:%(scope)s:%(ident)s"
+
+    def __init__(self, scope=None):
+        # views outside DRF pass their scope here
+        self.default_scope = scope
+
+    def get_rate(self):
+        # read on each request so rates follow settings overrides
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None) or self.default_scope
+        self.rate = self.get_rate() if self.scope else None
+        if self.rate is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        self.key = self.get_cache_key(request, view)
+
+        now = self.timer()
+        refill = self.num_requests / self.duration
+        tokens, updated = self.cache.get(self.key, (self.num_requests, now))
+        tokens = min(self.num_requests, tokens + (now - updated) * refill)
+        if tokens < 1:
+            self.wait_seconds = (1 - tokens) / refill
+            return False
+        # an untouched bucket is full again after one period
+        self.cache.set(self.key, (tokens - 1, now), self.duration)
+        return True
+
+    def wait(self):
+        return self.wait_seconds
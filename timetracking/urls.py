@@ -1,10 +1,12 @@
 from django.contrib import admin
 from django.urls import path, include
-from rest_framework.authtoken import views
+from timetracking.metrics import metrics_view
+from useraccount.views import ObtainToken
 
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("api-token-auth/", views.obtain_auth_token),
+    path("api-token-auth/", ObtainToken.as_view()),
     path("users/", include("useraccount.urls")),
     path("projects/", include("project.urls")),
+    path("metrics/", metrics_view, name="metrics"),
 ]
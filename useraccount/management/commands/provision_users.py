@@ -0,0 +1,63 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+from project import parsers
+
+from useraccount import provisioning
+
+
+class Command(BaseCommand):
+    help = (
+        "Create users with tokens from a JSON or NDJSON file of usernames, "
+        "emails and passwords."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File of users, '.json' or '.ndjson'.")
+        parser.add_argument(
+            "--processes",
+            type=int,
+            help=(
+                "Processes hashing passwords, USER_PROVISION_PROCESSES or one "
+                "per CPU by default."
+            ),
+        )
+        parser.add_argument(
+            "--format",
+            choices=["json", "ndjson"],
+            help="Input format, guessed from the file extension by default.",
+        )
+        parser.add_argument(
+            "--output", help="Write the created users and tokens to this file."
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or ("json" if path.endswith(".json") else "ndjson")
+        with open(path, encoding="utf-8") as lines:
+            if fmt == "json":
+                rows = json.load(lines)
+            else:
+                rows = list(parsers.read_ndjson(lines))
+        try:
+            result = provisioning.provision(rows, options["processes"])
+        except IntegrityError:
+            # a username or email was registered while the batch was hashed
+            raise CommandError("Some users were created meanwhile, try again.")
+
+        for error in result["errors"]:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        # one user per line with its token, like the NDJSON input
+        output = "".join(json.dumps(user) + "\n" for user in result["created"])
+        if options["output"]:
+            with open(options["output"], "w") as output_file:
+                output_file.write(output)
+        else:
+            self.stdout.write(output, ending="")
+        self.stderr.write(
+            self.style.SUCCESS(
+                f"Created {len(result['created'])} users, "
+                f"{len(result['errors'])} rows rejected."
+            )
+        )
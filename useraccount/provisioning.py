@@ -0,0 +1,119 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from project import models
+from rest_framework.authtoken.models import Token
+
+from useraccount.serializers import UserProvisionSerializer
+
+
+def hash_passwords(passwords, processes=1):
+    """
+    Hash ``passwords`` in a pool of ``processes`` processes, with None
+    ``USER_PROVISION_PROCESSES`` or one per CPU, or in this process when
+    there is only one process or password.
+
+    The pool forks, so only single threaded callers like the
+    ``provision_users`` command may use it, never a web worker.
+    """
+    if processes is None:
+        processes = settings.USER_PROVISION_PROCESSES
+    processes = min(processes or multiprocessing.cpu_count(), len(passwords))
+    if processes <= 1:
+        return [make_password(password) for password in passwords]
+    # children are forked from this already configured process
+    context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(processes, mp_context=context) as pool:
+        chunksize = max(len(passwords) // (processes * 4), 1)
+        return list(pool.map(make_password, passwords, chunksize=chunksize))
+
+
+def validate(rows):
+    """
+    Return the valid rows and the errors of the others by position, with
+    usernames and emails checked against the database in one query.
+    """
+    valid, errors = [], []
+    for index, row in enumerate(rows):
+        serializer = UserProvisionSerializer(data=row)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            errors.append({"row": index, "errors": serializer.errors})
+
+    usernames = {data["username"] for _, data in valid}
+    emails = {data["email"] for _, data in valid}
+    taken = User.objects.filter(Q(username__in=usernames) | Q(email__in=emails))
+    seen = {"username": set(), "email": set()}
+    for username, email in taken.values_list("username", "email"):
+        seen["username"].add(username)
+        seen["email"].add(email)
+
+    unique = []
+    for index, data in valid:
+        # taken in the database or earlier in the batch
+        duplicates = {
+            field: ["This field must be unique."]
+            for field in seen
+            if data[field] in seen[field]
+        }
+        if duplicates:
+            errors.append({"row": index, "errors": duplicates})
+            continue
+        for field in seen:
+            seen[field].add(data[field])
+        unique.append(data)
+    errors.sort(key=lambda error: error["row"])
+    return unique, errors
+
+
+def provision(rows, processes=1):
+    """
+    Create users with tokens from ``rows`` of username, email and password.
+    Passwords are hashed as ``hash_passwords`` does, in this process by
+    default, and users, tokens and versions inserted with one query each.
+    Returns the created users with their tokens and the rejected rows by
+    position.
+    """
+    valid, errors = validate(rows)
+    passwords = hash_passwords([data["password"] for data in valid], processes)
+    users = [
+        User(username=data["username"], email=data["email"], password=password)
+        for data, password in zip(valid, passwords)
+    ]
+
+    with transaction.atomic():
+        users = User.objects.bulk_create(users)
+        if users and users[0].pk is None:
+            # bulk_create only sets primary keys on some backends
+            ids = dict(
+                User.objects.filter(
+                    username__in=[user.username for user in users]
+                ).values_list("username", "id")
+            )
+            for user in users:
+                user.pk = ids[user.username]
+        tokens = Token.objects.bulk_create(
+            Token(key=Token.generate_key(), user=user) for user in users
+        )
+        models.UserVersion.objects.bulk_create(
+            models.UserVersion(user=user) for user in users
+        )
+
+    return {
+        "created": [
+            {
+                "id": user.id,
+                "username": user.username,
+                "email": user.email,
+                "token": token.key,
+            }
+            for user, token in zip(users, tokens)
+        ],
+        "errors": errors,
+    }
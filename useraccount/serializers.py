@@ -23,3 +23,13 @@ class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ("id", "username", "email", "password")
+
+
+class UserProvisionSerializer(serializers.Serializer):
+    """
+    A row of bulk provisioning, uniqueness is checked for the whole batch.
+    """
+
+    email = serializers.EmailField(required=True)
+    username = serializers.CharField(max_length=32)
+    password = serializers.CharField(min_length=8, write_only=True)
@@ -1,10 +1,25 @@
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from rest_framework.authtoken.models import Token
+from timetracking.authentication import token_cache_key
 
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def create_auth_token(sender, instance=None, created=False, **kwargs):
     if created:
         Token.objects.create(user=instance)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def forget_cached_tokens(sender, instance=None, created=False, **kwargs):
+    # the cached user may be stale or deactivated now
+    if not created:
+        keys = Token.objects.filter(user=instance).values_list("key", flat=True)
+        cache.delete_many([token_cache_key(key) for key in keys])
+
+
+@receiver(post_delete, sender=Token)
+def forget_cached_token(sender, instance=None, **kwargs):
+    cache.delete(token_cache_key(instance.key))
@@ -1,8 +1,15 @@
+import json
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from django.contrib.auth.models import User
 from rest_framework import status
 from rest_framework.authtoken.models import Token
+from useraccount import provisioning
 
 
 class AccountsTest(APITestCase):
@@ -121,3 +128,173 @@ class AccountsTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(User.objects.count(), 1)
         self.assertEqual(len(response.data["email"]), 1)
+
+
+class TokenCacheTest(APITestCase):
+    def setUp(self):
+        self.test_user = User.objects.create_user(
+            "testuser", "test@example.com", "testpassword"
+        )
+        self.token = Token.objects.get(user=self.test_user)
+
+        # URL of an authenticated endpoint.
+        self.projects_url = reverse("projects")
+
+    def get_projects(self, token):
+        return self.client.get(self.projects_url, HTTP_AUTHORIZATION=f"Token {token}")
+
+    def test_token_is_cached(self):
+        """
+        Ensure only the first request looks the token up.
+        """
+        self.get_projects(self.token.key)
+        # the user's version and the projects
+        with self.assertNumQueries(2):
+            response = self.get_projects(self.token.key)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_deleted_token_is_forgotten(self):
+        """
+        Ensure a rotated token stops authenticating right away.
+        """
+        self.get_projects(self.token.key)
+        self.token.delete()
+        new_token = Token.objects.create(user=self.test_user)
+
+        response = self.get_projects(self.token.key)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.get_projects(new_token.key)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_deactivated_user_is_forgotten(self):
+        """
+        Ensure a deactivated user can't keep using a cached token.
+        """
+        self.get_projects(self.token.key)
+        self.test_user.is_active = False
+        self.test_user.save()
+
+        response = self.get_projects(self.token.key)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ProvisionTest(APITestCase):
+    def setUp(self):
+        # We want an admin provisioning users next to an existing one.
+        self.admin = User.objects.create_superuser(
+            "admin", "admin@example.com", "adminpassword"
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Token {Token.objects.get(user=self.admin).key}"
+        )
+        self.provision_url = reverse("account-provision")
+
+    def test_provision_users(self):
+        """
+        Ensure users are created with working tokens and bad rows reported,
+        hashing in the request's own process.
+        """
+        rows = [
+            {
+                "username": "alice",
+                "email": "alice@example.com",
+                "password": "alicepass",
+            },
+            {"username": "admin", "email": "new@example.com", "password": "password"},
+            {"username": "bob", "email": "bob@example.com", "password": "short"},
+            {"username": "bob", "email": "bob@example.com", "password": "bobpassword"},
+            {"username": "bob", "email": "bob2@example.com", "password": "bobpassword"},
+        ]
+        # the token, uniqueness, then one insert each for users, tokens and
+        # versions between the savepoint queries
+        with self.assertNumQueries(7), self.settings(
+            USER_PROVISION_PROCESSES=4
+        ), mock.patch("useraccount.provisioning.ProcessPoolExecutor") as pool:
+            response = self.client.post(self.provision_url, rows, format="json")
+        pool.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        created = response.data["created"]
+        self.assertEqual([user["username"] for user in created], ["alice", "bob"])
+        self.assertEqual(
+            [
+                (error["row"], list(error["errors"]))
+                for error in response.data["errors"]
+            ],
+            [(1, ["username"]), (2, ["password"]), (4, ["username"])],
+        )
+        alice = User.objects.get(username="alice")
+        self.assertTrue(alice.check_password("alicepass"))
+        self.assertEqual(alice.version.version, 0)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {created[0]['token']}")
+        response = self.client.get(reverse("projects"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_admins_only(self):
+        """
+        Ensure regular users can't provision accounts.
+        """
+        user = User.objects.create_user("testuser", "test@example.com", "password")
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Token {Token.objects.get(user=user).key}"
+        )
+        response = self.client.post(self.provision_url, [], format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_provision_command(self):
+        """
+        Ensure the command hashes in a process pool and prints the tokens.
+        """
+        with tempfile.NamedTemporaryFile("w", suffix=".ndjson") as source:
+            for index in range(3):
+                source.write(
+                    json.dumps(
+                        {
+                            "username": f"user{index}",
+                            "email": f"user{index}@example.com",
+                            "password": f"password{index}",
+                        }
+                    )
+                    + "\n"
+                )
+            source.flush()
+            output = StringIO()
+            call_command(
+                "provision_users",
+                source.name,
+                processes=2,
+                stdout=output,
+                stderr=StringIO(),
+            )
+
+        created = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(len(created), 3)
+        for user in created:
+            self.assertEqual(Token.objects.get(user_id=user["id"]).key, user["token"])
+        self.assertTrue(User.objects.get(username="user2").check_password("password2"))
+
+    def test_provision_race(self):
+        """
+        Ensure users registered while a batch is hashed get a 409 from the
+        endpoint and an error from the command, not a crash.
+        """
+        rows = [
+            {"username": "carol", "email": "carol@example.com", "password": "password"}
+        ]
+        hash_passwords = provisioning.hash_passwords
+
+        def register_then_hash(*args, **kwargs):
+            User.objects.get_or_create(username="carol", email="carol@example.com")
+            return hash_passwords(*args, **kwargs)
+
+        with mock.patch.object(provisioning, "hash_passwords", register_then_hash):
+            response = self.client.post(self.provision_url, rows, format="json")
+            self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+            User.objects.filter(username="carol").delete()
+            with tempfile.NamedTemporaryFile("w", suffix=".json") as source:
+                json.dump(rows, source)
+                source.flush()
+                with self.assertRaisesMessage(CommandError, "created meanwhile"):
+                    call_command("provision_users", source.name, stdout=StringIO())
@@ -5,4 +5,5 @@ from project import views as project_views
 
 urlpatterns = [
     path("register/", views.UserCreate.as_view(), name="account-create"),
+    path("provision/", views.UserProvision.as_view(), name="account-provision"),
 ]
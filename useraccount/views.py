@@ -1,9 +1,14 @@
+from django.conf import settings
 from django.contrib.auth.models import User
-from rest_framework import status
+from django.db import IntegrityError
+from rest_framework import permissions, status
 from rest_framework.authtoken.models import Token
+from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from timetracking.throttling import TokenBucketThrottle
 
+from useraccount import provisioning
 from useraccount.serializers import UserSerializer
 
 
@@ -12,6 +17,8 @@ class UserCreate(APIView):
     Creates the user.
     """
 
+    throttle_scope = "register"
+
     def post(self, request):
         serializer = UserSerializer(data=request.data)
         if serializer.is_valid():
@@ -22,3 +29,51 @@ class UserCreate(APIView):
                 return Response(json, status=status.HTTP_201_CREATED)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class UserProvision(APIView):
+    """
+    Creates many users at once from a JSON array of usernames, emails and
+    passwords, returning their tokens. Invalid rows are reported by
+    position without aborting the rest.
+
+    * Requires an admin token.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request):
+        rows = request.data
+        if not isinstance(rows, list):
+            return Response(
+                {"message": "Expected a list of users."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(rows) > settings.USER_PROVISION_MAX_BATCH_SIZE:
+            return Response(
+                {
+                    "message": "At most "
+                    f"{settings.USER_PROVISION_MAX_BATCH_SIZE} users per request."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            # in this process: forking a threaded web worker isn't safe
+            result = provisioning.provision(rows, processes=1)
+        except IntegrityError:
+            # a username or email was registered while the batch was hashed
+            return Response(
+                {"message": "Some users were created meanwhile, try again."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(result, status=status.HTTP_201_CREATED)
+
+
+class ObtainToken(ObtainAuthToken):
+    """
+    Exchanges a username and password for the user's token, throttled per
+    client address to slow down password guessing.
+    """
+
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = "login"